@@ -0,0 +1,113 @@
+"""
+Eşzamanlı tahmin kaydı + özet okuma isteklerinde senkron SessionLocal ile async_db (aiosqlite) karşılaştırması.
+Her istek: (isteğe bağlı) skorlama/ağ gecikmesi, tek öğrenci kaydı ve geçmiş sayfası özeti.
+Senkron yolda istekler sırayla işlenir (Streamlit betiğindeki gibi); asenkron yolda en fazla
+--concurrency istek aynı anda çalışır ve bekleme süreleri örtüşür.
+Geçici bir SQLite dosyası kullanılır; PostgreSQL gerekmez.
+
+Kullanım:
+    python benchmarks/bench_async_db.py [--requests 500] [--concurrency 20] [--latency-ms 5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(root_dir)
+
+from src.database import async_db, crud
+from src.database.db_config import Base, SessionLocal, dispose_engine, get_engine
+from src.logic.data_balancer import generate_balanced_data
+from src.utils.helpers import get_ai_feedback
+
+
+def _requests(n):
+    df = generate_balanced_data(n, seed=0)
+    scores = np.round(df.pop("exam_score").to_numpy(dtype=np.float64), 1)
+    records = df.to_dict("records")
+    for i, record in enumerate(records):
+        record.update(first_name="Öğrenci", last_name=str(i + 1))
+    return [(record, score, get_ai_feedback(score, record)) for record, score in zip(records, scores)]
+
+
+def _run_sync(requests, latency):
+    for student, score, feedback in requests:
+        if latency:
+            time.sleep(latency)
+        db = SessionLocal()
+        try:
+            crud.save_student_prediction(db, student, score, feedback, "Benchmark")
+            crud.get_prediction_summary(db)
+        finally:
+            db.close()
+
+
+async def _run_async(requests, latency, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handle(student, score, feedback):
+        async with semaphore:
+            if latency:
+                await asyncio.sleep(latency)
+            async with async_db.AsyncSessionLocal() as db:
+                await async_db.save_student_prediction(db, student, score, feedback, "Benchmark")
+                await async_db.get_prediction_summary(db)
+
+    try:
+        await asyncio.gather(*(handle(*request) for request in requests))
+    finally:
+        # Bağlantılar bu olay döngüsüne bağlı; döngü kapanmadan havuz boşaltılır
+        await async_db.dispose_async_engine()
+
+
+def _reset():
+    engine = get_engine()
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0,
+                        help="İstek başına DB dışı bekleme (model sunucusu / ağ); 0 sadece DB'yi ölçer")
+    args = parser.parse_args()
+
+    requests = _requests(args.requests)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'async.db')}"
+        print(f"📊 {args.requests} istek, eşzamanlılık {args.concurrency}")
+
+        for latency_ms in sorted({0.0, args.latency_ms}):
+            latency = latency_ms / 1000
+
+            _reset()
+            start = time.perf_counter()
+            _run_sync(requests, latency)
+            sync_s = time.perf_counter() - start
+
+            _reset()
+            start = time.perf_counter()
+            asyncio.run(_run_async(requests, latency, args.concurrency))
+            async_s = time.perf_counter() - start
+
+            with SessionLocal() as db:
+                summary = crud.get_prediction_summary(db)
+            assert summary["total"] == args.requests, summary
+
+            print(f"\nİstek başına ek gecikme: {latency_ms:g} ms")
+            print(f"Senkron (sıralı):  {sync_s:6.2f} sn  ({args.requests / sync_s:,.0f} istek/sn)")
+            print(f"Asenkron:          {async_s:6.2f} sn  ({args.requests / async_s:,.0f} istek/sn, "
+                  f"{sync_s / async_s:.1f}x)")
+        dispose_engine()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Öğrenci bazında faktör katkılarının (FlatForest.contributions, ağaç yolu yöntemi) maliyeti:
+- satır sayısına göre sadece tahmin ve tahmin + katkı süreleri,
+- ilk satırlarda sklearn decision_path ile ağaç ağaç hesaplanan katkılarla en büyük fark,
+- bias + katkı toplamının tahminle farkı.
+Eğitilmiş model gerekir (önce src/logic/ml_engine.py).
+
+Kullanım:
+    python benchmarks/bench_attribution.py [--rows 1 1000 10000] [--check-rows 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(root_dir)
+
+from src.logic.attribution import explain, top_factor_strings
+
+
+def reference_contributions(model, X):
+    """Aynı yöntemin ağaç ağaç (yavaş) hesabı: yol üzerindeki her düğüm geçişi bölen özelliğe yazılır."""
+    matrix = X.to_numpy(dtype=np.float32)
+    out = np.zeros(matrix.shape, dtype=np.float64)
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        paths = estimator.decision_path(matrix)
+        for row in range(len(matrix)):
+            nodes = paths.indices[paths.indptr[row]:paths.indptr[row + 1]]
+            for parent, child in zip(nodes[:-1], nodes[1:]):
+                out[row, tree.feature[parent]] += tree.value[child, 0, 0] - tree.value[parent, 0, 0]
+    return out / len(model.estimators_)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 1000, 10000])
+    parser.add_argument("--check-rows", type=int, default=20)
+    args = parser.parse_args()
+
+    from src.logic.data_balancer import generate_balanced_data
+    from src.logic.model_registry import load_bundle
+    try:
+        bundle = load_bundle()
+    except FileNotFoundError:
+        print("⚠️ Model bulunamadı; önce src/logic/ml_engine.py çalıştırılmalı.")
+        return
+    data = generate_balanced_data(max(args.rows), seed=0).drop(columns=["exam_score"])
+    X = bundle.preprocessor.transform(data)
+
+    print("📊 Düz orman: tahmin ve tahmin + katkı")
+    print(f"   {'Satır':>8}{'Tahmin ms':>12}{'Katkı ms':>12}{'Satır/sn (katkı)':>20}")
+    for n in args.rows:
+        part = X.iloc[:n]
+        start = time.perf_counter()
+        bundle.predictor.predict(part)
+        predict_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        _, contributions = explain(bundle.predictor, part)
+        top_factor_strings(contributions.to_numpy(), contributions.columns)
+        explain_ms = (time.perf_counter() - start) * 1000
+        print(f"   {n:>8,}{predict_ms:>12.1f}{explain_ms:>12.1f}{n / explain_ms * 1000:>20,.0f}")
+
+    part = X.iloc[:args.check_rows]
+    bias, contributions = explain(bundle.predictor, part)
+    expected = reference_contributions(bundle.model, part)
+    print(f"\n🔎 decision_path ile en büyük fark ({len(part)} satır): {np.abs(contributions.to_numpy() - expected).max():.2e}")
+    total = bias + contributions.to_numpy().sum(axis=1)
+    print(f"🔎 bias + katkılar - tahmin: {np.abs(total - bundle.model.predict(part)).max():.2e}")
+    print(f"   örnek: {top_factor_strings(contributions.to_numpy()[:1], contributions.columns)[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Çok süreçli sınıf CSV skorlayıcısının (src/logic/batch_cli.py) işçi sayısına göre ölçeklenmesi.
+Geçici bir klasöre sınıf dosyaları üretilir, her işçi sayısı için skorlanır ve sonuçların aynı olduğu doğrulanır.
+Eğitilmiş bir model gerekir (önce src/logic/ml_engine.py).
+
+Kullanım:
+    python benchmarks/bench_batch_cli.py [--files 200] [--rows 300] [--workers 1,2,4,8]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(root_dir)
+
+from src.logic.batch_cli import score_files
+from src.logic.data_balancer import generate_balanced_data
+
+
+def _write_classes(folder, files, rows):
+    df = generate_balanced_data(files * rows, seed=0).drop(columns=["exam_score"])
+    # Gerçek dosyalardaki gibi başlıklar farklı yazılmış olabilir
+    df.columns = [f" {c.title()} " for c in df.columns]
+    rng = np.random.default_rng(0)
+    for i in range(files):
+        # Sınıf mevcudu dosyadan dosyaya değişir
+        n = int(rng.integers(rows // 2, rows * 3 // 2))
+        df.sample(n, random_state=i).to_csv(os.path.join(folder, f"sinif_{i:04d}.csv"), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=300)
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}")
+    args = parser.parse_args()
+    worker_counts = sorted({int(w) for w in args.workers.split(",")})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = os.path.join(tmp, "siniflar")
+        os.makedirs(inputs)
+        _write_classes(inputs, args.files, args.rows)
+
+        timings, reference = {}, None
+        for workers in worker_counts:
+            output_dir = os.path.join(tmp, f"out_{workers}")
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                combined, failed = score_files([os.path.join(inputs, "*.csv")], output_dir, workers=workers)
+            timings[workers] = time.perf_counter() - start
+            assert combined is not None and not failed
+
+            summary = pd.read_csv(os.path.join(output_dir, "risk_summary.csv"))
+            if reference is None:
+                reference = summary
+            pd.testing.assert_frame_equal(summary, reference)
+
+        print(f"✅ Tüm işçi sayılarında risk özeti aynı ({combined.count:,} öğrenci, {args.files} dosya).")
+        print(f"\n📊 İşçi sayısına göre süre (CPU: {os.cpu_count()})")
+        base = timings[worker_counts[0]]
+        for workers, seconds in timings.items():
+            print(f"{workers:3d} işçi: {seconds:6.2f} sn  ({combined.count / seconds:,.0f} satır/sn, "
+                  f"{base / seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Dağılım kayması izlemesinin (src/logic/drift.py) skorlama yoluna maliyeti ve kaymayı yakalaması.
+- Tek öğrenci (dashboard / servis yolu) ve büyük parça (toplu analiz) için score_frame gecikmesi,
+  izleyici kapalı / açık,
+- Eğitim CSV'sinden (yoksa sentetik üreticiden) alınan ve kaydırılmış (devamsızlık, çalışma saati,
+  motivasyon) girdiler için özellik başına PSI.
+Eğitilmiş bir model gerekir (önce src/logic/ml_engine.py).
+
+Kullanım:
+    python benchmarks/bench_drift.py [--requests 2000] [--chunk 20000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(root_dir)
+
+from src.logic.batch_scoring import normalize_columns, score_frame
+from src.logic.data_balancer import generate_balanced_data
+from src.logic.drift import DriftMonitor, drift_status
+from src.logic.model_registry import load_bundle
+
+TRAINING_CSV = os.path.join(root_dir, "data", "student_performance_balanced.csv")
+
+
+def _timings(frames, bundle, monitor):
+    timings = []
+    for df in frames:
+        start = time.perf_counter()
+        score_frame(df.copy(), bundle.predictor, bundle.preprocessor, monitor)
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1000
+
+
+def _update_ms(frames, bundle):
+    # Sadece izleyicinin kendi süresi (kodlama ve predict hariç); makine gürültüsünden etkilenmez
+    monitor = DriftMonitor(bundle.drift_reference, bundle.version, flush_rows=float("inf"))
+    processed = [bundle.preprocessor.transform(df) for df in frames[:200]]
+    start = time.perf_counter()
+    for p in processed:
+        monitor.update(p)
+    return (time.perf_counter() - start) / len(processed) * 1000
+
+
+def _shifted(df):
+    df = df.copy()
+    # Dönem ortasında devamsızlığın arttığı ve çalışma saatinin düştüğü bir sınıf
+    df["attendance"] = (df["attendance"] - 20).clip(lower=0)
+    df["hours_studied"] = (df["hours_studied"] * 0.6).round()
+    df["motivation_level"] = np.where(np.random.default_rng(1).random(len(df)) < 0.6, "Low", df["motivation_level"])
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--chunk", type=int, default=20_000)
+    args = parser.parse_args()
+
+    bundle = load_bundle()
+    if bundle.drift_reference is None:
+        print("❌ Aktif model paketinde kayma referansı yok; modeli yeniden eğitin.")
+        return
+    rows = max(args.chunk, args.requests)
+    if os.path.exists(TRAINING_CSV):
+        data = normalize_columns(pd.read_csv(TRAINING_CSV))
+        data = data.sample(rows, replace=len(data) < rows, random_state=7).reset_index(drop=True)
+    else:
+        data = normalize_columns(generate_balanced_data(rows, seed=7))
+    data = data.drop(columns=["exam_score", "id"], errors="ignore")
+
+    singles = [data.iloc[[i]] for i in range(args.requests)]
+    chunks = [data.iloc[:args.chunk]] * 5
+    print("📊 score_frame gecikmesi (medyan)")
+    for label, frames in (("tek öğrenci", singles), (f"{args.chunk:,} satır", chunks)):
+        _timings(frames[:50], bundle, None)
+        off = _timings(frames, bundle, None)
+        monitor = DriftMonitor(bundle.drift_reference, bundle.version, flush_rows=float("inf"))
+        on = _timings(frames, bundle, monitor)
+        update = _update_ms(frames, bundle)
+        print(f"   {label:>13}: izleme kapalı {off:8.3f} ms, açık {on:8.3f} ms | izleyicinin kendi payı "
+              f"{update:.3f} ms ({update / off * 100:.2f}%)")
+
+    for label, df in (("Eğitim verisinden örneklem", data), ("Kaydırılmış veri", _shifted(data))):
+        monitor = DriftMonitor(bundle.drift_reference, bundle.version, flush_rows=float("inf"))
+        score_frame(df.copy(), bundle.predictor, bundle.preprocessor, monitor)
+        print(f"\n📉 {label} ({monitor.rows:,} satır), en yüksek PSI:")
+        for row in monitor.scores()[:4]:
+            ks = f", KS {row['ks']:.3f}" if row["ks"] is not None else ""
+            print(f"   {row['feature']:<22} PSI {row['psi']:.3f}{ks}  {drift_status(row['psi'], row['samples'])}")
+
+
+if __name__ == "__main__":
+    main()
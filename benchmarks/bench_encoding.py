@@ -0,0 +1,69 @@
+"""
+Toplu analizdeki eski hücre hücre kodlama ile FeatureEncoder'ın karşılaştırması.
+
+Kullanım:
+    python benchmarks/bench_encoding.py [--rows 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(root_dir)
+
+from src.logic.data_balancer import generate_balanced_data
+from src.logic.model_registry import load_bundle
+
+
+def _legacy_encode(df, encoders, expected_cols):
+    # Toplu analiz sayfasının eski yöntemi: her hücre için ayrı bir sklearn çağrısı
+    processed_df = df.copy()
+    for col, encoder in encoders.items():
+        if col in processed_df.columns:
+            processed_df[col] = processed_df[col].astype(str).apply(
+                lambda x: encoder.transform([x])[0] if x in encoder.classes_ else 0
+            )
+    for col in expected_cols:
+        if col not in processed_df.columns:
+            processed_df[col] = 0
+    return processed_df[expected_cols]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--legacy-rows", type=int, default=2_000,
+                        help="Eski yöntem bu kadar satırda ölçülüp satır başına süre hesaplanır")
+    args = parser.parse_args()
+
+    bundle = load_bundle()
+    df = generate_balanced_data(args.rows, seed=0).drop(columns=["exam_score"])
+    expected_cols = list(bundle.preprocessor.feature_names)
+
+    sample = df.iloc[:args.legacy_rows]
+    assert (_legacy_encode(sample, bundle.encoders, expected_cols).to_numpy()
+            == bundle.preprocessor.transform(sample).to_numpy()).all()
+    print("✅ Eski ve yeni kodlama birebir aynı.")
+
+    start = time.perf_counter()
+    _legacy_encode(sample, bundle.encoders, expected_cols)
+    legacy_ms = (time.perf_counter() - start) * 1000 * args.rows / len(sample)
+
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        bundle.preprocessor.transform(df)
+        timings.append((time.perf_counter() - start) * 1000)
+    new_ms = float(np.median(timings))
+
+    print(f"\n📊 {args.rows} satır kodlama süresi")
+    print(f"Eski (apply + transform, tahmini): {legacy_ms:,.0f} ms")
+    print(f"FeatureEncoder:                    {new_ms:,.1f} ms  ({legacy_ms / new_ms:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Satır satır get_ai_feedback ile vektörel get_ai_feedback_batch kural motorunun karşılaştırması.
+
+Kullanım:
+    python benchmarks/bench_feedback.py [--rows 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(root_dir)
+
+from src.logic.data_balancer import generate_balanced_data
+from src.utils.helpers import get_ai_feedback, get_ai_feedback_batch, advice_texts_for_db
+
+RESULT_COLUMNS = ["risk_label", "color", "icon", "title", "advice_code"]
+
+
+def _scalar(scores, df):
+    # Toplu kaydın eski yöntemi: her satır için ayrı bir get_ai_feedback çağrısı
+    return [get_ai_feedback(score, row) for score, (_, row) in zip(scores, df.iterrows())]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = generate_balanced_data(args.rows, seed=0)
+    # Model yerine gerçek notun gürültülü hali; tüm risk kademeleri ve senaryolar oluşur
+    scores = np.round(df.pop("exam_score").to_numpy() + np.random.default_rng(0).normal(0, 8, len(df)), 1)
+    # Eksik değer davranışı da karşılaştırılsın
+    df.loc[df.sample(frac=0.02, random_state=0).index, ["sleep_hours", "motivation_level"]] = np.nan
+
+    start = time.perf_counter()
+    expected = _scalar(scores, df)
+    scalar_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    batch = get_ai_feedback_batch(scores, df)
+    batch_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    texts = advice_texts_for_db(batch["advice_code"], df)
+    render_ms = (time.perf_counter() - start) * 1000
+
+    for col in RESULT_COLUMNS:
+        assert batch[col].tolist() == [f[col] for f in expected], col
+    assert texts == [f["final_text_for_db"] for f in expected]
+    print("✅ Satır satır ve vektörel sonuçlar birebir aynı.")
+
+    print(f"\n📊 {args.rows} satır kural motoru süresi")
+    print(f"get_ai_feedback (iterrows):        {scalar_ms:,.0f} ms")
+    print(f"get_ai_feedback_batch:             {batch_ms:,.1f} ms  ({scalar_ms / batch_ms:,.0f}x)")
+    print(f"  + kayıt metinleri (advice_texts): {render_ms:,.1f} ms  ({scalar_ms / (batch_ms + render_ms):,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+sklearn RandomForest.predict ile düz dizi (FlatForest) tahmincisinin gecikme karşılaştırması.
+
+Kullanım:
+    python benchmarks/bench_flat_forest.py [--repeats 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(root_dir)
+
+from src.logic.flat_forest import FlatForest
+from src.logic.ml_engine import FLAT_FOREST_DIR, MODEL_PATH, _build_model, load_training_split
+
+
+def _median_ms(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10_000])
+    args = parser.parse_args()
+
+    split = load_training_split()
+    if split is None:
+        return
+    X_train, X_test, y_train, _, _ = split
+
+    if os.path.exists(MODEL_PATH) and os.path.exists(FLAT_FOREST_DIR):
+        model = joblib.load(MODEL_PATH)
+        flat = FlatForest.load(FLAT_FOREST_DIR)
+    else:
+        print("ℹ️ Kayıtlı model bulunamadı, karşılaştırma için geçici bir model eğitiliyor...")
+        model = _build_model()
+        model.fit(X_train, y_train)
+        flat = FlatForest.from_model(model)
+
+    batch = X_test.sample(max(args.sizes), replace=True, random_state=0)
+
+    # Doğruluk kontrolü
+    diff = np.max(np.abs(model.predict(batch) - flat.predict(batch)))
+    print(f"✅ En büyük mutlak fark: {diff:.2e}")
+    assert np.allclose(model.predict(batch), flat.predict(batch), atol=1e-6)
+
+    print(f"\n📊 {flat.n_trees} ağaç, derinlik {flat.max_depth} (medyan gecikme, ms)")
+    print(f"{'Satır':>8}{'sklearn':>12}{'FlatForest':>14}{'hızlanma':>12}")
+    for size in args.sizes:
+        rows = batch.iloc[:size]
+        repeats = max(args.repeats // size, 3)
+        sk_ms = _median_ms(lambda: model.predict(rows), repeats)
+        ff_ms = _median_ms(lambda: flat.predict(rows), repeats)
+        print(f"{size:>8}{sk_ms:>12.3f}{ff_ms:>14.3f}{sk_ms / ff_ms:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
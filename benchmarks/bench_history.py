@@ -0,0 +1,116 @@
+"""
+Geçmiş sayfasının eski yöntemi (.all() + pandas) ile keyset sayfalama ve SQL toplamalarının karşılaştırması.
+Geçici bir SQLite veritabanı kullanılır; PostgreSQL gerekmez.
+
+Kullanım:
+    python benchmarks/bench_history.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(root_dir)
+
+from src.database.db_config import Base
+from src.database.models import Student, AIPrediction
+from src.database.crud import (get_prediction_history, get_prediction_summary, rebuild_daily_stats,
+                                _scan_prediction_summary)
+from src.utils.helpers import RISK_TIERS
+
+
+def _populate(db, rows, chunk=50_000):
+    rng = np.random.default_rng(0)
+    start_date = datetime(2024, 1, 1)
+    labels = np.array([tier[1] for tier in RISK_TIERS], dtype=object)
+    for start in range(0, rows, chunk):
+        n = min(chunk, rows - start)
+        ids = np.arange(start + 1, start + n + 1)
+        db.execute(insert(Student), [{"id": int(i), "first_name": "Öğrenci", "last_name": str(i)} for i in ids])
+        scores = rng.uniform(20, 100, n)
+        dates = [start_date + timedelta(minutes=int(m)) for m in rng.integers(0, 60 * 24 * 365, n)]
+        db.execute(insert(AIPrediction), [
+            {"student_id": int(i), "predicted_score": float(s), "risk_level": labels[k], "prediction_date": d,
+             "top_factors": "Toplu Analiz", "recommendation": "VELI: ..."}
+            for i, s, k, d in zip(ids, scores, rng.integers(0, len(labels), n), dates)
+        ])
+    db.commit()
+
+
+def _legacy_page(db):
+    # Eski yöntem: tüm birleşik tablo belleğe alınır, özetler pandas ile hesaplanır
+    results = db.query(
+        Student.first_name, Student.last_name, AIPrediction.predicted_score,
+        AIPrediction.risk_level, AIPrediction.prediction_date, AIPrediction.recommendation
+    ).join(AIPrediction).order_by(AIPrediction.prediction_date.desc()).all()
+    df = pd.DataFrame(results, columns=["Ad", "Soyad", "Tahmini Not", "Risk", "Tarih", "Öneri"])
+    df['Tarih'] = pd.to_datetime(df['Tarih']).dt.strftime('%d-%m-%Y %H:%M')
+    return len(df), df['Tahmini Not'].mean(), len(df[df['Risk'].str.contains("Yüksek") | df['Risk'].str.contains("Kritik")])
+
+
+def _timed(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'history.db')}")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+
+        print(f"⏳ {args.rows} tahmin kaydı oluşturuluyor...")
+        _populate(db, args.rows)
+        start = time.perf_counter()
+        groups = rebuild_daily_stats(db)
+        print(f"📅 Günlük özet geri dolduruldu: {groups} grup ({(time.perf_counter() - start) * 1000:,.0f} ms)")
+
+        # Derin bir sayfanın imleci (sayfa ~ rows / 2)
+        middle = db.execute(
+            select(AIPrediction.prediction_date, AIPrediction.id)
+            .order_by(AIPrediction.prediction_date.desc(), AIPrediction.id.desc())
+            .offset(args.rows // 2).limit(1)
+        ).one()
+
+        legacy, legacy_ms = _timed(lambda: _legacy_page(db), repeat=1)
+        scan, scan_ms = _timed(lambda: _scan_prediction_summary(db))
+        summary, summary_ms = _timed(lambda: get_prediction_summary(db))
+        _, first_ms = _timed(lambda: get_prediction_history(db))
+        _, deep_ms = _timed(lambda: get_prediction_history(db, after=tuple(middle)))
+        _, filtered_ms = _timed(lambda: get_prediction_history(db, risk_levels=["Yüksek Risk"], after=tuple(middle)))
+
+        assert legacy[0] == summary["total"] and legacy[2] == summary["risky"]
+        assert abs(legacy[1] - summary["mean_score"]) < 1e-6
+        assert scan["total"] == summary["total"] and abs(scan["std_score"] - summary["std_score"]) < 1e-6
+        print("✅ Eski yöntem, SQL taraması ve günlük özet tablosu aynı metrikleri veriyor.")
+
+        print(f"\n📊 {args.rows} kayıtta geçmiş sayfası")
+        print(f"Eski (.all() + pandas):         {legacy_ms:,.0f} ms")
+        print(f"SQL özet (tahmin taraması):     {scan_ms:,.1f} ms")
+        print(f"SQL özet (günlük özet tablosu): {summary_ms:,.2f} ms")
+        print(f"İlk sayfa (keyset):             {first_ms:,.2f} ms")
+        print(f"Orta sayfa (keyset):            {deep_ms:,.2f} ms")
+        print(f"Orta sayfa + risk filtresi:     {filtered_ms:,.2f} ms")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
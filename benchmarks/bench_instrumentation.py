@@ -0,0 +1,89 @@
+"""
+Aşama ölçümlerinin (src/utils/instrumentation.py) maliyeti:
+- boş döngü, kapalı stage() ve açık stage() için çağrı başına ek süre (ns),
+- tek öğrencilik kodlama + predict yolunun ölçüm kapalı / açıkken gecikmesi (eğitilmiş model gerekir).
+Sonunda açık ölçümün Prometheus çıktısından bir kesit yazdırılır.
+
+Kullanım:
+    python benchmarks/bench_instrumentation.py [--calls 1000000] [--requests 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(root_dir)
+
+from src.utils import instrumentation
+from src.utils.instrumentation import stage
+
+
+def _per_call_ns(calls, use_stage):
+    start = time.perf_counter()
+    if use_stage:
+        for _ in range(calls):
+            with stage("bench.empty", rows=1):
+                pass
+    else:
+        for _ in range(calls):
+            pass
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def _single_request_ms(requests, bundle, record):
+    from src.logic.batch_scoring import normalize_columns, score_frame
+    import pandas as pd
+
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        score_frame(normalize_columns(pd.DataFrame([record])), bundle.predictor, bundle.preprocessor)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000, timings[int(len(timings) * 0.99)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    instrumentation.disable()
+    baseline = _per_call_ns(args.calls, use_stage=False)
+    disabled = _per_call_ns(args.calls, use_stage=True)
+    instrumentation.enable()
+    enabled = _per_call_ns(args.calls, use_stage=True)
+    instrumentation.reset()
+
+    print(f"📊 stage() çağrı başına maliyet ({args.calls:,} çağrı)")
+    print(f"   boş döngü:       {baseline:7.0f} ns")
+    print(f"   ölçüm kapalı:    {disabled - baseline:7.0f} ns ek")
+    print(f"   ölçüm açık:      {enabled - baseline:7.0f} ns ek")
+
+    from src.logic.data_balancer import generate_balanced_data
+    from src.logic.model_registry import load_bundle
+    try:
+        bundle = load_bundle()
+    except FileNotFoundError:
+        print("\n⚠️ Model bulunamadı; uçtan uca ölçüm atlandı (önce src/logic/ml_engine.py).")
+        return
+    record = generate_balanced_data(1, seed=0).drop(columns=["exam_score"]).iloc[0].to_dict()
+
+    instrumentation.disable()
+    _single_request_ms(100, bundle, record)
+    off_p50, off_p99 = _single_request_ms(args.requests, bundle, record)
+    instrumentation.enable()
+    on_p50, on_p99 = _single_request_ms(args.requests, bundle, record)
+
+    print(f"\n📊 Tek öğrenci (kodlama + predict), {args.requests:,} istek")
+    print(f"   ölçüm kapalı:    p50 {off_p50:6.3f} ms, p99 {off_p99:6.3f} ms")
+    print(f"   ölçüm açık:      p50 {on_p50:6.3f} ms, p99 {on_p99:6.3f} ms")
+    print("\n" + "\n".join(line for line in instrumentation.export_prometheus().splitlines()
+                            if line.startswith("eduanalytix_stage_duration_seconds_count")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Skorlama servisi için yük üreticisi. Eşzamanlı istemciler (keep-alive bağlantılı thread'ler) tek öğrenci
+istekleri gönderir; istemci tarafı p50/p99 gecikme, verim ve servisin /stats çıktısı raporlanır.
+--url verilmezse servis bu süreçte başlatılır ve mikro gruplama kapalı (grup = 1) haliyle de karşılaştırılır.
+Eğitilmiş bir model gerekir (önce src/logic/ml_engine.py).
+
+Kullanım:
+    python benchmarks/bench_scoring_service.py [--requests 5000] [--concurrency 32] [--max-batch 64] [--max-wait-ms 5]
+    python main.py serve &  python benchmarks/bench_scoring_service.py --url http://127.0.0.1:8765
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(root_dir)
+
+from src.logic.data_balancer import generate_balanced_data
+from src.logic.model_registry import ModelServer
+from src.logic.scoring_service import create_server
+
+
+def _records(n):
+    df = generate_balanced_data(n, seed=0).drop(columns=["exam_score"])
+    return df.to_dict("records")
+
+
+def _client(host, port, bodies, latencies, results, lock, cursor):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        while True:
+            with lock:
+                i = cursor[0]
+                cursor[0] += 1
+            if i >= len(bodies):
+                return
+            start = time.perf_counter()
+            conn.request("POST", "/predict", body=bodies[i], headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            payload = json.loads(response.read())
+            latencies[i] = time.perf_counter() - start
+            if response.status != 200:
+                raise RuntimeError(payload)
+            results[i] = payload["score"]
+    finally:
+        conn.close()
+
+
+def run_load(url, records, concurrency):
+    """Tüm kayıtları concurrency adet istemciyle gönderir; (süre, gecikmeler, skorlar) döndürür."""
+    parts = urlsplit(url)
+    bodies = [json.dumps(record).encode("utf-8") for record in records]
+    latencies = np.zeros(len(bodies))
+    results = np.zeros(len(bodies))
+    lock, cursor = threading.Lock(), [0]
+    threads = [threading.Thread(target=_client, args=(parts.hostname, parts.port, bodies, latencies, results,
+                                                      lock, cursor))
+               for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies * 1000, results
+
+
+def _server_stats(url):
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+    try:
+        conn.request("GET", "/stats")
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+def _report(label, seconds, latencies, stats):
+    print(f"\n{label}")
+    print(f"  Verim:         {len(latencies) / seconds:,.0f} istek/sn ({seconds:.2f} sn)")
+    print(f"  İstemci p50:   {np.percentile(latencies, 50):.1f} ms   p99: {np.percentile(latencies, 99):.1f} ms")
+    print(f"  Servis p50:    {stats['p50_ms']:.1f} ms   p99: {stats['p99_ms']:.1f} ms   "
+          f"ort. grup: {stats['mean_batch_size']:.1f}")
+
+
+def _run_local(records, concurrency, max_batch, max_wait_ms, model_server):
+    server = create_server("127.0.0.1", 0, max_batch=max_batch, max_wait_ms=max_wait_ms, model_server=model_server)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        seconds, latencies, scores = run_load(url, records, concurrency)
+        return seconds, latencies, scores, _server_stats(url)
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None, help="Çalışan bir servisin adresi (verilmezse süreç içinde başlatılır)")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    records = _records(args.requests)
+    print(f"📊 {args.requests} istek, {args.concurrency} eşzamanlı istemci")
+
+    if args.url:
+        seconds, latencies, _ = run_load(args.url, records, args.concurrency)
+        _report(f"Servis: {args.url}", seconds, latencies, _server_stats(args.url))
+        return
+
+    model_server = ModelServer()
+    bundle = model_server.current()
+    if bundle is None:
+        print("🚨 Model dosyaları bulunamadı! Lütfen önce 'ml_engine.py' dosyasını çalıştırın.")
+        return
+
+    # Servisin sonucu doğrudan toplu tahminle aynı olmalı
+    expected = np.round(bundle.predictor.predict(bundle.preprocessor.transform(pd.DataFrame(records))), 1)
+
+    for label, max_batch in (("Mikro gruplama kapalı (grup = 1)", 1),
+                             (f"Mikro gruplama (en fazla {args.max_batch} satır / {args.max_wait_ms:g} ms)",
+                              args.max_batch)):
+        seconds, latencies, scores, stats = _run_local(records, args.concurrency, max_batch, args.max_wait_ms,
+                                                       model_server)
+        assert np.allclose(scores, expected), "Servis skorları toplu tahminle uyuşmuyor"
+        _report(label, seconds, latencies, stats)
+    print("\n✅ Servis skorları doğrudan toplu tahminle aynı.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Soğuk açılış ölçümü: her hedef yeni bir Python sürecinde "python -X importtime" ile çalıştırılır.
+- main.py --help: yönetim komutlarının import maliyeti
+- dashboard: Streamlit AppTest ile ilk sayfanın (Analiz) ilk çizimi; script çalışırken import edilen
+  en pahalı modüller listelenir (plotly, sqlalchemy gibi modüller burada görünmemeli)
+Sınır değerleri verilirse (--max-*-ms) aşıldığında çıkış kodu 1 olur; CI'da gerilemeleri yakalamak için.
+
+Kullanım:
+    python benchmarks/bench_startup.py [--repeat 3] [--max-main-ms 300] [--max-render-ms 1500]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+
+READY_MARKER = "--bench-ready--"
+RENDER_MARKER = "--bench-render--"
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+DASHBOARD_SNIPPET = f"""
+import sys, time
+from streamlit.testing.v1 import AppTest
+print("{READY_MARKER}", file=sys.stderr, flush=True)
+start = time.perf_counter()
+at = AppTest.from_file("src/ui/dashboard.py", default_timeout=120).run()
+elapsed = time.perf_counter() - start
+assert not at.exception, at.exception
+print("{RENDER_MARKER}", elapsed, file=sys.stderr, flush=True)
+"""
+
+
+def parse_imports(stderr, after=None):
+    """importtime çıktısından üst seviye modülleri [(modül, kümülatif ms)] olarak döndürür."""
+    lines = stderr.splitlines()
+    if after is not None:
+        lines = lines[next(i for i, line in enumerate(lines) if line.startswith(after)) + 1:]
+    top_level = []
+    for line in lines:
+        match = IMPORT_LINE.match(line)
+        # Girinti bir boşluk: doğrudan import edilen (üst seviye) modül
+        if match and len(match.group(3)) == 1:
+            top_level.append((match.group(4), int(match.group(2)) / 1000))
+    return top_level
+
+
+def run_target(args):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=root_dir,
+                            capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return wall_ms, result.stderr
+
+
+def measure_main(repeat):
+    runs = [run_target(["main.py", "--help"]) for _ in range(repeat)]
+    wall_ms, stderr = min(runs, key=lambda r: r[0])
+    imports = parse_imports(stderr)
+    return wall_ms, sum(ms for _, ms in imports), imports
+
+
+def measure_dashboard(repeat):
+    runs = []
+    for _ in range(repeat):
+        _, stderr = run_target(["-c", DASHBOARD_SNIPPET])
+        render_line = next(line for line in stderr.splitlines() if line.startswith(RENDER_MARKER))
+        runs.append((float(render_line.split()[1]) * 1000, stderr))
+    render_ms, stderr = min(runs, key=lambda r: r[0])
+    return render_ms, parse_imports(stderr, after=READY_MARKER)
+
+
+def _print_top(imports, n=8):
+    for name, ms in sorted(imports, key=lambda x: -x[1])[:n]:
+        print(f"      {ms:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-main-ms", type=float, default=None)
+    parser.add_argument("--max-render-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    main_wall, main_imports_ms, main_imports = measure_main(args.repeat)
+    render_ms, render_imports = measure_dashboard(args.repeat)
+
+    print(f"📊 Soğuk açılış (en iyi {args.repeat} çalıştırma)")
+    print(f"\nmain.py --help:      {main_wall:8.1f} ms (süreç), {main_imports_ms:.1f} ms import")
+    _print_top(main_imports)
+    print(f"\ndashboard ilk çizim: {render_ms:8.1f} ms, "
+          f"{sum(ms for _, ms in render_imports):.1f} ms import (script sırasında)")
+    _print_top(render_imports)
+
+    failed = []
+    if args.max_main_ms is not None and main_wall > args.max_main_ms:
+        failed.append(f"main.py --help {main_wall:.0f} ms > {args.max_main_ms:.0f} ms")
+    if args.max_render_ms is not None and render_ms > args.max_render_ms:
+        failed.append(f"dashboard ilk çizim {render_ms:.0f} ms > {args.max_render_ms:.0f} ms")
+    if failed:
+        print("\n❌ Açılış süresi sınırı aşıldı: " + "; ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
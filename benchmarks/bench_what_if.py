@@ -0,0 +1,68 @@
+"""
+"Ne olurdu?" analizinin (src/logic/what_if.py) gecikmesi:
+- faktör sayısına göre ızgara boyutu ve tek predict çağrısıyla skorlama süresi,
+- aynı ızgaranın varyant başına ayrı predict çağrılarıyla tahmini süresi (örneklemden),
+- en küçük değişiklik sıralamasının süresi.
+Eğitilmiş model gerekir (önce src/logic/ml_engine.py).
+
+Kullanım:
+    python benchmarks/bench_what_if.py [--repeat 5] [--loop-sample 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(root_dir)
+
+from src.logic import what_if
+
+
+def _best_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--loop-sample", type=int, default=200)
+    args = parser.parse_args()
+
+    from src.logic.data_balancer import generate_balanced_data
+    from src.logic.model_registry import load_bundle
+    try:
+        bundle = load_bundle()
+    except FileNotFoundError:
+        print("⚠️ Model bulunamadı; önce src/logic/ml_engine.py çalıştırılmalı.")
+        return
+    student = generate_balanced_data(1, seed=0).drop(columns=["exam_score"])
+    row = bundle.preprocessor.transform(student)
+    factors = list(what_if.ADJUSTABLE_FACTORS)
+
+    print(f"📊 Tek öğrenci için senaryo ızgarası (en iyi {args.repeat} çalıştırma)")
+    print(f"   {'Faktör':>6}{'Senaryo':>10}{'Toplu ms':>11}{'Tek tek ms (tahmini)':>24}{'Sıralama ms':>14}")
+    for n in range(1, len(factors) + 1):
+        chosen = factors[:n]
+        batched = _best_ms(lambda: what_if.explore(bundle.model, row, chosen), args.repeat)
+        result = what_if.explore(bundle.model, row, chosen)
+        variants = what_if.build_variants(row, result.axes)
+        # Varyant başına predict: örneklemin ortalaması ızgara boyutuyla çarpılır
+        sample = min(args.loop_sample, len(variants))
+        start = time.perf_counter()
+        for i in range(sample):
+            bundle.model.predict(variants.iloc[[i]])
+        looped = (time.perf_counter() - start) / sample * len(variants) * 1000
+        target = what_if.next_target(what_if.base_score(result)) or what_if.HIGH_RISK_THRESHOLD
+        ranking = _best_ms(lambda: what_if.smallest_changes(result, target), args.repeat)
+        print(f"   {n:>6}{result.scores.size:>10,}{batched:>11.1f}{looped:>24,.0f}{ranking:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,103 @@
-from src.database.db_config import init_db
+import argparse
+
+# Alt komutların bağımlılıkları (SQLAlchemy, model, HTTP servisi) sadece o komut çalışırken import edilir;
+# böylece örn. "serve" veritabanı katmanını hiç yüklemez.
+
+
+def backfill_stats():
+    """Günlük tahmin özet tablosunu mevcut kayıtlardan yeniden hesaplar."""
+    from src.database.db_config import SessionLocal
+    from src.database.crud import rebuild_daily_stats
+
+    db = SessionLocal()
+    try:
+        groups = rebuild_daily_stats(db)
+        print(f"✅ Günlük özet tablosu yeniden oluşturuldu ({groups} gün/risk grubu).")
+    finally:
+        db.close()
+
+
+def rescore(args):
+    """Veritabanındaki öğrencileri (varsayılan: aktif) model sürümüyle yeniden skorlar."""
+    from src.logic.rescore import rescore_students
+    from src.utils.instrumentation import print_summary
+
+    rescore_students(args.version, args.chunk_size, args.workers, args.checkpoint, args.restart)
+    print_summary()
+
+
+def import_scores(args):
+    """CSV'deki gerçek sınav notlarını (student_id/id + exam_score) öğrencilere yazar; artımlı eğitim bunları alır."""
+    import pandas as pd
+    from src.database.db_config import SessionLocal, ensure_columns, ensure_indexes
+    from src.database.crud import record_exam_scores
+
+    df = pd.read_csv(args.csv)
+    df.columns = df.columns.str.strip().str.lower()
+    id_column = "student_id" if "student_id" in df.columns else "id"
+    if id_column not in df.columns or "exam_score" not in df.columns:
+        print("❌ HATA: CSV'de 'student_id' (veya 'id') ve 'exam_score' sütunları olmalı.")
+        return
+    # updated_at sütunu eski veritabanlarında yoksa eklenir
+    ensure_columns()
+    ensure_indexes()
+    db = SessionLocal()
+    try:
+        updated = record_exam_scores(db, df[id_column], df["exam_score"])
+    finally:
+        db.close()
+    print(f"✅ {updated} öğrencinin gerçek notu kaydedildi ({len(df) - updated} satır atlandı).")
+
+
+def initialize():
+    from src.database.db_config import init_db, SessionLocal
 
-if __name__ == "__main__":
     print("Sistem başlatılıyor...")
     init_db()
+
+    # Özet tablosu sonradan eklendiyse eski tahminler bir kez geri doldurulur
+    from src.database.crud import daily_stats_need_backfill
+    db = SessionLocal()
+    try:
+        needs_backfill = daily_stats_need_backfill(db)
+    finally:
+        db.close()
+    if needs_backfill:
+        backfill_stats()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EduAnalytix yönetim komutları")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("init", help="Tabloları ve indeksleri oluşturur (varsayılan)")
+    sub.add_parser("backfill-stats", help="Günlük tahmin özetini mevcut kayıtlardan yeniden hesaplar")
+    serve_parser = sub.add_parser("serve", help="Arayüzsüz (HTTP/JSON) mikro gruplamalı skorlama servisini başlatır")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--max-batch", type=int, default=64, help="Bir predict çağrısındaki en fazla satır")
+    serve_parser.add_argument("--max-wait-ms", type=float, default=5.0,
+                              help="Grubun dolması için ilk istekten itibaren beklenecek en uzun süre")
+    serve_parser.add_argument("--report-interval", type=float, default=10.0,
+                              help="p50/p99 ve verim özetinin basılma aralığı (sn, 0 = kapalı)")
+    rescore_parser = sub.add_parser("rescore", help="Kayıtlı öğrencileri yeni model sürümüyle yeniden skorlar")
+    rescore_parser.add_argument("--version", default=None, help="Model sürümü (varsayılan: aktif sürüm)")
+    rescore_parser.add_argument("--chunk-size", type=int, default=5000)
+    rescore_parser.add_argument("--workers", type=int, default=1,
+                                help="Paralel süreç sayısı (SQLite'ta yazımlar sıralanır)")
+    rescore_parser.add_argument("--checkpoint", default=None, help="İlerleme dosyası (varsayılan: models/ altında)")
+    rescore_parser.add_argument("--restart", action="store_true", help="Checkpoint'i yok sayıp baştan tara")
+    scores_parser = sub.add_parser("import-scores", help="Açıklanan gerçek sınav notlarını CSV'den öğrencilere yazar")
+    scores_parser.add_argument("csv", help="student_id (veya id) ve exam_score sütunlu CSV dosyası")
+    args = parser.parse_args()
+
+    if args.command == "backfill-stats":
+        backfill_stats()
+    elif args.command == "rescore":
+        rescore(args)
+    elif args.command == "import-scores":
+        import_scores(args)
+    elif args.command == "serve":
+        from src.logic.scoring_service import serve
+        serve(args.host, args.port, args.max_batch, args.max_wait_ms, args.report_interval)
+    else:
+        initialize()
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+import pandas as pd
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.database import crud
+from src.database.db_config import _engine_options, _env_int, get_database_url
+from src.database.models import Student, AIPrediction, TrainingData
+
+# db_config.py'nin asyncio karşılığı: aynı DATABASE_URL / POSTGRES_* ve DB_* ayarlarını kullanır,
+# sadece sürücü asenkron olanla değiştirilir (PostgreSQL: asyncpg, SQLite: aiosqlite).
+# Bir AsyncSession aynı anda tek bir görev (task) tarafından kullanılmalıdır; eşzamanlı istekler
+# her biri kendi oturumunu açar, bağlantılar motorun havuzundan paylaşılır.
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+_async_engine = None
+_async_engine_lock = threading.Lock()
+_async_session_factory = async_sessionmaker(expire_on_commit=False, autoflush=False)
+# SQLite aynı anda tek yazara izin verir; çok sayıda görev kilit için yarışınca busy_timeout dolabilir.
+# Bu yüzden SQLite'ta yazma işlemleri süreç içinde sıraya alınır, okumalar eşzamanlı kalır.
+_sqlite_write_lock = None
+
+# Eğitim verisinde modele girmeyen sütunlar (ml_engine ile aynı)
+TRAINING_COLUMNS = [c for c in TrainingData.__table__.columns if c.name not in ("id", "row_hash")]
+DEFAULT_TRAINING_CHUNK = 50_000
+
+
+def get_async_database_url(url=None):
+    """Senkron bağlantı adresindeki sürücüyü asenkron karşılığıyla değiştirir."""
+    url = make_url(url or get_database_url())
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Asenkron erişim için desteklenmeyen veritabanı: {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def _build_async_engine(url):
+    options, on_connect = _engine_options(url.render_as_string(hide_password=False))
+    statement_timeout = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    if statement_timeout and url.get_backend_name() == "postgresql":
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(statement_timeout)}}
+
+    engine = create_async_engine(url, **options)
+    if on_connect is not None:
+        # PRAGMA'lar aiosqlite bağlantısında da senkron motordaki gibi uygulanır
+        event.listen(engine.sync_engine, "connect", on_connect)
+    return engine
+
+
+def get_async_engine():
+    """Süreç başına tek asenkron motoru ilk çağrıda oluşturur."""
+    global _async_engine, _sqlite_write_lock
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                engine = _build_async_engine(get_async_database_url())
+                _async_session_factory.configure(bind=engine)
+                _sqlite_write_lock = asyncio.Lock() if engine.dialect.name == "sqlite" else None
+                _async_engine = engine
+    return _async_engine
+
+
+async def dispose_async_engine():
+    """Havuzdaki bağlantıları kapatır; bir sonraki get_async_engine() ortam değişkenlerini yeniden okur."""
+    global _async_engine
+    engine, _async_engine = _async_engine, None
+    if engine is not None:
+        await engine.dispose()
+
+
+def AsyncSessionLocal(**kwargs) -> AsyncSession:
+    """Motor hazır değilse oluşturup yeni bir AsyncSession döndürür (async with ile kullanılır)."""
+    get_async_engine()
+    return _async_session_factory(**kwargs)
+
+
+@asynccontextmanager
+async def _writing():
+    """SQLite'ta yazma işlemini sıraya alır; PostgreSQL'de bir şey yapmaz."""
+    lock = _sqlite_write_lock
+    if lock is None:
+        yield
+        return
+    async with lock:
+        yield
+
+
+# --- Öğrenci ve tahmin işlemleri ---
+# Kayıt ve sorgu mantığı crud.py ile aynı kalsın diye senkron fonksiyonlar run_sync ile çalıştırılır;
+# SQL çağrıları yine asenkron sürücü üzerinden yapılır, olay döngüsü (event loop) bloklanmaz.
+
+async def save_student_prediction(db: AsyncSession, student_data, score, feedback, top_factors, model_version=None):
+    """Tek öğrenciyi ve tahminini aynı işlemde kaydeder (bkz. crud.save_student_prediction)."""
+    async with _writing():
+        return await db.run_sync(crud.save_student_prediction, student_data, score, feedback, top_factors,
+                                 model_version)
+
+
+async def bulk_save_batch_results(db: AsyncSession, frames, chunk_size=crud.DEFAULT_BULK_CHUNK,
+                                  progress_callback=None, top_factors="Toplu Analiz", model_version=None):
+    """Toplu analiz sonuçlarını tek işlemde kaydeder (bkz. crud.bulk_save_batch_results)."""
+    async with _writing():
+        return await db.run_sync(crud.bulk_save_batch_results, frames, chunk_size=chunk_size,
+                                 progress_callback=progress_callback, top_factors=top_factors,
+                                 model_version=model_version)
+
+
+async def get_prediction_history(db: AsyncSession, page_size=crud.HISTORY_PAGE_SIZE, after=None, **filters):
+    """Tahmin geçmişinin bir sayfası ve sonraki imleç (bkz. crud.get_prediction_history)."""
+    return await db.run_sync(crud.get_prediction_history, page_size=page_size, after=after, **filters)
+
+
+async def get_prediction_summary(db: AsyncSession, **filters):
+    """Geçmiş sayfası özet metrikleri (bkz. crud.get_prediction_summary)."""
+    return await db.run_sync(crud.get_prediction_summary, **filters)
+
+
+async def get_student(db: AsyncSession, student_id):
+    return await db.get(Student, student_id)
+
+
+async def get_student_predictions(db: AsyncSession, student_id):
+    """Bir öğrencinin tahminlerini en yeniden eskiye döndürür."""
+    result = await db.scalars(
+        select(AIPrediction)
+        .where(AIPrediction.student_id == student_id)
+        .order_by(AIPrediction.prediction_date.desc(), AIPrediction.id.desc())
+    )
+    return result.all()
+
+
+# --- Eğitim verisi ---
+
+async def count_training_data(db: AsyncSession):
+    return await db.scalar(select(func.count()).select_from(TrainingData))
+
+
+async def iter_training_data(db: AsyncSession, chunksize=DEFAULT_TRAINING_CHUNK):
+    """training_data tablosunu sunucu taraflı imleçle DataFrame parçaları halinde akıtır (async for)."""
+    result = await db.stream(
+        select(*TRAINING_COLUMNS).order_by(TrainingData.id).execution_options(yield_per=chunksize)
+    )
+    keys = list(result.keys())
+    async for partition in result.partitions():
+        yield pd.DataFrame(partition, columns=keys)
@@ -0,0 +1,459 @@
+import json
+import math
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Integer, case, delete, exists, func, insert, or_, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from src.database.models import Student, AIPrediction, PredictionDailyStat, FeatureDrift
+from src.utils.helpers import get_ai_feedback_batch, advice_texts_for_db
+from src.utils.instrumentation import stage
+
+# Toplu kayıtta tek INSERT ifadesine giren satır sayısı
+DEFAULT_BULK_CHUNK = 1000
+
+# id dışındaki tüm öğrenci sütunları (bir kez hesaplanır)
+STUDENT_COLUMNS = [c for c in Student.__table__.columns if c.name != "id"]
+
+# Geçmiş sayfasında bir seferde gösterilen kayıt sayısı
+HISTORY_PAGE_SIZE = 50
+HISTORY_COLUMNS = [
+    AIPrediction.id, Student.first_name, Student.last_name, AIPrediction.predicted_score,
+    AIPrediction.risk_level, AIPrediction.prediction_date, AIPrediction.top_factors, AIPrediction.recommendation,
+]
+
+
+def save_student_prediction(db: Session, student_data, score, feedback, top_factors, model_version=None):
+    """Tek öğrenciyi ve tahminini aynı işlemde (transaction) kaydeder."""
+    try:
+        new_student = Student(**student_data)
+        db.add(new_student)
+        db.flush()
+
+        prediction_date = datetime.utcnow()
+        db.add(AIPrediction(
+            student_id=new_student.id,
+            prediction_date=prediction_date,
+            predicted_score=float(score),
+            risk_level=feedback['risk_label'],
+            top_factors=top_factors,
+            recommendation=feedback['final_text_for_db'],
+            model_version=model_version
+        ))
+        update_daily_stats(db, [prediction_date], [feedback['risk_label']], [float(score)])
+        with stage("db.commit", rows=1):
+            db.commit()
+        return new_student.id
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _student_frame(df, start_number):
+    """DataFrame parçasını Student tablosunun sütunlarına çevirir (NaN -> None)."""
+    columns = {}
+    for col in STUDENT_COLUMNS:
+        if col.name in ("first_name", "last_name") or col.name not in df.columns:
+            continue
+        values = df[col.name]
+        if isinstance(col.type, Integer):
+            values = pd.to_numeric(values, errors="coerce").round().astype("Int64")
+        else:
+            values = values.where(values.isna(), values.astype(str))
+        columns[col.name] = values.astype(object).where(values.notna(), None)
+
+    numbers = np.arange(start_number + 1, start_number + len(df) + 1).astype(str)
+    first = df["first_name"].astype(str) if "first_name" in df.columns else pd.Series("Öğrenci", index=df.index)
+    last = df["last_name"].astype(str) if "last_name" in df.columns else pd.Series(numbers, index=df.index)
+    columns["first_name"] = first
+    columns["last_name"] = last
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _insert_predictions(db: Session, student_ids, students, scored, prediction_date, top_factors, model_version):
+    """
+    Skorlanmış bir parçanın (Tahmini_Not, Risk_Durumu ve varsa Etkili_Faktorler sütunları) tahminlerini toplu ekler.
+    students: kural motorunun kullandığı öğrenci sütunları (ad, soyad ve faktörler), scored ile aynı sırada.
+    """
+    # Kural motoru kaydedilen değerler üzerinde tek geçişte çalışır; metin sadece kayıt için üretilir
+    scores = scored['Tahmini_Not'].to_numpy()
+    with stage("feedback", rows=len(scored)):
+        feedback = get_ai_feedback_batch(scores, students)
+        recommendations = advice_texts_for_db(feedback['advice_code'], students)
+    predictions = pd.DataFrame({
+        "student_id": student_ids,
+        "prediction_date": prediction_date,
+        "predicted_score": scores.astype(float),
+        "risk_level": scored['Risk_Durumu'].to_numpy(),
+        "top_factors": (scored['Etkili_Faktorler'].to_numpy() if 'Etkili_Faktorler' in scored.columns
+                        else top_factors),
+        "recommendation": recommendations,
+        "model_version": model_version,
+    })
+    with stage("db.insert_predictions", rows=len(scored)):
+        db.execute(insert(AIPrediction), predictions.to_dict("records"))
+        update_daily_stats(db, predictions["prediction_date"], predictions["risk_level"],
+                           predictions["predicted_score"])
+
+
+def bulk_save_batch_results(db: Session, frames, chunk_size=DEFAULT_BULK_CHUNK, progress_callback=None,
+                            top_factors="Toplu Analiz", model_version=None):
+    """
+    Toplu analiz sonuçlarını (Tahmini_Not ve Risk_Durumu sütunlu DataFrame parçaları) tek işlemde kaydeder.
+    Öğrenciler büyük gruplar halinde INSERT ... RETURNING id ile eklenir, tahminler ardından toplu eklenir.
+    progress_callback(kaydedilen_satır_sayısı) her grup sonrası çağrılır. Kaydedilen toplam satırı döndürür.
+    Parçalarda Etkili_Faktorler sütunu varsa öğrenci başına faktörler, yoksa top_factors sabiti kaydedilir.
+    """
+    saved = 0
+    student_insert = insert(Student).returning(Student.id, sort_by_parameter_order=True)
+    prediction_date = datetime.utcnow()
+    try:
+        for df in frames:
+            for start in range(0, len(df), chunk_size):
+                part = df.iloc[start:start + chunk_size]
+                students = _student_frame(part, saved)
+                with stage("db.insert_students", rows=len(part)):
+                    student_ids = db.execute(student_insert, students.to_dict("records")).scalars().all()
+                _insert_predictions(db, student_ids, students, part, prediction_date, top_factors, model_version)
+
+                saved += len(part)
+                if progress_callback is not None:
+                    progress_callback(saved)
+        with stage("db.commit", rows=saved):
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return saved
+
+
+def _rescore_conditions(model_version, after_id=None, upto_id=None):
+    # Bu sürümle tahmini olan öğrenciler atlanır (ix_ai_predictions_model_version_student üzerinden)
+    conditions = [~exists().where(AIPrediction.student_id == Student.id, AIPrediction.model_version == model_version)]
+    if after_id is not None:
+        conditions.append(Student.id > after_id)
+    if upto_id is not None:
+        conditions.append(Student.id <= upto_id)
+    return conditions
+
+
+def count_students_to_rescore(db: Session, model_version, after_id=None):
+    """model_version ile henüz skorlanmamış öğrenci sayısı."""
+    return db.scalar(select(func.count()).select_from(Student).where(*_rescore_conditions(model_version, after_id)))
+
+
+def rescore_chunk_bound(db: Session, model_version, after_id, chunk_size):
+    """
+    after_id'den sonra skorlanacak ilk chunk_size öğrencinin en büyük id'si (id sırasıyla, keyset).
+    Daha az öğrenci kaldıysa sonuncusunun id'si, hiç kalmadıysa None döner. Parçalar (after_id, sınır] aralıklarıdır.
+    """
+    ids = (select(Student.id).where(*_rescore_conditions(model_version, after_id))
+           .order_by(Student.id).limit(chunk_size).subquery())
+    return db.scalar(select(func.max(ids.c.id)))
+
+
+def get_students_to_rescore(db: Session, model_version, after_id=None, upto_id=None):
+    """(after_id, upto_id] aralığındaki, model_version ile skorlanmamış öğrencileri id sırasıyla DataFrame olarak döndürür."""
+    columns = [Student.id, *STUDENT_COLUMNS]
+    query = select(*columns).where(*_rescore_conditions(model_version, after_id, upto_id)).order_by(Student.id)
+    rows = db.execute(query).all()
+    return pd.DataFrame.from_records(rows, columns=[c.name for c in columns])
+
+
+def save_rescored_predictions(db: Session, students, scored, model_version):
+    """
+    Yeniden skorlanan öğrencilerin tahminlerini model_version etiketiyle ekler ve işlemi tamamlar.
+    students: get_students_to_rescore çıktısı, scored: aynı satırların skorlanmış hali. Eklenen satırı döndürür.
+    """
+    try:
+        _insert_predictions(db, students["id"].tolist(), students, scored, datetime.utcnow(), None, model_version)
+        with stage("db.commit", rows=len(students)):
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(students)
+
+
+def record_exam_scores(db: Session, student_ids, exam_scores, chunk_size=DEFAULT_BULK_CHUNK):
+    """
+    Açıklanan gerçek sınav notlarını öğrencilere yazar (birincil anahtarla toplu UPDATE) ve updated_at'i günceller;
+    artımlı eğitim bu öğrencileri bir sonraki çalışmada alır. Güncellenen satır sayısını döndürür.
+    """
+    now = datetime.utcnow()
+    rows = [{"id": int(i), "exam_score": int(round(float(score))), "updated_at": now}
+            for i, score in zip(student_ids, exam_scores) if score is not None and not pd.isna(score)]
+    updated = 0
+    try:
+        for start in range(0, len(rows), chunk_size):
+            part = rows[start:start + chunk_size]
+            # Var olmayan id'ler toplu UPDATE'te hata verir (StaleDataError); önce ayıklanır
+            existing = set(db.scalars(select(Student.id).where(Student.id.in_([r["id"] for r in part]))))
+            part = [r for r in part if r["id"] in existing]
+            if part:
+                db.execute(update(Student), part)
+                updated += len(part)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return updated
+
+
+def _labeled_conditions(watermark=None):
+    # Sadece record_exam_scores ile kaydedilmiş (zaman damgalı) gerçek notlar sayılır
+    conditions = [Student.exam_score.isnot(None), Student.updated_at.isnot(None)]
+    if watermark and watermark.get("updated_at") is not None:
+        after = (datetime.fromisoformat(watermark["updated_at"]), watermark["id"])
+        conditions.append(tuple_(Student.updated_at, Student.id) > tuple_(*after))
+    return conditions
+
+
+def count_new_labeled_students(db: Session, watermark=None):
+    return db.scalar(select(func.count()).select_from(Student).where(*_labeled_conditions(watermark)))
+
+
+def iter_new_labeled_students(db: Session, watermark=None, chunksize=10_000):
+    """
+    Gerçek notu watermark'tan ({"updated_at": iso, "id": n}) sonra kaydedilmiş öğrencileri parça parça DataFrame
+    olarak döndürür. watermark None ise record_exam_scores ile notu kaydedilmiş tüm öğrenciler gelir.
+    """
+    columns = [Student.id, *STUDENT_COLUMNS]
+    query = (select(*columns).where(*_labeled_conditions(watermark))
+             .order_by(Student.updated_at, Student.id).execution_options(yield_per=chunksize))
+    result = db.execute(query)
+    keys = list(result.keys())
+    for partition in result.partitions():
+        yield pd.DataFrame(partition, columns=keys)
+
+
+def history_filters(risk_levels=None, date_from=None, date_to=None, name=None):
+    """Geçmiş sayfası filtrelerini SQL koşullarına çevirir (tarih aralığı gün bazında ve iki uç dahil)."""
+    conditions = []
+    if risk_levels:
+        conditions.append(AIPrediction.risk_level.in_(list(risk_levels)))
+    if date_from is not None:
+        conditions.append(AIPrediction.prediction_date >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        conditions.append(AIPrediction.prediction_date < datetime.combine(date_to + timedelta(days=1), time.min))
+    if name:
+        pattern = f"%{name.strip()}%"
+        conditions.append(or_(
+            Student.first_name.ilike(pattern),
+            Student.last_name.ilike(pattern),
+            (Student.first_name + " " + Student.last_name).ilike(pattern),
+        ))
+    return conditions
+
+
+def get_prediction_history(db: Session, page_size=HISTORY_PAGE_SIZE, after=None, **filters):
+    """
+    Tahmin geçmişini en yeniden eskiye, (prediction_date, id) anahtarıyla sayfalar (keyset pagination).
+    OFFSET kullanılmadığı için her sayfa, tablo ne kadar büyük olursa olsun indeks üzerinden aynı sürede gelir.
+    after: önceki sayfanın döndürdüğü imleç. (satırlar, sonraki_imleç) döndürür; son sayfada imleç None olur.
+    """
+    query = select(*HISTORY_COLUMNS).join(Student, Student.id == AIPrediction.student_id)
+    conditions = history_filters(**filters)
+    if after is not None:
+        # Satır değeri karşılaştırması (PostgreSQL, SQLite >= 3.15) indeks üzerinde tek bir aralık taramasıdır
+        conditions.append(tuple_(AIPrediction.prediction_date, AIPrediction.id) < tuple_(*after))
+    if conditions:
+        query = query.where(*conditions)
+    query = query.order_by(AIPrediction.prediction_date.desc(), AIPrediction.id.desc()).limit(page_size + 1)
+
+    rows = db.execute(query).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1].prediction_date, rows[-1].id)
+    return rows, next_cursor
+
+
+def _risky_condition(risk_column):
+    return or_(risk_column.like("%Yüksek%"), risk_column.like("%Kritik%"))
+
+
+def _summary_dict(total, score_sum, score_sq_sum, risky):
+    total = int(total or 0)
+    mean_score = float(score_sum or 0.0) / total if total else 0.0
+    variance = float(score_sq_sum or 0.0) / total - mean_score ** 2 if total else 0.0
+    return {"total": total, "mean_score": mean_score, "std_score": math.sqrt(max(variance, 0.0)),
+            "risky": int(risky or 0)}
+
+
+def get_prediction_summary(db: Session, **filters):
+    """
+    Toplam kayıt, ortalama/standart sapma ve riskli öğrenci sayısını döndürür.
+    Risk ve tarih filtreleri günlük özet tablosundan O(gün) sürede hesaplanır;
+    isim filtresi öğrenci tablosuna ihtiyaç duyduğu için tahminler üzerinde SQL toplamasına düşer.
+    """
+    if filters.get("name"):
+        return _scan_prediction_summary(db, **filters)
+
+    stat = PredictionDailyStat
+    query = select(
+        func.sum(stat.count),
+        func.sum(stat.score_sum),
+        func.sum(stat.score_sq_sum),
+        func.sum(case((_risky_condition(stat.risk_level), stat.count), else_=0)),
+    )
+    if filters.get("risk_levels"):
+        query = query.where(stat.risk_level.in_(list(filters["risk_levels"])))
+    if filters.get("date_from") is not None:
+        query = query.where(stat.day >= filters["date_from"])
+    if filters.get("date_to") is not None:
+        query = query.where(stat.day <= filters["date_to"])
+    return _summary_dict(*db.execute(query).one())
+
+
+def _scan_prediction_summary(db: Session, **filters):
+    """Özetleri doğrudan ai_predictions üzerinde tek bir SQL toplama sorgusuyla hesaplar."""
+    score = AIPrediction.predicted_score
+    query = select(
+        func.count(AIPrediction.id),
+        func.sum(score),
+        func.sum(score * score),
+        func.sum(case((_risky_condition(AIPrediction.risk_level), 1), else_=0)),
+    )
+    conditions = history_filters(**filters)
+    if filters.get("name"):
+        # Sadece isim filtresi öğrenci tablosuna ihtiyaç duyar
+        query = query.join(Student, Student.id == AIPrediction.student_id)
+    if conditions:
+        query = query.where(*conditions)
+    return _summary_dict(*db.execute(query).one())
+
+
+def _stat_upsert(dialect_name):
+    """
+    Günlük özet satırını ekler, varsa sayaçlara ekleme yapar (PostgreSQL ve SQLite ON CONFLICT).
+    ON CONFLICT desteği olmayan veritabanlarında None döner (bkz. _update_or_insert_stats).
+    """
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(PredictionDailyStat)
+    return stmt.on_conflict_do_update(
+        index_elements=[PredictionDailyStat.day, PredictionDailyStat.risk_level],
+        set_={
+            "count": PredictionDailyStat.count + stmt.excluded["count"],
+            "score_sum": PredictionDailyStat.score_sum + stmt.excluded.score_sum,
+            "score_sq_sum": PredictionDailyStat.score_sq_sum + stmt.excluded.score_sq_sum,
+        },
+    )
+
+
+def _update_or_insert_stats(db: Session, rows):
+    """
+    Taşınabilir yol: her gün/risk grubu için önce sayaçlar artırılır, satır yoksa eklenir (aynı işlem içinde).
+    Aynı grup için eşzamanlı ilk yazımlarda birincil anahtar çakışması olabilir; çağıranın işlemi geri alınır.
+    """
+    table = PredictionDailyStat.__table__
+    for row in rows:
+        result = db.execute(
+            update(table)
+            .where(table.c.day == row["day"], table.c.risk_level == row["risk_level"])
+            .values(count=table.c.count + row["count"], score_sum=table.c.score_sum + row["score_sum"],
+                    score_sq_sum=table.c.score_sq_sum + row["score_sq_sum"])
+        )
+        if result.rowcount == 0:
+            db.execute(insert(table), row)
+
+
+def update_daily_stats(db: Session, prediction_dates, risk_levels, scores):
+    """
+    Yeni eklenen tahminleri günlük özet tablosuna işler. Çağıranın işlemi (transaction) içinde çalışır,
+    commit etmez; böylece tahmin ve özet ya birlikte kaydedilir ya da birlikte geri alınır.
+    """
+    # Tek kayıtta da çağrıldığı için gruplama pandas yerine sözlükle yapılır (istek başına ~ms yerine ~µs)
+    groups = {}
+    for prediction_date, risk_level, score in zip(prediction_dates, risk_levels, scores):
+        score = float(score)
+        entry = groups.setdefault((prediction_date.date(), risk_level), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += score
+        entry[2] += score * score
+    if not groups:
+        return
+    rows = [{"day": day, "risk_level": risk_level, "count": count, "score_sum": score_sum, "score_sq_sum": score_sq_sum}
+            for (day, risk_level), (count, score_sum, score_sq_sum) in groups.items()]
+    upsert = _stat_upsert(db.get_bind().dialect.name)
+    if upsert is None:
+        _update_or_insert_stats(db, rows)
+    else:
+        db.execute(upsert, rows)
+
+
+def rebuild_daily_stats(db: Session):
+    """
+    Günlük özet tablosunu mevcut tahminlerden sıfırdan hesaplar (ilk kurulum / geri doldurma).
+    Tek işlemde silip yeniden doldurur; yazma trafiği yokken çalıştırılmalıdır. Grup sayısını döndürür.
+    """
+    day = func.date(AIPrediction.prediction_date)
+    score = AIPrediction.predicted_score
+    source = (
+        select(day, AIPrediction.risk_level, func.count(AIPrediction.id), func.sum(score), func.sum(score * score))
+        .where(AIPrediction.prediction_date.is_not(None), AIPrediction.risk_level.is_not(None),
+               score.is_not(None))
+        .group_by(day, AIPrediction.risk_level)
+    )
+    try:
+        db.execute(delete(PredictionDailyStat))
+        db.execute(insert(PredictionDailyStat).from_select(
+            ["day", "risk_level", "count", "score_sum", "score_sq_sum"], source))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return db.scalar(select(func.count()).select_from(PredictionDailyStat))
+
+
+def daily_stats_need_backfill(db: Session):
+    """Tahmin olduğu halde günlük özet tablosu boşsa True döner (özet tablosu sonradan eklenmiş kurulumlar)."""
+    has_stats = db.scalar(select(PredictionDailyStat.day).limit(1)) is not None
+    return not has_stats and db.scalar(select(AIPrediction.id).limit(1)) is not None
+
+
+def save_drift_window(db: Session, model_version, source, scores, window_counts):
+    """
+    Bir izleme penceresinin özellik başına PSI / KS skorlarını ve kova sayılarını kaydeder.
+    Tablo eski kurulumlarda yoksa ilk yazımda oluşturulur. Yazılan satır sayısını döndürür.
+    """
+    FeatureDrift.__table__.create(bind=db.get_bind(), checkfirst=True)
+    computed_at = datetime.utcnow()
+    rows = [{
+        "model_version": model_version,
+        "source": source,
+        "feature": row["feature"],
+        "computed_at": computed_at,
+        "sample_count": row["samples"],
+        "psi": row["psi"],
+        "ks": row["ks"],
+        "counts": json.dumps(window_counts[row["feature"]].tolist()),
+    } for row in scores]
+    try:
+        db.execute(insert(FeatureDrift), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(rows)
+
+
+def get_drift_history(db: Session, model_version=None, limit=5000):
+    """Kayma pencerelerini (en yeni önce) [(zaman, özellik, kaynak, örnek, psi, ks), ...] olarak döndürür."""
+    from sqlalchemy import inspect
+
+    if not inspect(db.get_bind()).has_table(FeatureDrift.__tablename__):
+        return []
+    query = select(FeatureDrift.computed_at, FeatureDrift.feature, FeatureDrift.source, FeatureDrift.sample_count,
+                   FeatureDrift.psi, FeatureDrift.ks)
+    if model_version is not None:
+        query = query.where(FeatureDrift.model_version == model_version)
+    query = query.order_by(FeatureDrift.computed_at.desc(), FeatureDrift.id.desc()).limit(limit)
+    return db.execute(query).all()
@@ -1,26 +1,157 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from dotenv import load_dotenv
+import threading
 from urllib.parse import quote_plus
 
-# .env dosyasını yükle
-load_dotenv()
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
+
+# Motor (engine) ilk kullanımda oluşturulur; src.database'i import etmek bağlantı açmaz ve .env okumaz.
+# Bağlantı ayarları ortam değişkenlerinden okunur:
+#   DATABASE_URL              Tam bağlantı adresi (örn. sqlite:///edu.db veya sqlite:///:memory:).
+#                             Verilmezse POSTGRES_* değişkenlerinden PostgreSQL adresi kurulur.
+#   DB_POOL_SIZE (5), DB_MAX_OVERFLOW (10), DB_POOL_TIMEOUT (30 sn), DB_POOL_RECYCLE (1800 sn),
+#   DB_POOL_PRE_PING (1), DB_STATEMENT_TIMEOUT_MS (0 = sınırsız; sadece PostgreSQL)
+#   DB_SQLITE_BUSY_TIMEOUT_MS (5000)
+
+_engine = None
+_engine_lock = threading.Lock()
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_database_url():
+    """DATABASE_URL verilmişse onu, yoksa POSTGRES_* değişkenlerinden kurulan adresi döndürür."""
+    from dotenv import load_dotenv
+
+    # .env dosyasını yükle
+    load_dotenv()
+
+    url = os.getenv("DATABASE_URL")
+    if url:
+        return url
+
+    # Veritabanı bilgilerini al
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    db_name = os.getenv("POSTGRES_DB", "edu_db")
+
+    # Şifreyi URL uyumlu hale getir
+    encoded_password = quote_plus(password)
+    return f"postgresql+psycopg2://{user}:{encoded_password}@{host}:{port}/{db_name}"
+
+
+def _is_memory_sqlite(url):
+    database = url.split("///", 1)[1] if "///" in url else ""
+    return database in ("", ":memory:") or "mode=memory" in database
+
+
+def _sqlite_pragmas(in_memory):
+    busy_timeout = _env_int("DB_SQLITE_BUSY_TIMEOUT_MS", 5000)
+
+    def on_connect(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            # WAL: okuyucular yazarı, yazar okuyucuları beklemez
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={busy_timeout}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-65536")  # ~64 MB
+        cursor.close()
 
-# Veritabanı bilgilerini al
-user = os.getenv("POSTGRES_USER", "postgres")
-password = os.getenv("POSTGRES_PASSWORD", "postgres")
-host = os.getenv("POSTGRES_HOST", "localhost")
-port = os.getenv("POSTGRES_PORT", "5432")
-db_name = os.getenv("POSTGRES_DB", "edu_db")
+    return on_connect
 
-# Şifreyi URL uyumlu hale getir
-encoded_password = quote_plus(password)
-DATABASE_URL = f"postgresql+psycopg2://{user}:{encoded_password}@{host}:{port}/{db_name}"
 
-# Motoru oluştur
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _engine_options(url):
+    """
+    Havuz seçeneklerini ve (SQLite için) bağlantı kurulunca çalışacak PRAGMA fonksiyonunu döndürür.
+    Senkron motor ve async_db'deki asenkron motor aynı ayarları buradan alır.
+    """
+    if url.startswith("sqlite"):
+        in_memory = _is_memory_sqlite(url)
+        options = {}
+        if in_memory:
+            # Bellek içi veritabanı bağlantıya özeldir; tüm oturumlar tek bağlantıyı paylaşır
+            options["poolclass"] = StaticPool
+        return options, _sqlite_pragmas(in_memory)
+
+    options = {
+        "pool_size": _env_int("DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+    return options, None
+
+
+def _build_engine(url):
+    options, on_connect = _engine_options(url)
+    if on_connect is not None:
+        options["connect_args"] = {"check_same_thread": False}
+        engine = create_engine(url, **options)
+        event.listen(engine, "connect", on_connect)
+        return engine
+
+    statement_timeout = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    if statement_timeout and url.startswith("postgresql"):
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+    return create_engine(url, **options)
+
+
+def get_engine():
+    """Süreç başına tek motoru ilk çağrıda oluşturur (thread-safe)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = _build_engine(get_database_url())
+                _session_factory.configure(bind=engine)
+                _engine = engine
+    return _engine
+
+
+def dispose_engine(close=True):
+    """
+    Havuzdaki bağlantıları kapatır; bir sonraki get_engine() ortam değişkenlerini yeniden okur.
+    close=False: fork ile başlatılan alt süreçte, ana sürecin bağlantılarına dokunmadan havuzu bırakır.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose(close=close)
+            _engine = None
+
+
+def SessionLocal(**kwargs):
+    """Motor hazır değilse oluşturup yeni bir oturum (Session) döndürür."""
+    get_engine()
+    return _session_factory(**kwargs)
+
+
+def __getattr__(name):
+    # Geriye dönük uyumluluk: "from src.database.db_config import engine" ilk erişimde motoru oluşturur
+    if name == "engine":
+        return get_engine()
+    if name == "DATABASE_URL":
+        return get_database_url()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Base sınıfını burada oluşturuyoruz (Modeller bunu kullanacak)
 Base = declarative_base()
@@ -29,7 +160,46 @@ Base = declarative_base()
 def init_db():
     """Tabloları veritabanında oluşturur."""
     # DÖNGÜYÜ KIRAN YER: Modelleri fonksiyonun İÇİNDE import et
-    from src.database.models import Student, TrainingData, AIPrediction
+    from src.database.models import Student, TrainingData, AIPrediction, PredictionDailyStat, FeatureDrift
+
+    Base.metadata.create_all(bind=get_engine())
+    ensure_columns()
+    ensure_indexes()
+    print("✅ Veritabanı tabloları başarıyla oluşturuldu!")
+
+
+def ensure_columns():
+    """
+    create_all var olan tablolara sonradan eklenen sütunları da eklemez.
+    Modelde olup veritabanında olmayan sütunlar boş değer kabul eden sütunlar olarak eklenir.
+    """
+    from sqlalchemy import inspect, text
+
+    engine = get_engine()
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                    print(f"➕ {table.name}.{column.name} sütunu eklendi.")
+
+
+def ensure_indexes():
+    """
+    create_all var olan tablolara sonradan eklenen indeksleri oluşturmaz.
+    Modellerde tanımlı ama veritabanında olmayan indeksler burada eklenir.
+    """
+    from sqlalchemy import inspect
 
-    Base.metadata.create_all(bind=engine)
-    print("✅ Veritabanı tabloları başarıyla oluşturuldu!")
\ No newline at end of file
+    engine = get_engine()
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Date, Index, Text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 # Base sınıfını db_config dosyasından alıyoruz
@@ -8,6 +8,10 @@ from .db_config import Base
 # 1. Tablo: Gerçek Öğrenci Verileri
 class Student(Base):
     __tablename__ = "students"
+    # Artımlı eğitim, gerçek notu son eğitimden sonra kaydedilen öğrencileri (updated_at, id) sırasıyla okur
+    __table_args__ = (
+        Index("ix_students_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String, nullable=True)
@@ -32,6 +36,9 @@ class Student(Base):
 
     # Gerçek sınav notu
     exam_score = Column(Integer, nullable=True)
+    # Gerçek notun kaydedildiği zaman; sadece crud.record_exam_scores yazar. Tahmin için yüklenen
+    # (sınav notu sütunu da içeren) kayıtlarda boş kalır, artımlı eğitim bunları yeni not saymaz.
+    updated_at = Column(DateTime, nullable=True)
 
     # İlişki
     predictions = relationship("AIPrediction", back_populates="student")
@@ -61,18 +68,62 @@ class TrainingData(Base):
 
     exam_score = Column(Integer)
 
+    # Satır içeriğinin özeti (seed.py); aynı CSV tekrar yüklendiğinde mükerrer kayıt oluşmaz
+    row_hash = Column(String(16), index=True)
+
 
 # 3. Tablo: AI Sonuçları
 class AIPrediction(Base):
     __tablename__ = "ai_predictions"
+    # Geçmiş sayfası (prediction_date, id) üzerinden sayfalanır (keyset); risk filtresi aynı sırayı kullanır
+    __table_args__ = (
+        Index("ix_ai_predictions_prediction_date_id", "prediction_date", "id"),
+        Index("ix_ai_predictions_risk_level_date", "risk_level", "prediction_date", "id"),
+        # Yeniden skorlama işi, bir sürümle zaten skorlanmış öğrencileri bu indeksle atlar
+        Index("ix_ai_predictions_model_version_student", "model_version", "student_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, ForeignKey("students.id"))
+    student_id = Column(Integer, ForeignKey("students.id"), index=True)
 
     prediction_date = Column(DateTime, default=datetime.utcnow)
     predicted_score = Column(Float)
     risk_level = Column(String)
     top_factors = Column(String)
     recommendation = Column(String)
+    # Tahmini üreten model sürümü (model_registry); eski kayıtlarda boş
+    model_version = Column(String, nullable=True)
 
     student = relationship("Student", back_populates="predictions")
+
+
+# 4. Tablo: Günlük Tahmin Özeti (ai_predictions ile aynı işlemde güncellenir)
+class PredictionDailyStat(Base):
+    __tablename__ = "prediction_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    risk_level = Column(String, primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_sq_sum = Column(Float, nullable=False, default=0.0)
+
+
+# 5. Tablo: Girdi Dağılımı Kayması (src/logic/drift.py; her satır bir özelliğin bir zaman penceresi)
+class FeatureDrift(Base):
+    __tablename__ = "feature_drift"
+    __table_args__ = (
+        Index("ix_feature_drift_version_feature_time", "model_version", "feature", "computed_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    model_version = Column(String)
+    source = Column(String)  # dashboard, service, batch_cli
+    feature = Column(String, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+    sample_count = Column(Integer, nullable=False)
+    psi = Column(Float)
+    ks = Column(Float, nullable=True)
+    # Penceredeki kova sayıları (JSON listesi); pencereler birleştirilerek daha uzun dönemler hesaplanabilir
+    counts = Column(Text)
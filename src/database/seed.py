@@ -1,71 +1,161 @@
+import argparse
+import io
+import time
+
+import numpy as np
 import pandas as pd
-from sqlalchemy.orm import Session
-from src.database.db_config import SessionLocal, engine
+from sqlalchemy import Integer, text
+from src.database.db_config import get_engine, ensure_columns, ensure_indexes
 from src.database.models import TrainingData
+from src.utils.instrumentation import print_summary, stage
+
+DEFAULT_CSV = "data/student_performance.csv"
+# CSV'den tek seferde okunup veritabanına yazılan satır sayısı
+DEFAULT_CHUNKSIZE = 200_000
+
+# id ve row_hash dışındaki model sütunları; Kaggle başlıkları (Hours_Studied, ...) bunlara eşlenir
+TRAINING_COLUMNS = [c for c in TrainingData.__table__.columns if c.name not in ("id", "row_hash")]
+INTEGER_COLUMNS = [c.name for c in TRAINING_COLUMNS if isinstance(c.type, Integer)]
+TEXT_COLUMNS = [c.name for c in TRAINING_COLUMNS if not isinstance(c.type, Integer)]
+LOAD_COLUMNS = [c.name for c in TRAINING_COLUMNS] + ["row_hash"]
+
+STAGING_TABLE = "training_data_staging"
+
+
+def build_column_map(header):
+    """CSV başlıklarını (büyük/küçük harf ve boşluk farkı gözetmeden) model sütunlarına bir kez eşler."""
+    wanted = {c.name for c in TRAINING_COLUMNS}
+    mapping = {name: name.strip().lower() for name in header if name.strip().lower() in wanted}
+    missing = wanted - set(mapping.values())
+    if missing:
+        raise ValueError(f"CSV'de eksik sütunlar: {sorted(missing)}")
+    return mapping
 
 
-def seed_training_data():
-    # 1. Oturum Aç
-    db: Session = SessionLocal()
+def prepare_chunk(df, column_map):
+    """Sütunları eşler, boşlukları doldurur, tipleri sabitler ve satır içeriği özetini (row_hash) ekler."""
+    df = df[list(column_map)].rename(columns=column_map)
 
-    # Eğer tabloda zaten veri varsa tekrar yükleme yapmayalım
-    if db.query(TrainingData).count() > 0:
-        print("⚠️ Veri tabanı zaten dolu. Yükleme atlandı.")
-        db.close()
-        return
+    # Sayısal olmayan boşluklar "Unknown", sayısal boşluklar 0 olur
+    for col in TEXT_COLUMNS:
+        df[col] = df[col].astype(object).where(df[col].notna(), "Unknown").astype(str)
+    for col in INTEGER_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).round().astype(np.int64)
 
-    print("⏳ CSV dosyası okunuyor...")
+    df = df[[c.name for c in TRAINING_COLUMNS]]
+    # Tipler sabitlendikten sonra hesaplandığı için aynı içerik her yüklemede aynı özeti verir
+    df["row_hash"] = pd.util.hash_pandas_object(df, index=False).map("{:016x}".format)
+    return df
 
-    # 2. CSV'yi Oku
-    # Dosya yolunu kendi projene göre gerekirse güncelle
+
+def _copy_into(conn, table_name, df):
+    """PostgreSQL: parçayı CSV olarak COPY FROM STDIN ile tek komutta aktarır."""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cursor = conn.connection.dbapi_connection.cursor()
     try:
-        df = pd.read_csv("data/student_performance.csv")
+        cursor.copy_expert(f"COPY {table_name} ({', '.join(LOAD_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _executemany_into(conn, table_name, df):
+    """SQLite ve diğerleri: tek bir executemany ile toplu ekleme."""
+    columns = ", ".join(LOAD_COLUMNS)
+    params = ", ".join(f":{c}" for c in LOAD_COLUMNS)
+    conn.execute(text(f"INSERT INTO {table_name} ({columns}) VALUES ({params})"), df.to_dict("records"))
+
+
+def _create_staging(conn):
+    # Geçici tablo bağlantıya özeldir; bu yüzden yükleme boyunca tek bir bağlantı kullanılır
+    column_defs = ", ".join(
+        f"{c.name} {c.type.compile(dialect=conn.dialect)}"
+        for c in TrainingData.__table__.columns if c.name in LOAD_COLUMNS
+    )
+    conn.execute(text(f"CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} ({column_defs})"))
+
+
+def _merge_staging(conn):
+    """Ara tablodaki satırlardan, özeti training_data'da olmayanları ekler ve ara tabloyu boşaltır."""
+    columns = ", ".join(LOAD_COLUMNS)
+    result = conn.execute(text(
+        f"INSERT INTO {TrainingData.__tablename__} ({columns}) "
+        f"SELECT {columns} FROM {STAGING_TABLE} s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {TrainingData.__tablename__} t WHERE t.row_hash = s.row_hash)"
+    ))
+    conn.execute(text(f"DELETE FROM {STAGING_TABLE}"))
+    return result.rowcount
+
+
+def seed_training_data(csv_path=DEFAULT_CSV, mode="upsert", chunksize=DEFAULT_CHUNKSIZE):
+    """
+    CSV'yi parça parça okuyup training_data tablosuna yükler. Her parça ayrı bir işlemde (transaction) yazılır.
+    - upsert: içeriği (row_hash) tabloda zaten olan satırlar atlanır; aynı dosya tekrar yüklenebilir
+      (dosya içindeki birebir aynı satırlar da tek kayda iner).
+    - append: tüm satırlar koşulsuz eklenir.
+    PostgreSQL'de COPY FROM STDIN, diğer veritabanlarında executemany kullanılır.
+    """
+    if mode not in ("upsert", "append"):
+        raise ValueError(f"Bilinmeyen yükleme modu: {mode}")
+
+    engine = get_engine()
+    # Tablo yoksa oluşturulur; eski kurulumlarda row_hash sütunu ve indeksi yoksa eklenir
+    TrainingData.__table__.create(bind=engine, checkfirst=True)
+    ensure_columns()
+    ensure_indexes()
+
+    use_copy = engine.dialect.name == "postgresql"
+    load = _copy_into if use_copy else _executemany_into
+    print(f"⏳ {csv_path} yükleniyor ({'COPY' if use_copy else 'executemany'}, mod: {mode})...")
+
+    conn = engine.connect()
+    total_read = total_written = 0
+    start = time.perf_counter()
+    try:
+        if mode == "upsert":
+            with conn.begin():
+                _create_staging(conn)
+
+        column_map = None
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            if column_map is None:
+                column_map = build_column_map(chunk.columns)
+            with stage("seed.prepare", rows=len(chunk)):
+                df = prepare_chunk(chunk, column_map)
+            total_read += len(df)
+
+            # COPY doğrudan DBAPI imleciyle çalıştığı için işlem açıkça başlatılır
+            with stage("seed.write", rows=len(df)), conn.begin():
+                if mode == "upsert":
+                    df = df.drop_duplicates(subset="row_hash")
+                    load(conn, STAGING_TABLE, df)
+                    total_written += _merge_staging(conn)
+                else:
+                    load(conn, TrainingData.__tablename__, df)
+                    total_written += len(df)
+
+            elapsed = time.perf_counter() - start
+            print(f"   {total_read:,} satır okundu, {total_written:,} yazıldı ({total_read / elapsed:,.0f} satır/sn)")
     except FileNotFoundError:
-        print("❌ HATA: 'data/student_performance.csv' dosyası bulunamadı!")
-        return
-
-    # 3. Veri Temizliği (Boş hücreleri doldurma)
-    # Sayısal olmayan boşlukları "Unknown" yapalım
-    object_cols = df.select_dtypes(include=['object']).columns
-    df[object_cols] = df[object_cols].fillna("Unknown")
-
-    # Sayısal boşlukları ortalama veya 0 ile doldurabiliriz (Şimdilik 0)
-    num_cols = df.select_dtypes(include=['number']).columns
-    df[num_cols] = df[num_cols].fillna(0)
-
-    print(f"✅ {len(df)} satır veri hazırlandı, veritabanına yazılıyor...")
-
-    # 4. Veritabanına Ekleme (Bulk Insert)
-    # Pandas satırlarını TrainingData nesnesine çeviriyoruz
-    data_to_insert = []
-    for index, row in df.iterrows():
-        record = TrainingData(
-            hours_studied=row['Hours_Studied'],
-            attendance=row['Attendance'],
-            previous_scores=row['Previous_Scores'],
-            tutoring_sessions=row['Tutoring_Sessions'],
-            sleep_hours=row['Sleep_Hours'],
-            physical_activity=row['Physical_Activity'],
-            motivation_level=row['Motivation_Level'],
-            parental_involvement=row['Parental_Involvement'],
-            access_to_resources=row['Access_to_Resources'],
-            internet_access=row['Internet_Access'],
-            family_income=row['Family_Income'],
-            teacher_quality=row['Teacher_Quality'],
-            peer_influence=row['Peer_Influence'],
-            learning_disabilities=row['Learning_Disabilities'],
-            distance_from_home=row['Distance_from_Home'],
-            exam_score=row['Exam_Score']
-        )
-        data_to_insert.append(record)
-
-    # Toplu ekleme yap (Hız için)
-    db.bulk_save_objects(data_to_insert)
-    db.commit()
-    db.close()
-
-    print("🎉 Başarılı! Tüm veriler 'training_data' tablosuna yüklendi.")
+        print(f"❌ HATA: '{csv_path}' dosyası bulunamadı!")
+        return 0
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"🎉 Başarılı! {total_written:,} yeni satır 'training_data' tablosuna yüklendi "
+          f"({total_read - total_written:,} satır zaten vardı). "
+          f"Süre: {elapsed:.1f} sn, {total_read / max(elapsed, 1e-9):,.0f} satır/sn")
+    return total_written
 
 
 if __name__ == "__main__":
-    seed_training_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Eğitim verisini CSV'den training_data tablosuna yükler.")
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--mode", choices=["upsert", "append"], default="upsert",
+                        help="upsert: aynı içerikli satırları atla (varsayılan), append: hepsini ekle")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+    seed_training_data(args.csv, mode=args.mode, chunksize=args.chunksize)
+    print_summary()
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+# Öğrenci bazında faktör katkıları (FlatForest.contributions, ağaç yolu / Saabas yöntemi).
+# Veritabanında (AIPrediction.top_factors) mutlak katkısı en büyük ilk TOP_K faktör tek bir metin olarak saklanır:
+#   "previous_scores:+4.2;attendance:-3.1;hours_studied:+1.8"
+# Biçim sabit olduğu için SQL'de de sorgulanabilir, örn. devamı notu düşürenler: top_factors LIKE '%attendance:-%'
+TOP_K = 3
+FACTOR_SEPARATOR = ";"
+VALUE_SEPARATOR = ":"
+
+# Toplu sonuç dosyalarındaki sütun (Tahmini_Not / Risk_Durumu ile aynı adlandırma)
+TOP_FACTORS_COLUMN = "Etkili_Faktorler"
+
+
+def explain(predictor, processed_df):
+    """
+    Kodlanmış girdiler için (bias, katkılar DataFrame'i); sütunlar özellik adlarıdır.
+    predictor düz orman değilse (düz orman dizileri olmayan eski model dosyaları) her çağrıda dönüştürülür.
+    """
+    if not hasattr(predictor, "contributions"):
+        from src.logic.flat_forest import FlatForest
+        predictor = FlatForest.from_model(predictor)
+    bias, contributions = predictor.contributions(processed_df)
+    columns = predictor.feature_names or list(processed_df.columns)
+    return bias, pd.DataFrame(contributions, columns=columns, index=processed_df.index)
+
+
+def top_factor_strings(contributions, feature_names, k=TOP_K):
+    """Her satır için mutlak katkısı en büyük k faktörü "ad:+x.x;..." biçiminde döndürür."""
+    contributions = np.asarray(contributions, dtype=np.float64)
+    k = min(k, contributions.shape[1])
+    # argpartition + k elemanlık sıralama: tam sıralamadan ucuz
+    top = np.argpartition(-np.abs(contributions), k - 1, axis=1)[:, :k]
+    picked = np.take_along_axis(contributions, top, axis=1)
+    order = np.argsort(-np.abs(picked), axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    picked = np.round(np.take_along_axis(picked, order, axis=1), 1)
+    names = np.asarray(feature_names, dtype=object)[top]
+    return [FACTOR_SEPARATOR.join(f"{name}{VALUE_SEPARATOR}{value:+.1f}" for name, value in zip(row_names, row_values))
+            for row_names, row_values in zip(names, picked)]
+
+
+def parse_top_factors(text):
+    """top_factors metnini [(özellik, katkı), ...] olarak çözer; eski kayıtlardaki sabit metinler için []."""
+    if not text or VALUE_SEPARATOR not in text:
+        return []
+    factors = []
+    for item in text.split(FACTOR_SEPARATOR):
+        name, _, value = item.rpartition(VALUE_SEPARATOR)
+        try:
+            factors.append((name, float(value)))
+        except ValueError:
+            continue
+    return factors
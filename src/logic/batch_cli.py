@@ -0,0 +1,189 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+# Proje dizin yapısına göre path ayarı
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..', '..'))
+sys.path.append(root_dir)
+
+from src.logic.batch_scoring import DEFAULT_CHUNKSIZE, RISK_LABELS, BatchSummary, iter_results, score_csv_stream
+from src.logic.drift import DriftMonitor, drift_status
+from src.logic.model_registry import get_active_version, load_bundle
+
+DEFAULT_OUTPUT_DIR = "scored"
+SUMMARY_FILE = "risk_summary.csv"
+OUTPUT_SUFFIX = "_scored"
+
+# İşçi süreçlerde bir kez yüklenen model paketi
+_worker_bundle = None
+
+
+def _init_worker(version):
+    # Sağlama toplamları ana süreçte bir kez doğrulandı; düz orman dizileri mmap ile paylaşılır
+    global _worker_bundle
+    _worker_bundle = load_bundle(version, verify=False)
+
+
+def _score_file(path, output_path, chunksize):
+    """Tek bir sınıf dosyasını skorlayıp output_path'e yazar; (özet, süre) ya da hata döndürür."""
+    start = time.perf_counter()
+    reference = _worker_bundle.drift_reference
+    monitor = DriftMonitor(reference, _worker_bundle.version, source="batch_cli") if reference else None
+    try:
+        summary = score_csv_stream(path, _worker_bundle.predictor, _worker_bundle.preprocessor,
+                                   chunksize=chunksize, result_path=output_path, monitor=monitor,
+                                   explainer=_worker_bundle.predictor)
+    except Exception as e:
+        # Yarım kalan sonuç dosyası, başarılı bir çıktıyla karışmasın diye silinir
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return path, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+    # Önizleme ana sürece taşınmaz; sadece toplamlar (ve kayma taslaklarının kova sayıları) döner
+    summary.preview = None
+    summary.drift_counts = monitor.counts if monitor is not None else None
+    return path, summary, None, time.perf_counter() - start
+
+
+def expand_inputs(patterns):
+    """Glob kalıplarını (** dahil) tekrarsız, sıralı dosya listesine çevirir."""
+    paths = []
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        paths.extend(os.path.abspath(p) for p in matches if os.path.isfile(p))
+    return sorted(set(paths))
+
+
+def output_paths(paths, output_dir, fmt):
+    """Her girdi için <ad>_scored.<biçim> yolu; aynı isimli dosyalar (farklı klasörler) numaralandırılır."""
+    used, result = set(), {}
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, n = f"{stem}{OUTPUT_SUFFIX}", 1
+        while name in used:
+            n += 1
+            name = f"{stem}{OUTPUT_SUFFIX}_{n}"
+        used.add(name)
+        result[path] = os.path.join(output_dir, f"{name}.{fmt}")
+    return result
+
+
+def summary_row(name, summary):
+    row = {"Dosya": name, "Öğrenci": summary.count, "Ortalama": round(summary.mean_score, 2)}
+    for label in RISK_LABELS:
+        row[label] = summary.risk_counts.get(label, 0)
+    row["Risk_Orani"] = round(summary.risk_counts.get("Yüksek Risk", 0) / summary.count, 4) if summary.count else 0.0
+    return row
+
+
+def _persist(path, version):
+    from src.database.crud import bulk_save_batch_results
+    from src.database.db_config import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return bulk_save_batch_results(db, iter_results(path), model_version=version)
+    finally:
+        db.close()
+
+
+def score_files(patterns, output_dir=DEFAULT_OUTPUT_DIR, workers=None, fmt="csv", chunksize=DEFAULT_CHUNKSIZE,
+                persist=False, version=None):
+    """
+    Glob kalıplarına uyan sınıf CSV'lerini süreç havuzunda skorlar (model her işçide bir kez yüklenir).
+    Her dosya için ayrı bir sonuç dosyası ve tüm dosyalar için tek bir risk özeti (risk_summary.csv) yazar.
+    persist=True ise her dosyanın sonuçları, diğer dosyalar skorlanırken ana süreçte veritabanına kaydedilir.
+    (birleşik özet, başarısız dosyalar) döndürür.
+    """
+    paths = expand_inputs(patterns)
+    if not paths:
+        print(f"❌ HATA: {patterns} kalıplarına uyan dosya bulunamadı!")
+        return None, []
+
+    # Tüm işçiler aynı sürümü kullansın diye aktif sürüm en başta sabitlenir
+    version = version or get_active_version()
+    try:
+        bundle = load_bundle(version)
+    except FileNotFoundError:
+        print("🚨 Model dosyaları bulunamadı! Lütfen önce 'ml_engine.py' dosyasını çalıştırın.")
+        return None, []
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = output_paths(paths, output_dir, fmt)
+
+    print(f"⏳ {len(paths)} dosya {workers} süreçte skorlanıyor (model: {bundle.version})...")
+    start = time.perf_counter()
+    combined, rows, failed = BatchSummary(), [], []
+    saved = 0
+    # İşçilerin taslakları tek izleyicide birleştirilir; tüm dosyalar tek bir kayma penceresi olur
+    drift = DriftMonitor(bundle.drift_reference, bundle.version, source="batch_cli") if bundle.drift_reference else None
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(version,)) as executor:
+        # Büyük dosyalar önce gönderilir; sona kalan tek büyük dosya diğer çekirdekleri boşta bırakmaz
+        ordered = sorted(paths, key=os.path.getsize, reverse=True)
+        futures = [executor.submit(_score_file, path, outputs[path], chunksize) for path in ordered]
+        for done, future in enumerate(as_completed(futures), start=1):
+            path, summary, error, seconds = future.result()
+            name = os.path.relpath(path)
+            if error is not None:
+                failed.append((name, error))
+                print(f"   [{done}/{len(paths)}] ❌ {name}: {error}")
+                continue
+            combined.merge(summary)
+            if drift is not None and summary.drift_counts is not None:
+                drift.merge_counts(summary.drift_counts, summary.count)
+            rows.append(summary_row(name, summary))
+            print(f"   [{done}/{len(paths)}] {name}: {summary.count} öğrenci, ortalama {summary.mean_score:.1f} "
+                  f"({seconds:.1f} sn)")
+            if persist:
+                # Kayıt hatası (örn. veritabanına erişilemiyor) sadece bu dosyayı başarısız sayar;
+                # dosya skorlanmış olduğu için sonuç dosyası ve özet satırı korunur
+                try:
+                    saved += _persist(outputs[path], bundle.version)
+                except Exception as e:
+                    failed.append((name, f"veritabanına kaydedilemedi: {e}"))
+                    print(f"   [{done}/{len(paths)}] ❌ {name}: veritabanına kaydedilemedi: {e}")
+
+    rows.sort(key=lambda r: r["Dosya"])
+    rows.append(summary_row("TOPLAM", combined))
+    summary_df = pd.DataFrame(rows)
+    summary_df.to_csv(os.path.join(output_dir, SUMMARY_FILE), index=False)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{summary_df.to_string(index=False)}")
+    print(f"\n🎉 {combined.count:,} öğrenci {elapsed:.1f} sn'de skorlandı "
+          f"({combined.count / max(elapsed, 1e-9):,.0f} satır/sn). Sonuçlar: {output_dir}")
+    if persist:
+        print(f"💾 {saved:,} öğrenci veritabanına kaydedildi.")
+    if drift is not None and drift.rows:
+        top = drift.scores()[:3]
+        print("📉 Eğitim dağılımına göre en çok kayan özellikler: " + ", ".join(
+            f"{r['feature']} PSI {r['psi']:.3f} ({drift_status(r['psi'], r['samples'])})" for r in top))
+        if persist:
+            drift.flush()
+    if combined.unknown_counts:
+        print(f"⚠️ Modelin tanımadığı değerler varsayılan koda çevrildi: {combined.unknown_counts}")
+    if failed:
+        print(f"❌ {len(failed)} dosya skorlanamadı ya da kaydedilemedi.")
+    return combined, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sınıf CSV'lerini toplu olarak skorlar.")
+    parser.add_argument("inputs", nargs="+", help="CSV dosyaları veya glob kalıpları (örn. 'siniflar/**/*.csv')")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="Süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--persist", action="store_true", help="Sonuçları veritabanına da kaydet")
+    parser.add_argument("--version", default=None, help="Model sürümü (varsayılan: aktif sürüm)")
+    args = parser.parse_args()
+
+    combined, failed = score_files(args.inputs, args.output_dir, args.workers, args.format, args.chunksize,
+                                   args.persist, args.version)
+    sys.exit(1 if combined is None or failed else 0)
@@ -0,0 +1,247 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.logic.attribution import TOP_FACTORS_COLUMN, explain, top_factor_strings
+from src.utils.instrumentation import stage
+
+# Toplu analizde bir seferde okunup tahmin edilen satır sayısı
+DEFAULT_CHUNKSIZE = 20_000
+
+# Not dağılımı grafiği için sabit kutular (0-100 arası 20 kutu)
+HISTOGRAM_BINS = np.linspace(0, 100, 21)
+
+RISK_LABELS = ["Düşük Risk", "Orta Risk", "Yüksek Risk"]
+PREVIEW_ROWS = 1000
+
+SCORE_COLUMN = "Tahmini_Not"
+RISK_COLUMN = "Risk_Durumu"
+
+
+def normalize_columns(df):
+    """Yüklenen CSV sütun isimlerini dashboard ile aynı şekilde normalize eder."""
+    df.columns = df.columns.str.strip().str.lower()
+    return df
+
+
+def risk_labels(scores):
+    """Toplu analizdeki üç kademeli risk etiketini vektörel olarak üretir."""
+    scores = np.asarray(scores)
+    return np.select([scores >= 85, scores >= 50], RISK_LABELS[:2], default=RISK_LABELS[2])
+
+
+def score_frame(df, model, preprocessor, monitor=None, explainer=None):
+    """
+    Bir parçayı kodlar, tahmin eder ve Tahmini_Not / Risk_Durumu sütunlarını ekler (yerinde).
+    monitor (DriftMonitor) verilirse kodlanmış girdiler dağılım kayması taslaklarına eklenir.
+    explainer (FlatForest) verilirse öğrenci başına en etkili faktörler Etkili_Faktorler sütununa yazılır.
+    """
+    with stage("encode", rows=len(df)):
+        processed_df = preprocessor.transform(df)
+    if monitor is not None:
+        with stage("drift", rows=len(df)):
+            monitor.update(processed_df)
+    contributions = None
+    if explainer is not None:
+        with stage("attribution", rows=len(df)):
+            bias, contributions = explain(explainer, processed_df)
+    if contributions is not None and explainer is model:
+        # Katkılar tahminle aynı ağaç yürüyüşünden gelir: bias + katkı toplamı = tahmin (ikinci yürüyüşe gerek yok)
+        scores = np.round(bias + contributions.to_numpy().sum(axis=1), 1)
+    else:
+        with stage("predict", rows=len(df)):
+            scores = np.round(model.predict(processed_df), 1)
+    df[SCORE_COLUMN] = scores
+    df[RISK_COLUMN] = risk_labels(scores)
+    if contributions is not None:
+        df[TOP_FACTORS_COLUMN] = top_factor_strings(contributions.to_numpy(), contributions.columns)
+    return df, processed_df.attrs.get("unknown_counts", {})
+
+
+class BatchSummary:
+    """Grafikler için sadece yürüyen toplamlar tutulur; satırların kendisi bellekte tutulmaz."""
+
+    def __init__(self):
+        self.count = 0
+        self.score_sum = 0.0
+        self.risk_counts = {label: 0 for label in RISK_LABELS}
+        self.histogram = np.zeros(len(HISTOGRAM_BINS) - 1, dtype=np.int64)
+        self.unknown_counts = {}
+        self.preview = None
+        self.result_path = None
+        self.result_format = None
+        # Skorlayan model sürümü (kayıtlarda AIPrediction.model_version olarak saklanır)
+        self.model_version = None
+
+    def update(self, scored_df, unknown_counts=None):
+        scores = scored_df[SCORE_COLUMN].to_numpy()
+        self.count += len(scores)
+        self.score_sum += float(scores.sum())
+        labels, counts = np.unique(scored_df[RISK_COLUMN].to_numpy(), return_counts=True)
+        for label, n in zip(labels, counts):
+            self.risk_counts[label] += int(n)
+        self.histogram += np.histogram(np.clip(scores, 0, 100), bins=HISTOGRAM_BINS)[0]
+        for col, n in (unknown_counts or {}).items():
+            self.unknown_counts[col] = self.unknown_counts.get(col, 0) + n
+        if self.preview is None:
+            self.preview = scored_df.head(PREVIEW_ROWS).copy()
+
+    def merge(self, other):
+        """Başka bir özetin (örn. ayrı bir süreçte skorlanan dosyanın) toplamlarını bu özete ekler."""
+        self.count += other.count
+        self.score_sum += other.score_sum
+        for label, n in other.risk_counts.items():
+            self.risk_counts[label] = self.risk_counts.get(label, 0) + n
+        self.histogram += other.histogram
+        for col, n in other.unknown_counts.items():
+            self.unknown_counts[col] = self.unknown_counts.get(col, 0) + n
+        if self.preview is None and other.preview is not None:
+            self.preview = other.preview
+        return self
+
+    @property
+    def mean_score(self):
+        return self.score_sum / self.count if self.count else 0.0
+
+    def risk_frame(self):
+        return pd.DataFrame({"Risk": list(self.risk_counts), "Sayı": list(self.risk_counts.values())})
+
+    def histogram_frame(self):
+        return pd.DataFrame({
+            "Tahmini_Not": (HISTOGRAM_BINS[:-1] + HISTOGRAM_BINS[1:]) / 2,
+            "Sayı": self.histogram,
+        })
+
+
+def _is_integral(values):
+    """Sayısal sütunun boş olmayan tüm değerleri tam sayı mı (örn. read_csv'nin NaN yüzünden float yaptığı notlar)."""
+    if pd.api.types.is_integer_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return True
+    if not pd.api.types.is_float_dtype(values):
+        return False
+    finite = values.dropna().to_numpy()
+    return bool(np.all(np.isfinite(finite) & (finite == np.round(finite))))
+
+
+def _restore_integers(df):
+    """Tam sayı değerli float sütunları (boş değer varsa) nullable Int64'e çevirir; rapor metinleri "23.0" yazmaz."""
+    for col in df.columns:
+        if col != SCORE_COLUMN and pd.api.types.is_float_dtype(df[col]) and _is_integral(df[col]):
+            df[col] = df[col].astype("Int64")
+    return df
+
+
+class ResultSpill:
+    """
+    Satır bazlı sonuçları geçici bir dosyaya parça parça yazar.
+    pyarrow varsa Parquet (sütunlu, sıkıştırılmış), yoksa CSV kullanılır.
+    Tam sayı girdiler (saat, devam, notlar) nullable Int64 olarak saklanır; float'a çevrilmez.
+    """
+
+    def __init__(self, path=None):
+        if path is not None:
+            self.format = "parquet" if path.endswith(".parquet") else "csv"
+        else:
+            try:
+                import pyarrow  # noqa: F401
+                self.format = "parquet"
+            except ImportError:
+                self.format = "csv"
+            fd, path = tempfile.mkstemp(prefix="eduanalytix_batch_", suffix=f".{self.format}")
+            os.close(fd)
+        self.path = path
+        self._writer = None
+        self._columns = None
+        self._integer_columns = None
+        self._started = False
+
+    def write(self, df):
+        if self._columns is None:
+            self._columns = list(df.columns)
+            # Sütun tipleri ilk parçaya göre belirlenir: tam sayı değerli sayısal sütunlar Int64 kalır
+            self._integer_columns = {col for col in df.columns if col != SCORE_COLUMN
+                                     and pd.api.types.is_numeric_dtype(df[col]) and _is_integral(df[col])}
+        df = df.reindex(columns=self._columns)
+        # Sonraki bir parçada kesirli değer gelirse o sütun (dosyanın tamamında) float64'e yükseltilir
+        promoted = {col for col in self._integer_columns
+                    if pd.api.types.is_numeric_dtype(df[col]) and not _is_integral(df[col])}
+        if promoted:
+            self._promote(promoted)
+        df = df.apply(lambda s: s.astype("Int64") if s.name in self._integer_columns
+                      else s.astype("float64") if pd.api.types.is_numeric_dtype(s)
+                      else s.where(s.isna(), s.astype(str)))
+
+        if self.format == "csv":
+            df.to_csv(self.path, mode="a" if self._started else "w", header=not self._started, index=False)
+            self._started = True
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        # Parçalar arasında tip farkı olmasın diye sayısal sütunlar Int64/float64, diğerleri metin olarak yazılır
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def _promote(self, columns):
+        self._integer_columns -= columns
+        if self._writer is None:
+            # CSV'de tip dosyaya yazılmaz; okurken parça parça belirlenir
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        # Parquet şeması dosya başında sabittir: şimdiye kadar yazılanlar yeni şemayla yeniden yazılır (nadir durum)
+        self._writer.close()
+        table = pq.read_table(self.path)
+        schema = pa.schema([field.with_type(pa.float64()) if field.name in columns else field for field in table.schema])
+        table = table.cast(schema)
+        self._writer = pq.ParquetWriter(self.path, schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def iter_results(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Geçici sonuç dosyasını parça parça geri okur; tam sayı sütunlar nullable Int64 olarak döner."""
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+    else:
+        # CSV'de boş değer içeren tam sayı sütunları read_csv tarafından float okunur
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            yield _restore_integers(chunk)
+
+
+def score_csv_stream(source, model, preprocessor, chunksize=DEFAULT_CHUNKSIZE, progress_callback=None,
+                     total_bytes=None, result_path=None, monitor=None, explainer=None):
+    """
+    CSV'yi parça parça okuyup her parçayı kodlar ve tahmin eder.
+    Bellekte sadece o anki parça ve yürüyen toplamlar tutulur; satır sonuçları geçici dosyaya yazılır.
+    progress_callback(0-1 arası oran) okunan bayt miktarına göre çağrılır.
+    """
+    summary = BatchSummary()
+    spill = ResultSpill(result_path)
+    try:
+        for chunk in pd.read_csv(source, chunksize=chunksize):
+            chunk, unknown_counts = score_frame(normalize_columns(chunk), model, preprocessor, monitor, explainer)
+            summary.update(chunk, unknown_counts)
+            with stage("batch.write", rows=len(chunk)):
+                spill.write(chunk)
+            if progress_callback is not None and total_bytes and hasattr(source, "tell"):
+                progress_callback(min(source.tell() / total_bytes, 1.0))
+    finally:
+        spill.close()
+
+    summary.result_path = spill.path
+    summary.result_format = spill.format
+    if progress_callback is not None:
+        progress_callback(1.0)
+    return summary
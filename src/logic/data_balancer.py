@@ -1,7 +1,9 @@
 import pandas as pd
 import numpy as np
+import argparse
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 # --- DİNAMİK YOL AYARI ---
 # Scriptin olduğu dizini ve proje kök dizini (root) buluyoruz
@@ -12,66 +14,186 @@ root_dir = os.path.abspath(os.path.join(current_dir, '..', '..'))
 INPUT_FILE = os.path.join(root_dir, "data", "student_performance.csv")
 OUTPUT_FILE = os.path.join(root_dir, "data", "student_performance_balanced.csv")
 
-
-def generate_balanced_data(num_samples=4000):
-    new_rows = []
-
-    # İstatistiksel olasılıkları koruyarak veri üretimi
-    for _ in range(num_samples):
-        hours = np.random.randint(1, 35)
-        attendance = np.random.randint(40, 100)
-        prev_score = np.random.randint(30, 100)
-        sleep = np.random.randint(4, 10)
-        tutoring = np.random.randint(0, 8)
-        physical = np.random.randint(0, 6)
-
-        motivation = np.random.choice(['Low', 'Medium', 'High'], p=[0.3, 0.4, 0.3])
-        parental = np.random.choice(['Low', 'Medium', 'High'], p=[0.3, 0.4, 0.3])
-        resources = np.random.choice(['Low', 'Medium', 'High'], p=[0.3, 0.4, 0.3])
-        income = np.random.choice(['Low', 'Medium', 'High'], p=[0.3, 0.4, 0.3])
-        teacher = np.random.choice(['Low', 'Medium', 'High'], p=[0.3, 0.4, 0.3])
-        distance = np.random.choice(['Near', 'Moderate', 'Far'], p=[0.4, 0.4, 0.2])
-        peer = np.random.choice(['Negative', 'Neutral', 'Positive'], p=[0.2, 0.5, 0.3])
-        internet = np.random.choice(['Yes', 'No'], p=[0.8, 0.2])
-        disability = np.random.choice(['Yes', 'No'], p=[0.1, 0.9])
-
-        # --- MANTIKSAL SKOR HESAPLAMA ---
-        # Bu kısım modelin "duyarlılığını" artıracak olan formüldür
-        score_weight = 0
-
-        # Kritik Faktörler (%60)
-        score_weight += (prev_score / 100) * 0.3
-        score_weight += (hours / 35) * 0.15
-        score_weight += (attendance / 100) * 0.15
-
-        # Destekleyici Faktörler (%30)
-        m_map = {'Low': 0, 'Medium': 0.5, 'High': 1}
-        score_weight += m_map[motivation] * 0.1
-        score_weight += (sleep / 10) * 0.1
-        score_weight += m_map[teacher] * 0.1
-
-        # Çevresel ve Sosyal (%10)
-        score_weight += (1 if internet == 'Yes' else 0) * 0.05
-        score_weight += (0 if disability == 'Yes' else 0.05)
-
-        # Rastgele gürültü ekleyerek veriyi gerçekçileştir (Normal Dağılım)
-        final_score = (score_weight * 100) + np.random.normal(0, 3)
-        final_score = max(min(final_score, 100), 10)
-
-        new_rows.append({
-            'hours_studied': hours, 'attendance': attendance, 'previous_scores': prev_score,
-            'sleep_hours': sleep, 'tutoring_sessions': tutoring, 'physical_activity': physical,
-            'motivation_level': motivation, 'parental_involvement': parental,
-            'access_to_resources': resources, 'internet_access': internet,
-            'family_income': income, 'teacher_quality': teacher,
-            'peer_influence': peer, 'learning_disabilities': disability,
-            'distance_from_home': distance, 'exam_score': round(final_score, 1)
-        })
-
-    return pd.DataFrame(new_rows)
+# Her parçada (chunk) üretilecek satır sayısı. Bellek kullanımı num_samples'tan bağımsız
+# olarak bu değerle sınırlı kalır.
+DEFAULT_CHUNK_SIZE = 250_000
+
+LEVELS = ['Low', 'Medium', 'High']
+
+# Kategorik sütunlar: (değerler, olasılıklar)
+CATEGORICAL_SPECS = {
+    'motivation_level': (LEVELS, [0.3, 0.4, 0.3]),
+    'parental_involvement': (LEVELS, [0.3, 0.4, 0.3]),
+    'access_to_resources': (LEVELS, [0.3, 0.4, 0.3]),
+    'internet_access': (['Yes', 'No'], [0.8, 0.2]),
+    'family_income': (LEVELS, [0.3, 0.4, 0.3]),
+    'teacher_quality': (LEVELS, [0.3, 0.4, 0.3]),
+    'peer_influence': (['Negative', 'Neutral', 'Positive'], [0.2, 0.5, 0.3]),
+    'learning_disabilities': (['Yes', 'No'], [0.1, 0.9]),
+    'distance_from_home': (['Near', 'Moderate', 'Far'], [0.4, 0.4, 0.2]),
+}
+
+# Çıktı dosyasındaki sütun sırası
+BALANCED_COLUMNS = [
+    'hours_studied', 'attendance', 'previous_scores', 'sleep_hours', 'tutoring_sessions',
+    'physical_activity', 'motivation_level', 'parental_involvement', 'access_to_resources',
+    'internet_access', 'family_income', 'teacher_quality', 'peer_influence',
+    'learning_disabilities', 'distance_from_home', 'exam_score'
+]
+
+
+def _generate_chunk(rng, n):
+    """Tek bir parçayı sütun sütun (vektörel) üretir."""
+    hours = rng.integers(1, 35, n)
+    attendance = rng.integers(40, 100, n)
+    prev_score = rng.integers(30, 100, n)
+    sleep = rng.integers(4, 10, n)
+    tutoring = rng.integers(0, 8, n)
+    physical = rng.integers(0, 6, n)
+
+    # Kategorik sütunları önce kod (0, 1, 2) olarak çekip sonra etikete çeviriyoruz
+    codes = {}
+    columns = {
+        'hours_studied': hours, 'attendance': attendance, 'previous_scores': prev_score,
+        'sleep_hours': sleep, 'tutoring_sessions': tutoring, 'physical_activity': physical,
+    }
+    for col, (values, probs) in CATEGORICAL_SPECS.items():
+        codes[col] = rng.choice(len(values), size=n, p=probs)
+        columns[col] = np.asarray(values, dtype=object)[codes[col]]
+
+    # --- MANTIKSAL SKOR HESAPLAMA ---
+    # Bu kısım modelin "duyarlılığını" artıracak olan formüldür
+    # Low/Medium/High kodları sırasıyla 0 / 0.5 / 1 ağırlığına denk gelir
+    m_map = np.array([0, 0.5, 1])
+
+    # Kritik Faktörler (%60)
+    score_weight = (prev_score / 100) * 0.3
+    score_weight += (hours / 35) * 0.15
+    score_weight += (attendance / 100) * 0.15
+
+    # Destekleyici Faktörler (%30)
+    score_weight += m_map[codes['motivation_level']] * 0.1
+    score_weight += (sleep / 10) * 0.1
+    score_weight += m_map[codes['teacher_quality']] * 0.1
+
+    # Çevresel ve Sosyal (%10)  ('Yes' kodu 0)
+    score_weight += (codes['internet_access'] == 0) * 0.05
+    score_weight += (codes['learning_disabilities'] != 0) * 0.05
+
+    # Rastgele gürültü ekleyerek veriyi gerçekçileştir (Normal Dağılım)
+    final_score = (score_weight * 100) + rng.normal(0, 3, n)
+    columns['exam_score'] = np.round(np.clip(final_score, 10, 100), 1)
+
+    return pd.DataFrame(columns, columns=BALANCED_COLUMNS)
+
+
+def _generate_chunk_from_seed(seed_seq, n):
+    """Süreç havuzu için: kendi tohum akışından bağımsız bir parça üretir."""
+    return _generate_chunk(np.random.default_rng(seed_seq), n)
+
+
+def iter_balanced_chunks(num_samples, chunk_size=DEFAULT_CHUNK_SIZE, seed=None, workers=1):
+    """
+    Sentetik veriyi sabit boyutlu DataFrame parçaları halinde üretir.
+    Her parçanın kendi tohum akışı (SeedSequence.spawn) vardır; bu yüzden aynı
+    seed ve chunk_size ile çıktı, işçi (worker) sayısından bağımsız olarak aynıdır.
+    """
+    sizes = [chunk_size] * (num_samples // chunk_size)
+    if num_samples % chunk_size:
+        sizes.append(num_samples % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if workers <= 1:
+        for seed_seq, n in zip(seeds, sizes):
+            yield _generate_chunk_from_seed(seed_seq, n)
+        return
+
+    # Çok süreçli mod: bellekte en fazla 2 * workers parça bekletilir, sıra korunur
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for seed_seq, n in zip(seeds, sizes):
+            pending.append(executor.submit(_generate_chunk_from_seed, seed_seq, n))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def generate_balanced_data(num_samples=4000, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    chunks = list(iter_balanced_chunks(num_samples, chunk_size=chunk_size, seed=seed))
+    if not chunks:
+        return pd.DataFrame(columns=BALANCED_COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write_balanced_data(output_path, num_samples, chunk_size=DEFAULT_CHUNK_SIZE, seed=None, workers=1,
+                        header_df=None):
+    """
+    Üretilen parçaları doğrudan CSV'ye (veya .parquet uzantılıysa Parquet'e) yazar.
+    header_df verilirse önce o yazılır (örn. gerçek Kaggle verisi), sentetik veri arkasına eklenir.
+    Toplam yazılan satır sayısını döndürür.
+    """
+    chunks = iter_balanced_chunks(num_samples, chunk_size=chunk_size, seed=seed, workers=workers)
+    if header_df is not None:
+        chunks = _prepend(header_df, chunks)
+
+    if output_path.endswith(".parquet"):
+        return _write_parquet(output_path, chunks)
+
+    total = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        total += len(chunk)
+    return total
+
+
+def _prepend(first_df, chunks):
+    yield first_df
+    for chunk in chunks:
+        yield chunk[list(first_df.columns)]
+
+
+def _write_parquet(output_path, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet çıktısı için 'pyarrow' kurulu olmalı: pip install pyarrow")
+
+    writer = None
+    total = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            total += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mantıksal sentetik öğrenci verisi üretir.")
+    parser.add_argument("--samples", type=int, default=4000, help="Üretilecek sentetik satır sayısı")
+    parser.add_argument("--seed", type=int, default=None, help="Tekrarlanabilir çıktı için tohum")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="Paralel üretim için süreç sayısı")
+    parser.add_argument("--output", default=None,
+                        help="Sadece sentetik veriyi bu dosyaya (.csv / .parquet) akıt; Kaggle verisiyle birleştirme yapılmaz")
+    args = parser.parse_args()
+
+    if args.output:
+        print(f"⏳ {args.samples} satır sentetik veri üretiliyor -> {args.output}")
+        total = write_balanced_data(args.output, args.samples, chunk_size=args.chunk_size,
+                                    seed=args.seed, workers=args.workers)
+        print(f"✅ Başarılı! {total} satır yazıldı.")
+        sys.exit(0)
+
     print(f"🔍 Kaynak dosya kontrol ediliyor: {INPUT_FILE}")
 
     if os.path.exists(INPUT_FILE):
@@ -79,16 +201,13 @@ if __name__ == "__main__":
         # Sütun isimlerini normalize et
         original_df.columns = original_df.columns.str.strip().str.lower()
 
-        print("⏳ 4000 satır mantıksal sentetik veri üretiliyor...")
-        synthetic_df = generate_balanced_data(4000)
-
+        print(f"⏳ {args.samples} satır mantıksal sentetik veri üretiliyor...")
         print("🔗 Mevcut veri setiyle birleştiriliyor...")
-        common_cols = list(set(original_df.columns) & set(synthetic_df.columns))
-        combined_df = pd.concat([original_df[common_cols], synthetic_df[common_cols]], ignore_index=True)
+        common_cols = [c for c in BALANCED_COLUMNS if c in original_df.columns]
+        total = write_balanced_data(OUTPUT_FILE, args.samples, chunk_size=args.chunk_size, seed=args.seed,
+                                    workers=args.workers, header_df=original_df[common_cols])
 
-        # Yeni dosyayı kaydet
-        combined_df.to_csv(OUTPUT_FILE, index=False)
         print(f"✅ Başarılı! Yeni eğitim dosyan hazır: {OUTPUT_FILE}")
-        print(f"📊 Toplam veri büyüklüğü: {len(combined_df)} satır.")
+        print(f"📊 Toplam veri büyüklüğü: {total} satır.")
     else:
-        print(f"❌ HATA: Kaynak dosya bulunamadı! Lütfen şurada bir CSV olduğundan emin ol: {INPUT_FILE}")
\ No newline at end of file
+        print(f"❌ HATA: Kaynak dosya bulunamadı! Lütfen şurada bir CSV olduğundan emin ol: {INPUT_FILE}")
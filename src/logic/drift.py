@@ -0,0 +1,278 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+
+import numpy as np
+
+# Eğitimde her özellik için küçük bir referans taslağı (sketch) kaydedilir:
+#   sayısal sütunlar -> eğitim dağılımının yüzdeliklerinden sabit kova sınırları + kova sayıları
+#   kategorik sütunlar (kodlanmış) -> sınıf başına frekans tablosu
+# Skorlama sırasında aynı kovalara düşen sayılar tutulur (özellik başına sabit boyutlu dizi);
+# PSI ve kovalanmış KS bu sayılardan O(kova) sürede hesaplanır.
+DRIFT_REFERENCE_FILE = "drift_reference.json"
+NUMERIC_BINS = 10
+
+# PSI eşikleri (yaygın kullanım): < 0.1 kararlı, 0.1-0.25 hafif kayma, > 0.25 belirgin kayma
+PSI_WARN = 0.1
+PSI_ALERT = 0.25
+# Bu sayıdan az örnekle hesaplanan skorlar güvenilir sayılmaz
+MIN_SAMPLES = 100
+# Boş kovalarda log(0) olmaması için oranlara eklenen küçük değer
+_EPSILON = 1e-4
+
+# Anlık sayılar veritabanına bu kadar satırda bir ya da bu kadar saniyede bir (yeni satır varsa) yazılır
+DEFAULT_FLUSH_ROWS = 1000
+DEFAULT_FLUSH_SECONDS = 300.0
+
+
+def build_reference(X, label_encoders, bins=NUMERIC_BINS):
+    """Kodlanmış eğitim matrisinden özellik başına referans taslaklarını üretir (JSON'a yazılabilir sözlük)."""
+    features = {}
+    for col in X.columns:
+        values = X[col].to_numpy()
+        if col in label_encoders:
+            classes = [str(c) for c in label_encoders[col].classes_]
+            counts = np.bincount(values.astype(np.int64), minlength=len(classes))
+            features[col] = {"type": "categorical", "classes": classes, "counts": counts.tolist()}
+        else:
+            values = values.astype("float64")
+            finite = values[~np.isnan(values)]
+            # İç sınırlar yüzdeliklerden alınır (eşit dolu kovalar); tekrar eden sınırlar tek kovaya iner
+            edges = np.unique(np.quantile(finite, np.linspace(0, 1, bins + 1)[1:-1])) if len(finite) else np.array([])
+            # En küçük değere eşit sınır her zaman boş bir ilk kova bırakır
+            edges = edges[edges > finite.min()] if len(finite) else edges
+            counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+            features[col] = {"type": "numeric", "edges": edges.tolist(), "counts": counts.tolist()}
+    return {"rows": int(len(X)), "features": features}
+
+
+def extend_reference(reference, X, label_encoders):
+    """
+    Artımlı eğitimde yeni eğitim satırlarını var olan taslağa ekler (yeni bir kopya döndürür).
+    Sayısal kova sınırları değişmez; encoder'a sonradan eklenen sınıflar frekans tablosunun sonuna eklenir.
+    """
+    features = {}
+    for col, spec in reference["features"].items():
+        counts = np.asarray(spec["counts"], dtype=np.int64)
+        if col not in X.columns:
+            features[col] = dict(spec)
+            continue
+        values = X[col].to_numpy()
+        if spec["type"] == "categorical":
+            classes = [str(c) for c in label_encoders[col].classes_] if col in label_encoders else spec["classes"]
+            counts = np.concatenate([counts, np.zeros(len(classes) - len(counts), dtype=np.int64)])
+            counts += np.bincount(values.astype(np.int64), minlength=len(classes))[:len(classes)]
+            features[col] = {"type": "categorical", "classes": classes, "counts": counts.tolist()}
+        else:
+            edges = np.asarray(spec["edges"], dtype="float64")
+            counts += np.bincount(np.searchsorted(edges, values.astype("float64"), side="right"), minlength=len(counts))
+            features[col] = {"type": "numeric", "edges": spec["edges"], "counts": counts.tolist()}
+    return {"rows": int(reference["rows"] + len(X)), "features": features}
+
+
+def save_reference(reference, path):
+    with open(path, "w") as f:
+        json.dump(reference, f)
+
+
+def load_reference(path):
+    """Referans dosyası yoksa (eski model paketleri) None döndürür."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def psi(expected_counts, actual_counts):
+    """Population Stability Index: sum((a - e) * ln(a / e)) kova oranları üzerinden."""
+    e = np.asarray(expected_counts, dtype="float64")
+    a = np.asarray(actual_counts, dtype="float64")
+    e = e / max(e.sum(), 1.0) + _EPSILON
+    a = a / max(a.sum(), 1.0) + _EPSILON
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def binned_ks(expected_counts, actual_counts):
+    """Kovalanmış iki dağılımın kümülatif oranları arasındaki en büyük fark (KS istatistiğine yaklaşım)."""
+    e = np.cumsum(expected_counts) / max(np.sum(expected_counts), 1)
+    a = np.cumsum(actual_counts) / max(np.sum(actual_counts), 1)
+    return float(np.max(np.abs(a - e)))
+
+
+def drift_status(psi_value, samples):
+    if samples < MIN_SAMPLES:
+        return "⏳ Yetersiz örnek"
+    if psi_value >= PSI_ALERT:
+        return "🔴 Belirgin kayma"
+    if psi_value >= PSI_WARN:
+        return "🟠 Hafif kayma"
+    return "🟢 Kararlı"
+
+
+class DriftMonitor:
+    """
+    Skorlanan (kodlanmış) girdilerin özellik başına kova sayılarını tutar ve referansla karşılaştırır.
+    Bellek kullanımı özellik başına kova sayısı kadardır; update() parça başına özellik sayısı kadar
+    vektörel adım yapar. İki sayaç tutulur: süreç boyunca toplam (anlık panel) ve son yazımdan bu yana
+    (veritabanındaki pencere kayıtları).
+    """
+
+    def __init__(self, reference, model_version=None, source="dashboard",
+                 flush_rows=DEFAULT_FLUSH_ROWS, flush_seconds=DEFAULT_FLUSH_SECONDS):
+        self.model_version = model_version
+        self.source = source
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.features = []
+        self.classes = {}
+        for name, spec in reference["features"].items():
+            self.classes[name] = spec.get("classes")
+            edges = np.asarray(spec["edges"], dtype="float64") if spec["type"] == "numeric" else None
+            self.features.append((name, edges, np.asarray(spec["counts"], dtype=np.int64)))
+        self.rows = 0
+        self.counts = {name: np.zeros(len(ref), dtype=np.int64) for name, _, ref in self.features}
+        self._window_rows = 0
+        self._window = {name: np.zeros(len(ref), dtype=np.int64) for name, _, ref in self.features}
+        # Tek satırlık güncellemeler numpy yerine saf Python ile yapılır (bisect sınır listesi üzerinde)
+        self._edge_lists = {name: edges.tolist() for name, edges, _ in self.features if edges is not None}
+        self._columns_key = None
+        self._positions = None
+        self._last_flush = time.monotonic()
+        self._flushing = False
+        self._lock = threading.Lock()
+
+    def _column_positions(self, columns):
+        # Kodlanmış çerçevenin sütun sırası sürüm boyunca aynıdır; eşleme bir kez hesaplanır
+        key = tuple(columns)
+        if key != self._columns_key:
+            index = {col: i for i, col in enumerate(key)}
+            self._positions = [(name, index[name], edges, len(ref))
+                               for name, edges, ref in self.features if name in index]
+            self._columns_key = key
+        return self._positions
+
+    def _bin_value(self, name, value, edges, size):
+        if edges is None:
+            # Kodlanmış kategoriler zaten 0..k-1; aralık dışı kodlar (olmamalı) uç sınıflara sayılır
+            return min(max(int(value), 0), size - 1)
+        # NaN hiçbir sınırdan küçük olmadığı için searchsorted gibi son kovaya düşer
+        return bisect_right(self._edge_lists[name], value)
+
+    @staticmethod
+    def _bin_column(values, edges, size):
+        if edges is None:
+            return np.bincount(np.clip(values.astype(np.int64), 0, size - 1), minlength=size)
+        return np.bincount(np.searchsorted(edges, values, side="right"), minlength=size)
+
+    def update(self, processed_df):
+        """Kodlanmış bir parçanın (preprocessor.transform çıktısı) değerlerini taslaklara ekler."""
+        n = len(processed_df)
+        if not n:
+            return
+        # Sütun sütun pandas erişimi yerine tek bir sayısal matris (parça başına bir kopya)
+        matrix = processed_df.to_numpy(dtype="float64")
+        positions = self._column_positions(processed_df.columns)
+        if n == 1:
+            row = matrix[0].tolist()
+            binned = [(name, self._bin_value(name, row[pos], edges, size)) for name, pos, edges, size in positions]
+        else:
+            binned = [(name, self._bin_column(matrix[:, pos], edges, size)) for name, pos, edges, size in positions]
+        with self._lock:
+            for name, add in binned:
+                if n == 1:
+                    self.counts[name][add] += 1
+                    self._window[name][add] += 1
+                else:
+                    self.counts[name] += add
+                    self._window[name] += add
+            self.rows += n
+            self._window_rows += n
+        self.maybe_flush()
+
+    def merge_counts(self, counts, rows):
+        """Başka bir süreçte (örn. toplu skorlama işçisi) toplanan sayıları ekler."""
+        with self._lock:
+            for name, add in counts.items():
+                if name in self.counts:
+                    self.counts[name] += add
+                    self._window[name] += add
+            self.rows += rows
+            self._window_rows += rows
+
+    @staticmethod
+    def _scores(features, counts, rows):
+        result = []
+        for name, edges, ref in features:
+            actual = counts[name]
+            result.append({
+                "feature": name,
+                "psi": psi(ref, actual) if rows else 0.0,
+                # KS sadece sıralı (sayısal) kovalarda anlamlıdır
+                "ks": binned_ks(ref, actual) if rows and edges is not None else None,
+                "samples": int(rows),
+            })
+        return result
+
+    def scores(self):
+        """Süreç boyunca toplanan girdiler için özellik başına PSI / KS (en yüksek PSI önce)."""
+        with self._lock:
+            counts = {name: c.copy() for name, c in self.counts.items()}
+            rows = self.rows
+        return sorted(self._scores(self.features, counts, rows), key=lambda r: -r["psi"])
+
+    def distributions(self, feature):
+        """Panel için (referans oranları, güncel oranlar, kova etiketleri)."""
+        for name, edges, ref in self.features:
+            if name != feature:
+                continue
+            with self._lock:
+                actual = self.counts[name].copy()
+            if edges is None:
+                labels = self.classes.get(name) or [str(i) for i in range(len(ref))]
+            else:
+                bounds = [f"{e:g}" for e in edges]
+                labels = [f"< {bounds[0]}"] if bounds else ["tümü"]
+                labels += [f"{lo} – {hi}" for lo, hi in zip(bounds, bounds[1:])]
+                labels += [f"≥ {bounds[-1]}"] if bounds else []
+            return ref / max(ref.sum(), 1), actual / max(actual.sum(), 1), labels
+        raise KeyError(feature)
+
+    def take_window(self):
+        """Son yazımdan bu yana toplanan pencereyi (skorlar ve sayılar) alır ve sıfırlar."""
+        with self._lock:
+            window, rows = self._window, self._window_rows
+            self._window = {name: np.zeros_like(c) for name, c in window.items()}
+            self._window_rows = 0
+            self._last_flush = time.monotonic()
+        return self._scores(self.features, window, rows), window, rows
+
+    def maybe_flush(self):
+        """Pencere yeterince dolduysa ya da süresi geldiyse arka planda veritabanına yazar (sıcak yolu bekletmez)."""
+        due = self._window_rows >= self.flush_rows or (
+            self._window_rows and time.monotonic() - self._last_flush >= self.flush_seconds)
+        if not due or self._flushing:
+            return
+        self._flushing = True
+        threading.Thread(target=self.flush, daemon=True).start()
+
+    def flush(self):
+        """Penceredeki skorları feature_drift tablosuna yazar; yazılan satır sayısını döndürür."""
+        try:
+            scores, window, rows = self.take_window()
+            if not rows:
+                return 0
+            from src.database.crud import save_drift_window
+            from src.database.db_config import SessionLocal
+
+            db = SessionLocal()
+            try:
+                return save_drift_window(db, self.model_version, self.source, scores, window)
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"⚠️ Dağılım kayması kaydedilemedi: {e}")
+            return 0
+        finally:
+            self._flushing = False
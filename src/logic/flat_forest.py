@@ -0,0 +1,164 @@
+import json
+import os
+
+import numpy as np
+
+# Dışa aktarılan diziler; her biri ayrı bir .npy dosyası olarak saklanır ki
+# np.load(mmap_mode='r') ile birden çok süreç aynı sayfa önbelleğini paylaşabilsin.
+ARRAY_NAMES = ("feature", "threshold", "children", "value", "roots")
+META_FILE = "meta.json"
+
+# Büyük toplu tahminlerde (satır x ağaç) ara dizilerin boyutunu sınırlamak için blok boyu
+DEFAULT_BLOCK_ROWS = 1024
+
+
+def flatten_forest(model):
+    """
+    Eğitilmiş bir RandomForestRegressor'ı tüm ağaçları tek bir düğüm uzayında birleştiren
+    bitişik NumPy dizilerine çevirir. Yaprak düğümler kendilerine işaret eder; böylece
+    ağaçlar dallanma olmadan sabit sayıda adımda yürünebilir.
+    children[i] = [sol, sağ] çocuk düğümün global indeksidir.
+    """
+    features, thresholds, children, values, roots = [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold).astype(np.float64))
+        left = np.where(is_leaf, node_ids, tree.children_left)
+        right = np.where(is_leaf, node_ids, tree.children_right)
+        children.append((np.stack([left, right], axis=1) + offset).astype(np.int64))
+        values.append(tree.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    arrays = {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "children": np.concatenate(children),
+        "value": np.concatenate(values),
+        "roots": np.asarray(roots, dtype=np.int64),
+    }
+    meta = {
+        "n_trees": len(model.estimators_),
+        "n_nodes": int(offset),
+        "max_depth": int(max_depth),
+        "feature_names": [str(c) for c in getattr(model, "feature_names_in_", [])],
+    }
+    return arrays, meta
+
+
+def export_flat_forest(model, out_dir):
+    """Modeli düz dizilere çevirip out_dir altına .npy + meta.json olarak yazar."""
+    arrays, meta = flatten_forest(model)
+    os.makedirs(out_dir, exist_ok=True)
+    for name in ARRAY_NAMES:
+        np.save(os.path.join(out_dir, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+    with open(os.path.join(out_dir, META_FILE), "w") as f:
+        json.dump(meta, f)
+    return meta
+
+
+class FlatForest:
+    """sklearn modeline ihtiyaç duymadan, tüm ağaçları vektörel olarak yürüyen tahminci."""
+
+    def __init__(self, arrays, meta):
+        for name in ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        self.n_trees = meta["n_trees"]
+        self.max_depth = meta["max_depth"]
+        self.feature_names = meta.get("feature_names") or None
+
+    @classmethod
+    def from_model(cls, model):
+        arrays, meta = flatten_forest(model)
+        return cls(arrays, meta)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Dizileri yükler. mmap=True iken dosyalar salt-okunur bellek eşlemesiyle açılır."""
+        with open(os.path.join(path, META_FILE), "r") as f:
+            meta = json.load(f)
+        mmap_mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        return cls(arrays, meta)
+
+    def _as_matrix(self, X):
+        if hasattr(X, "columns"):
+            if self.feature_names:
+                X = X[self.feature_names]
+            X = X.to_numpy()
+        # sklearn ağaçları girdiyi float32'ye çevirip float64 eşikle karşılaştırır; aynısını yapıyoruz
+        return np.asarray(X, dtype=np.float32)
+
+    def _walk(self, X, contributions=None):
+        """
+        Tüm (satır, ağaç) çiftlerini birlikte yürür ve ulaşılan yaprakları döndürür: (n_satır, n_ağaç).
+        contributions (n_satır * n_özellik boyutlu düz dizi) verilirse her adımdaki değer değişimi
+        bölen özelliğe eklenir (ağaçlar üzerinden toplam).
+        """
+        n, n_features = X.shape
+        flat_x = X.ravel()
+        children = self.children.reshape(-1)
+
+        # Tüm (satır, ağaç) çiftleri tek bir düz dizide birlikte yürünür
+        nodes = np.tile(self.roots, n)
+        row_base = np.repeat(np.arange(n) * n_features, self.n_trees)
+        positions = np.arange(n * self.n_trees)
+        leaves = np.empty(n * self.n_trees, dtype=np.int64)
+
+        for _ in range(self.max_depth):
+            split = self.feature[nodes]
+            go_right = flat_x[row_base + split] > self.threshold[nodes]
+            next_nodes = children[2 * nodes + go_right]
+            if contributions is not None:
+                # Yapraklarda düğüm değişmediği için katkı 0'dır
+                contributions += np.bincount(row_base + split, weights=self.value[next_nodes] - self.value[nodes],
+                                             minlength=contributions.size)
+            # Yapraklar kendine işaret eder; yaprağa ulaşan çiftler aktif kümeden çıkarılır
+            done = next_nodes == nodes
+            if done.any():
+                leaves[positions[done]] = nodes[done]
+                active = ~done
+                nodes, positions, row_base = next_nodes[active], positions[active], row_base[active]
+                if len(nodes) == 0:
+                    break
+            else:
+                nodes = next_nodes
+        leaves[positions] = nodes
+        return leaves.reshape(n, self.n_trees)
+
+    def apply(self, X):
+        """Her satır ve ağaç için ulaşılan yaprağın (global) düğüm indeksini döndürür: (n_satır, n_ağaç)."""
+        return self._walk(self._as_matrix(X))
+
+    def contributions(self, X, block_rows=DEFAULT_BLOCK_ROWS):
+        """
+        Ağaç yolu katkıları (Saabas): her bölünmede düğüm değerindeki değişim, bölen özelliğe yazılır ve
+        ağaçlar üzerinden ortalanır. (bias, katkılar) döndürür; katkılar (n_satır, n_özellik) boyutludur ve
+        bias + katkılar.sum(axis=1) tahmine eşittir. bias, kökler üzerinden ortalama (eğitim ortalaması).
+        """
+        X = self._as_matrix(X)
+        n, n_features = X.shape
+        out = np.zeros((n, n_features), dtype=np.float64)
+        for start in range(0, n, block_rows):
+            block = X[start:start + block_rows]
+            flat = np.zeros(len(block) * n_features, dtype=np.float64)
+            self._walk(block, flat)
+            out[start:start + block_rows] = flat.reshape(len(block), n_features) / self.n_trees
+        return float(self.value[self.roots].mean()), out
+
+    def predict(self, X, block_rows=DEFAULT_BLOCK_ROWS):
+        X = self._as_matrix(X)
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), block_rows):
+            leaves = self.apply(X[start:start + block_rows])
+            out[start:start + block_rows] = self.value[leaves].mean(axis=1)
+        return out
@@ -1,8 +1,11 @@
 import pandas as pd
+import numpy as np
+import argparse
 import joblib
 import json
 import os
 import sys
+import time
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import LabelEncoder
@@ -13,62 +16,140 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.abspath(os.path.join(current_dir, '..', '..'))
 sys.path.append(root_dir)
 
+from src.logic.drift import DRIFT_REFERENCE_FILE, build_reference, extend_reference, save_reference
+from src.logic.flat_forest import export_flat_forest
+from src.logic.model_registry import publish_bundle
+from src.logic.preprocessing import FeatureEncoder
+from src.utils.instrumentation import print_summary, stage
+
 # Dosya Yolları
 MODEL_DIR = os.path.join(root_dir, "models")
 MODEL_PATH = os.path.join(MODEL_DIR, "student_score_model.pkl")
 ENCODERS_PATH = os.path.join(MODEL_DIR, "encoders.pkl")
 METRICS_PATH = os.path.join(MODEL_DIR, "metrics.json")
+# Düşük gecikmeli çıkarım için düz dizi (flat array) formatındaki orman
+FLAT_FOREST_DIR = os.path.join(MODEL_DIR, "flat_forest")
+# Dağılım kayması izlemesi için eğitim verisinin özellik taslakları
+DRIFT_REFERENCE_PATH = os.path.join(MODEL_DIR, DRIFT_REFERENCE_FILE)
 
 # --- ÖNEMLİ: YENİ VERİ SETİ YOLU ---
 # data_balancer.py ile oluşturduğun dengeli veriyi kullanıyoruz
 BALANCED_DATA_PATH = os.path.join(root_dir, "data", "student_performance_balanced.csv")
 
-def train_and_save_model():
+# Akışlı (out-of-core) eğitim varsayılanları
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_SAMPLE_SIZE = 200_000
+
+
+def _normalize_columns(df):
+    """Sütun isimlerini küçük harfe çevirir ve gereksiz id sütununu atar."""
+    df.columns = df.columns.str.strip().str.lower()
+    if 'id' in df.columns:
+        df = df.drop(columns=['id'])
+    return df
+
+
+def _peak_rss_mb():
+    """Sürecin şimdiye kadarki en yüksek bellek kullanımı (MB). Desteklenmeyen sistemlerde None."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte cinsinden döndürür
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# Varsayılan model ayarları (hiperparametre araması bunların üzerine yazar)
+DEFAULT_MODEL_PARAMS = {"n_estimators": 150, "min_samples_split": 5}
+
+
+def _build_model(**params):
+    return RandomForestRegressor(random_state=42, **{**DEFAULT_MODEL_PARAMS, **params})
+
+
+def _save_artifacts(model, label_encoders, metrics_data, X_train=None, drift_reference=None):
+    if not os.path.exists(MODEL_DIR):
+        os.makedirs(MODEL_DIR)
+
+    joblib.dump(model, MODEL_PATH)
+    joblib.dump(label_encoders, ENCODERS_PATH)
+    export_flat_forest(model, FLAT_FOREST_DIR)
+    # Skorlama sırasında gelen girdiler bu taslaklarla karşılaştırılır (src/logic/drift.py)
+    if drift_reference is None and X_train is not None:
+        drift_reference = build_reference(X_train, label_encoders)
+    if drift_reference is not None:
+        save_reference(drift_reference, DRIFT_REFERENCE_PATH)
+
+    metrics_data["last_trained"] = pd.Timestamp.now().strftime("%d-%m-%Y %H:%M")
+    metrics_data["peak_rss_mb"] = _peak_rss_mb()
+    # Sürümlü paket olarak registry'e de yazılır ve aktif yapılır (dashboard yeniden başlatılmadan geçer)
+    metrics_data["version"] = publish_bundle(model, label_encoders, metrics_data, drift_reference=drift_reference)
+    with open(METRICS_PATH, "w") as f:
+        json.dump(metrics_data, f)
+
+    print(f"\n💾 Yeni model ve metrikler kaydedildi: {MODEL_DIR}")
+
+
+def load_training_split():
+    """
+    Dengelenmiş CSV'yi yükler, kategorik sütunları kodlar ve %80/%20 olarak böler.
+    Veri bulunamazsa None döndürür.
+    """
     print("⏳ Eğitim verisi yükleniyor...")
 
     # 1. Veriyi Yükle (Dengelenmiş CSV'den)
     if os.path.exists(BALANCED_DATA_PATH):
         print(f"📂 Dengelenmiş veri seti kullanılıyor: {BALANCED_DATA_PATH}")
-        df = pd.read_csv(BALANCED_DATA_PATH)
+        with stage("train.load") as s:
+            df = pd.read_csv(BALANCED_DATA_PATH)
+            s.rows = len(df)
     else:
         # Eğer dengelenmiş CSV yoksa hata ver ve dur (Çünkü sorunumuzu bu çözüyor)
         print(f"❌ HATA: {BALANCED_DATA_PATH} bulunamadı!")
         print("Lütfen önce 'data_balancer.py' scriptini çalıştırarak dengeli veriyi oluşturun.")
-        return
+        return None
 
-    # Sütun isimlerini küçük harfe çevirerek standardizasyon sağla
-    df.columns = df.columns.str.strip().str.lower()
-
-    # Gereksiz id varsa temizle
-    if 'id' in df.columns:
-        df = df.drop(columns=['id'])
+    # Sütun isimlerini küçük harfe çevirerek standardizasyon sağla (gereksiz id varsa temizlenir)
+    df = _normalize_columns(df)
 
     print(f"✅ {len(df)} satır veri ile eğitim başlıyor...")
 
     # 2. Veri Ön İşleme (Preprocessing)
-    label_encoders = {}
-    categorical_columns = df.select_dtypes(include=['object']).columns
+    with stage("train.encode", rows=len(df)):
+        label_encoders = {}
+        categorical_columns = df.select_dtypes(include=['object']).columns
 
-    for col in categorical_columns:
-        le = LabelEncoder()
-        df[col] = df[col].astype(str)
-        df[col] = le.fit_transform(df[col])
-        label_encoders[col] = le
+        for col in categorical_columns:
+            le = LabelEncoder()
+            df[col] = df[col].astype(str)
+            df[col] = le.fit_transform(df[col])
+            label_encoders[col] = le
+
+        # Hedef ve Özellik Ayrımı (Sütun isimlerinin küçük harf olduğundan emin ol)
+        X = df.drop(columns=['exam_score'])
+        y = df['exam_score']
 
-    # Hedef ve Özellik Ayrımı (Sütun isimlerinin küçük harf olduğundan emin ol)
-    X = df.drop(columns=['exam_score'])
-    y = df['exam_score']
+        # Bölme (%80 Eğitim, %20 Test)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return X_train, X_test, y_train, y_test, label_encoders
 
-    # Bölme (%80 Eğitim, %20 Test)
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+def train_and_save_model():
+    split = load_training_split()
+    if split is None:
+        return
+    X_train, X_test, y_train, y_test, label_encoders = split
 
     # 3. Modeli Eğit (Daha hassas olması için n_estimators artırılabilir)
     print("🧠 Yapay Zeka modeli eğitiliyor (Random Forest - Balanced)...")
-    model = RandomForestRegressor(n_estimators=150, random_state=42, min_samples_split=5)
-    model.fit(X_train, y_train)
+    model = _build_model()
+    with stage("train.fit", rows=len(X_train)):
+        model.fit(X_train, y_train)
 
     # 4. Test Et
-    predictions = model.predict(X_test)
+    with stage("train.evaluate", rows=len(X_test)):
+        predictions = model.predict(X_test)
     mae = mean_absolute_error(y_test, predictions)
     r2 = r2_score(y_test, predictions)
 
@@ -77,22 +158,344 @@ def train_and_save_model():
     print(f"Model Doğruluğu (R2 Score): {r2:.2f}")
 
     # 5. Kaydet
-    if not os.path.exists(MODEL_DIR):
-        os.makedirs(MODEL_DIR)
+    with stage("train.save"):
+        _save_artifacts(model, label_encoders, {"mae": mae, "r2": r2, "mode": "full"}, X_train)
+    print("✅ Artık dashboard üzerinden en kötü senaryoları test edebilirsiniz!")
 
-    joblib.dump(model, MODEL_PATH)
-    joblib.dump(label_encoders, ENCODERS_PATH)
 
+# --- AKIŞLI (OUT-OF-CORE) EĞİTİM ---
+def _iter_csv_chunks(path, chunksize):
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        yield _normalize_columns(chunk)
+
+
+def _iter_db_chunks(chunksize):
+    """training_data tablosunu sunucu taraflı imleçle (yield_per) parça parça okur."""
+    from sqlalchemy import select
+    from src.database.db_config import SessionLocal
+    from src.database.models import TrainingData
+
+    columns = [c for c in TrainingData.__table__.columns if c.name not in ('id', 'row_hash')]
+    db = SessionLocal()
+    try:
+        result = db.execute(select(*columns).execution_options(yield_per=chunksize))
+        keys = list(result.keys())
+        for partition in result.partitions():
+            yield pd.DataFrame(partition, columns=keys)
+    finally:
+        db.close()
+
+
+class _Reservoir:
+    """Sabit boyutlu rastgele örneklem (Algorithm R), parça parça vektörel güncellenir."""
+
+    def __init__(self, capacity, rng):
+        self.capacity = capacity
+        self.rng = rng
+        self.seen = 0
+        self.df = None
+
+    def add(self, chunk):
+        chunk = chunk.reset_index(drop=True)
+
+        # Rezervuar dolana kadar satırlar doğrudan eklenir
+        take = min(self.capacity - (0 if self.df is None else len(self.df)), len(chunk))
+        if take > 0:
+            head = chunk.iloc[:take]
+            self.df = head.copy() if self.df is None else pd.concat([self.df, head], ignore_index=True)
+            self.seen += take
+            chunk = chunk.iloc[take:].reset_index(drop=True)
+
+        n = len(chunk)
+        if n == 0:
+            return
+
+        # i'nci satır (0 tabanlı) k/(i+1) olasılıkla rastgele bir yuvanın yerine geçer
+        positions = self.seen + np.arange(n)
+        slots = (self.rng.random(n) * (positions + 1)).astype(np.int64)
+        accepted = np.flatnonzero(slots < self.capacity)
+        if len(accepted):
+            # Aynı yuvaya düşen satırlardan en sonuncusu kalır
+            slots_unique, last_idx = np.unique(slots[accepted][::-1], return_index=True)
+            rows = accepted[::-1][last_idx]
+            for j, col in enumerate(self.df.columns):
+                self.df.iloc[slots_unique, j] = chunk[col].to_numpy()[rows]
+        self.seen += n
+
+
+def train_streaming(source="csv", chunksize=DEFAULT_CHUNKSIZE, sample_size=DEFAULT_SAMPLE_SIZE,
+                    test_fraction=0.2, random_state=42):
+    """
+    Veriyi belleğe tamamen almadan eğitir:
+    - Kaynak (CSV veya training_data tablosu) parça parça tek geçişte okunur,
+    - Kategorik değerler aynı geçişte toplanır (encoder'lar bu kümelerden kurulur),
+    - Eğitim ve test için sınırlı boyutlu rezervuar örneklemleri tutulur.
+    """
+    print(f"⏳ Akışlı eğitim başlıyor (kaynak: {source}, parça: {chunksize}, örneklem: {sample_size})...")
+
+    if source == "csv":
+        if not os.path.exists(BALANCED_DATA_PATH):
+            print(f"❌ HATA: {BALANCED_DATA_PATH} bulunamadı!")
+            print("Lütfen önce 'data_balancer.py' scriptini çalıştırarak dengeli veriyi oluşturun.")
+            return
+        chunks = _iter_csv_chunks(BALANCED_DATA_PATH, chunksize)
+    elif source == "db":
+        chunks = _iter_db_chunks(chunksize)
+    else:
+        raise ValueError(f"Bilinmeyen veri kaynağı: {source}")
+
+    rng = np.random.default_rng(random_state)
+    train_res = _Reservoir(sample_size, rng)
+    test_res = _Reservoir(max(1, int(sample_size * test_fraction)), rng)
+    categories = {}
+    total_rows = 0
+
+    for chunk in chunks:
+        with stage("train.scan", rows=len(chunk)):
+            if not categories:
+                categories = {col: set() for col in chunk.select_dtypes(include=['object']).columns}
+            for col, values in categories.items():
+                chunk[col] = chunk[col].astype(str).fillna('nan')
+                values.update(chunk[col].unique())
+            # Parçalar arasında tip tutarlılığı için sayısal sütunlar float'a çevrilir
+            numeric_cols = [c for c in chunk.columns if c not in categories]
+            chunk[numeric_cols] = chunk[numeric_cols].astype('float64')
+
+            is_test = rng.random(len(chunk)) < test_fraction
+            train_res.add(chunk[~is_test])
+            test_res.add(chunk[is_test])
+            total_rows += len(chunk)
+
+    if train_res.df is None or test_res.df is None:
+        print("❌ HATA: Eğitim için yeterli veri bulunamadı.")
+        return
+
+    print(f"✅ {total_rows} satır tarandı; {len(train_res.df)} satırlık örneklemle eğitim başlıyor...")
+
+    # Encoder'lar, tüm veride görülen kategorilerden kurulur
+    label_encoders = {}
+    for col, values in categories.items():
+        le = LabelEncoder()
+        le.fit(sorted(values))
+        label_encoders[col] = le
+
+    def _encode(df):
+        df = df.copy()
+        for col, le in label_encoders.items():
+            df[col] = le.transform(df[col])
+        return df.drop(columns=['exam_score']), df['exam_score']
+
+    with stage("train.encode", rows=len(train_res.df) + len(test_res.df)):
+        X_train, y_train = _encode(train_res.df)
+        X_test, y_test = _encode(test_res.df)
+
+    print("🧠 Yapay Zeka modeli eğitiliyor (Random Forest - Rezervuar Örneklem)...")
+    model = _build_model()
+    with stage("train.fit", rows=len(X_train)):
+        model.fit(X_train, y_train)
+
+    with stage("train.evaluate", rows=len(X_test)):
+        predictions = model.predict(X_test)
+    mae = mean_absolute_error(y_test, predictions)
+    r2 = r2_score(y_test, predictions)
+
+    print(f"\n📊 --- Yeni Model Başarı Raporu ---")
+    print(f"Ortalama Hata Payı (MAE): {mae:.2f} puan")
+    print(f"Model Doğruluğu (R2 Score): {r2:.2f}")
+
+    with stage("train.save"):
+        _save_artifacts(model, label_encoders, {
+            "mae": mae, "r2": r2, "mode": "stream", "source": source,
+            "rows_seen": total_rows, "train_sample": len(X_train), "test_sample": len(X_test)
+        }, X_train)
+    print(f"📈 En yüksek bellek kullanımı: {_peak_rss_mb() or 0:.0f} MB")
+
+
+# --- ARTIMLI (WARM-START) EĞİTİM ---
+# Gerçek notu son eğitimden sonra girilen öğrencilerle aktif orman genişletilir: mevcut ağaçlar korunur,
+# yeni ağaçlar sadece yeni satırlarla eğitilir (warm_start). Ağaç sayısı max_trees'i aşarsa en eski ağaçlar
+# atılır (kayan pencere). Okunan en son (updated_at, id) metrics.json'da watermark olarak saklanır.
+DEFAULT_ADD_TREES = 20
+DEFAULT_MAX_TREES = 300
+DEFAULT_MIN_ROWS = 250
+# Önce/sonra karşılaştırması en az bu kadar ayrılmış yeni satırla yapılır (birkaç satırlık gürültüyle karar verilmez)
+MIN_TEST_ROWS = 50
+# Güncellenen modelin MAE'si en fazla bu oranda kötüleşebilir; daha fazlasında yayınlanmaz
+DEFAULT_MAE_TOLERANCE = 0.05
+
+
+def _evaluate(model, X, y):
+    predictions = model.predict(X)
+    return {"mae": float(mean_absolute_error(y, predictions)), "r2": float(r2_score(y, predictions))}
+
+
+def _extend_encoders(label_encoders, df):
+    """Yeni kategoriler encoder'ların sonuna eklenir; var olan kodlar (ve onlarla eğitilmiş ağaçlar) değişmez."""
+    extended, added = {}, {}
+    for col, le in label_encoders.items():
+        classes = np.asarray(le.classes_).astype(str)
+        new = sorted(set(df[col].dropna().astype(str)) - set(classes)) if col in df.columns else []
+        if not new:
+            extended[col] = le
+            continue
+        # Sınıflar artık sıralı değil; kodlama FeatureEncoder'ın arama tablosuyla yapıldığı için sorun olmaz
+        grown = LabelEncoder()
+        grown.classes_ = np.concatenate([classes, np.asarray(new, dtype=str)])
+        extended[col] = grown
+        added[col] = new
+    return extended, added
+
+
+def _labeled_watermark(df):
+    """Okunan satırların en büyük (updated_at, id) çifti (okunan tüm satırlar zaman damgalıdır)."""
+    last = df.sort_values(["updated_at", "id"]).iloc[-1]
+    return {"updated_at": pd.Timestamp(last["updated_at"]).isoformat(), "id": int(last["id"])}
+
+
+def train_incremental(add_trees=DEFAULT_ADD_TREES, max_trees=DEFAULT_MAX_TREES, min_rows=DEFAULT_MIN_ROWS,
+                      chunksize=DEFAULT_CHUNKSIZE, test_fraction=0.2, random_state=42, force=False,
+                      mae_tolerance=DEFAULT_MAE_TOLERANCE):
+    """
+    Aktif modeli, watermark'tan sonra gerçek notu girilen öğrencilerle warm_start ile genişletir ve yeni sürüm
+    olarak yayınlar. Önce/sonra metrikleri yeni satırların eğitimde kullanılmayan test_fraction'lık (en az
+    MIN_TEST_ROWS satır) kısmında hesaplanır; güncellenen modelin MAE'si mae_tolerance oranından fazla
+    kötüleştiyse force=True değilse yayınlanmaz.
+    Yeni satır sayısı min_rows'tan azsa ya da model yayınlanmazsa aktif sürüm ve watermark değişmez
+    (satırlar bir sonraki çalışmaya kalır). Yayınlanan sürümün adını, aksi halde None döndürür.
+    """
+    from src.database.crud import count_new_labeled_students, iter_new_labeled_students
+    from src.database.db_config import SessionLocal, ensure_columns, ensure_indexes
+    from src.logic.model_registry import load_bundle
+
+    try:
+        bundle = load_bundle()
+    except FileNotFoundError:
+        print("🚨 Model dosyaları bulunamadı! Önce tam eğitim yapılmalı (--mode full).")
+        return
+    start = time.perf_counter()
+    base_metrics = bundle.metrics or {}
+    watermark = base_metrics.get("watermark")
+    print(f"⏳ Artımlı eğitim (temel sürüm: {bundle.version}, watermark: {watermark or 'yok'})...")
+
+    # updated_at sütunu ve indeksi eski veritabanlarında yoksa eklenir
+    ensure_columns()
+    ensure_indexes()
+    db = SessionLocal()
+    try:
+        new_rows = count_new_labeled_students(db, watermark)
+        if new_rows < max(min_rows, 2 * MIN_TEST_ROWS):
+            print(f"✅ Yeterli yeni gerçek not yok ({new_rows} < {max(min_rows, 2 * MIN_TEST_ROWS)}); model değişmedi.")
+            return
+        with stage("train.load", rows=new_rows):
+            df = pd.concat(iter_new_labeled_students(db, watermark, chunksize), ignore_index=True)
+    finally:
+        db.close()
+    print(f"✅ Watermark'tan sonra notu girilen {len(df)} öğrenci bulundu.")
+
+    model = bundle.model
+    label_encoders, added_classes = _extend_encoders(bundle.encoders, df)
+    if added_classes:
+        print(f"🆕 Encoder'lara yeni kategoriler eklendi: {added_classes}")
+    with stage("train.encode", rows=len(df)):
+        X = FeatureEncoder(label_encoders, model.feature_names_in_).transform(df)
+        y = df["exam_score"].astype("float64")
+        test_size = max(int(round(len(df) * test_fraction)), MIN_TEST_ROWS)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+
+    # Önce/sonra karşılaştırması aynı yeni (eğitimde görülmeyen) satırlar üzerinde
+    with stage("train.evaluate", rows=len(X_test)):
+        before = _evaluate(model, X_test, y_test)
+
+    print(f"🧠 {len(model.estimators_)} ağaçlık ormana {add_trees} ağaç ekleniyor ({len(X_train)} yeni satır)...")
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + add_trees)
+    with stage("train.fit", rows=len(X_train)):
+        model.fit(X_train, y_train)
+    dropped = max(0, len(model.estimators_) - max_trees)
+    if dropped:
+        model.estimators_ = model.estimators_[dropped:]
+    model.set_params(warm_start=False, n_estimators=len(model.estimators_))
+
+    with stage("train.evaluate", rows=len(X_test)):
+        after = _evaluate(model, X_test, y_test)
+
+    print(f"\n📊 --- Artımlı Eğitim Raporu ({len(X_test)} yeni test satırı) ---")
+    print(f"MAE: {before['mae']:.2f} → {after['mae']:.2f} puan")
+    print(f"R2 : {before['r2']:.2f} → {after['r2']:.2f}")
+    if dropped:
+        print(f"🗑️ Kayan pencere: en eski {dropped} ağaç atıldı ({len(model.estimators_)} ağaç kaldı).")
+    regressed = after["mae"] > before["mae"] * (1 + mae_tolerance)
+    if regressed and not force:
+        print(f"⚠️ Güncellenen model yeni test satırlarında daha kötü (MAE {before['mae']:.2f} → {after['mae']:.2f}, "
+              f"tolerans %{mae_tolerance * 100:g}); yayınlanmadı, aktif sürüm {bundle.version} olarak kaldı. "
+              f"Yine de yayınlamak için --force kullanın.")
+        return None
+
+    # Eğitim dağılımı taslağına yeni eğitim satırları eklenir (referansı olmayan eski paketlerde baştan kurulur)
+    if bundle.drift_reference is not None:
+        drift_reference = extend_reference(bundle.drift_reference, X_train, label_encoders)
+    else:
+        drift_reference = build_reference(X_train, label_encoders)
     metrics_data = {
-        "mae": mae,
-        "r2": r2,
-        "last_trained": pd.Timestamp.now().strftime("%d-%m-%Y %H:%M")
+        # Dashboard'da gösterilen değerler güncellenen modelin yeni test satırlarındaki ölçümüdür;
+        # temel sürümün kendi metrikleri base_metrics altında saklanır
+        "mae": after["mae"], "r2": after["r2"], "mode": "incremental", "base_version": bundle.version,
+        "base_metrics": {"mae": base_metrics.get("mae"), "r2": base_metrics.get("r2")},
+        "incremental": {
+            "new_rows": len(df), "train_rows": len(X_train), "test_rows": len(X_test),
+            "added_trees": add_trees, "dropped_trees": dropped, "n_estimators": len(model.estimators_),
+            "new_classes": added_classes, "before": before, "after": after, "mae_tolerance": mae_tolerance, "forced": regressed,
+        },
+        "watermark": _labeled_watermark(df),
     }
-    with open(METRICS_PATH, "w") as f:
-        json.dump(metrics_data, f)
+    with stage("train.save"):
+        _save_artifacts(model, label_encoders, metrics_data, drift_reference=drift_reference)
+    print(f"⏱️ Artımlı eğitim {time.perf_counter() - start:.1f} sn sürdü.")
+    return metrics_data["version"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EduAnalytix model eğitimi")
+    parser.add_argument("--mode", choices=["full", "stream", "search", "incremental"], default="full",
+                        help="full: tüm CSV belleğe alınır, stream: parça parça out-of-core eğitim, "
+                             "search: paralel hiperparametre araması, "
+                             "incremental: aktif modele yeni gerçek notlarla ağaç ekler (warm_start)")
+    parser.add_argument("--source", choices=["csv", "db"], default="csv",
+                        help="stream modunda veri kaynağı (CSV veya training_data tablosu)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--sample-size", type=int, default=DEFAULT_SAMPLE_SIZE,
+                        help="stream modunda eğitim rezervuarının satır sayısı")
+    parser.add_argument("--workers", type=int, default=None, help="search modunda süreç sayısı (varsayılan: tüm çekirdekler)")
+    parser.add_argument("--cv-folds", type=int, default=5, help="search modunda çapraz doğrulama fold sayısı")
+    parser.add_argument("--add-trees", type=int, default=DEFAULT_ADD_TREES,
+                        help="incremental modunda eklenecek ağaç sayısı")
+    parser.add_argument("--max-trees", type=int, default=DEFAULT_MAX_TREES,
+                        help="incremental modunda en fazla ağaç sayısı (fazlası en eskiden atılır)")
+    parser.add_argument("--min-rows", type=int, default=DEFAULT_MIN_ROWS,
+                        help="incremental modunda eğitim için gereken en az yeni satır")
+    parser.add_argument("--mae-tolerance", type=float, default=DEFAULT_MAE_TOLERANCE,
+                        help="incremental modunda MAE'nin kabul edilen en fazla göreli kötüleşmesi (0.05 = %%5)")
+    parser.add_argument("--force", action="store_true",
+                        help="incremental modunda güncellenen model yeni veride daha kötü olsa da yayınla")
+    parser.add_argument("--rescore", action="store_true",
+                        help="Eğitimden sonra veritabanındaki öğrencileri yeni sürümle yeniden skorla")
+    args = parser.parse_args(argv)
+
+    if args.mode == "stream":
+        train_streaming(source=args.source, chunksize=args.chunksize, sample_size=args.sample_size)
+    elif args.mode == "incremental":
+        train_incremental(args.add_trees, args.max_trees, args.min_rows, args.chunksize, force=args.force,
+                          mae_tolerance=args.mae_tolerance)
+    elif args.mode == "search":
+        from src.logic.model_search import run_search
+        run_search(n_splits=args.cv_folds, workers=args.workers)
+    else:
+        train_and_save_model()
+    if args.rescore:
+        from src.logic.rescore import rescore_students
+        rescore_students(workers=args.workers or 1)
+    # EDUANALYTIX_METRICS açıksa aşama süreleri özetlenir
+    print_summary()
 
-    print(f"\n💾 Yeni model ve metrikler kaydedildi: {MODEL_DIR}")
-    print("✅ Artık dashboard üzerinden en kötü senaryoları test edebilirsiniz!")
 
 if __name__ == "__main__":
-    train_and_save_model()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,291 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+# Proje dizin yapısına göre path ayarı
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..', '..'))
+sys.path.append(root_dir)
+
+from src.logic.drift import DRIFT_REFERENCE_FILE, load_reference, save_reference
+from src.logic.flat_forest import FlatForest, export_flat_forest
+from src.logic.preprocessing import FeatureEncoder
+
+# Her eğitim models/registry/<sürüm>/ altında tek bir paket olarak saklanır.
+# ACTIVE dosyası servis edilen sürümün adını tutar; değiştirmek (veya geri almak) için sadece bu dosya yazılır.
+MODEL_DIR = os.path.join(root_dir, "models")
+REGISTRY_DIR = os.path.join(MODEL_DIR, "registry")
+ACTIVE_POINTER = os.path.join(REGISTRY_DIR, "ACTIVE")
+MANIFEST_FILE = "manifest.json"
+
+BUNDLE_MODEL = "model.pkl"
+BUNDLE_ENCODERS = "encoders.pkl"
+BUNDLE_METRICS = "metrics.json"
+BUNDLE_FLAT_FOREST = "flat_forest"
+BUNDLE_DRIFT_REFERENCE = DRIFT_REFERENCE_FILE
+
+# Registry boşsa eski sabit dosya yolları kullanılır
+LEGACY_VERSION = "legacy"
+
+# drift_reference: eğitim dağılımının özellik taslakları (src/logic/drift.py); eski paketlerde None
+ModelBundle = namedtuple("ModelBundle", ["version", "model", "encoders", "metrics", "predictor", "preprocessor",
+                                         "drift_reference"], defaults=(None,))
+
+
+class BundleIntegrityError(Exception):
+    """Paketteki bir dosyanın sağlama toplamı manifest ile uyuşmadığında fırlatılır."""
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _bundle_files(bundle_dir):
+    for dirpath, _, filenames in os.walk(bundle_dir):
+        for name in filenames:
+            if name == MANIFEST_FILE:
+                continue
+            full_path = os.path.join(dirpath, name)
+            yield os.path.relpath(full_path, bundle_dir).replace(os.sep, "/"), full_path
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _new_version_name():
+    base = datetime.now().strftime("v%Y%m%d-%H%M%S")
+    version, suffix = base, 1
+    while os.path.exists(os.path.join(REGISTRY_DIR, version)):
+        suffix += 1
+        version = f"{base}-{suffix}"
+    return version
+
+
+def publish_bundle(model, label_encoders, metrics, activate=True, drift_reference=None):
+    """
+    Model, encoder'lar ve metrikleri sağlama toplamlı tek bir sürüm paketi olarak yazar.
+    Paket önce geçici bir klasöre yazılıp tek adımda yerine taşınır; yarım paket oluşmaz.
+    """
+    import joblib
+
+    os.makedirs(REGISTRY_DIR, exist_ok=True)
+    version = _new_version_name()
+    tmp_dir = os.path.join(REGISTRY_DIR, f".{version}.tmp")
+    os.makedirs(tmp_dir)
+
+    joblib.dump(model, os.path.join(tmp_dir, BUNDLE_MODEL))
+    joblib.dump(label_encoders, os.path.join(tmp_dir, BUNDLE_ENCODERS))
+    with open(os.path.join(tmp_dir, BUNDLE_METRICS), "w") as f:
+        json.dump({**metrics, "version": version}, f)
+    export_flat_forest(model, os.path.join(tmp_dir, BUNDLE_FLAT_FOREST))
+    if drift_reference is not None:
+        save_reference(drift_reference, os.path.join(tmp_dir, BUNDLE_DRIFT_REFERENCE))
+
+    manifest = {
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "files": {rel: _sha256(full) for rel, full in _bundle_files(tmp_dir)},
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    os.rename(tmp_dir, os.path.join(REGISTRY_DIR, version))
+    if activate:
+        activate_version(version)
+    print(f"📦 Model paketi kaydedildi: {version}{' (aktif)' if activate else ''}")
+    return version
+
+
+def list_versions():
+    if not os.path.isdir(REGISTRY_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(REGISTRY_DIR)
+        if os.path.exists(os.path.join(REGISTRY_DIR, name, MANIFEST_FILE))
+    )
+
+
+def get_active_version():
+    try:
+        with open(ACTIVE_POINTER, "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def activate_version(version):
+    """ACTIVE işaretçisini verilen sürüme çevirir (geri alma için de kullanılır)."""
+    if version not in list_versions():
+        raise ValueError(f"Sürüm bulunamadı: {version}")
+    _write_atomic(ACTIVE_POINTER, version)
+
+
+def verify_bundle(version):
+    bundle_dir = os.path.join(REGISTRY_DIR, version)
+    with open(os.path.join(bundle_dir, MANIFEST_FILE), "r") as f:
+        manifest = json.load(f)
+    for rel, expected in manifest["files"].items():
+        if _sha256(os.path.join(bundle_dir, rel)) != expected:
+            raise BundleIntegrityError(f"{version}/{rel} sağlama toplamı uyuşmuyor")
+
+
+def _load_legacy_bundle():
+    import joblib
+
+    model_path = os.path.join(MODEL_DIR, "student_score_model.pkl")
+    encoders_path = os.path.join(MODEL_DIR, "encoders.pkl")
+    metrics_path = os.path.join(MODEL_DIR, "metrics.json")
+    flat_forest_dir = os.path.join(MODEL_DIR, "flat_forest")
+
+    model = joblib.load(model_path)
+    encoders = joblib.load(encoders_path)
+
+    metrics = None
+    if os.path.exists(metrics_path):
+        with open(metrics_path, "r") as f:
+            metrics = json.load(f)
+    predictor = FlatForest.load(flat_forest_dir) if os.path.exists(flat_forest_dir) else model
+    preprocessor = FeatureEncoder.from_model(model, encoders)
+    drift_reference = load_reference(os.path.join(MODEL_DIR, DRIFT_REFERENCE_FILE))
+    return ModelBundle(LEGACY_VERSION, model, encoders, metrics, predictor, preprocessor, drift_reference)
+
+
+def load_bundle(version=None, verify=True):
+    """
+    Verilen (veya aktif) sürümü yükler. Registry boşsa eski sabit yollardaki dosyalar kullanılır.
+    Dosyalar bulunamazsa FileNotFoundError fırlatır.
+    """
+    version = version or get_active_version()
+    if version is None:
+        return _load_legacy_bundle()
+
+    # joblib (ve modelin açılırken yüklediği sklearn) sadece gerçekten model yüklenirken import edilir
+    import joblib
+
+    if verify:
+        verify_bundle(version)
+    bundle_dir = os.path.join(REGISTRY_DIR, version)
+    model = joblib.load(os.path.join(bundle_dir, BUNDLE_MODEL))
+    encoders = joblib.load(os.path.join(bundle_dir, BUNDLE_ENCODERS))
+    with open(os.path.join(bundle_dir, BUNDLE_METRICS), "r") as f:
+        metrics = json.load(f)
+    predictor = FlatForest.load(os.path.join(bundle_dir, BUNDLE_FLAT_FOREST))
+    preprocessor = FeatureEncoder.from_model(model, encoders)
+    drift_reference = load_reference(os.path.join(bundle_dir, BUNDLE_DRIFT_REFERENCE))
+    return ModelBundle(version, model, encoders, metrics, predictor, preprocessor, drift_reference)
+
+
+class ModelServer:
+    """
+    Aktif model paketini tutar ve ACTIVE işaretçisindeki değişiklikleri ucuz bir mtime kontrolüyle izler.
+    Yeni sürüm arka planda yüklenir ve hazır olunca referans tek atamayla değiştirilir;
+    o anda işlenen istekler eski paketi kullanmaya devam eder, hiçbiri beklemez.
+    """
+
+    def __init__(self, check_interval=2.0):
+        self.check_interval = check_interval
+        self._bundle = None
+        self._pointer_stamp = None
+        self._last_check = 0.0
+        self._loading = False
+        self._prefetch_thread = None
+        self._lock = threading.Lock()
+        self._init_lock = threading.Lock()
+
+    def _pointer_mtime(self):
+        try:
+            return os.stat(ACTIVE_POINTER).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self, stamp):
+        try:
+            bundle = load_bundle()
+            self._bundle = bundle
+            print(f"🔄 Aktif model: {bundle.version}")
+        except (FileNotFoundError, BundleIntegrityError) as e:
+            print(f"⚠️ Model paketi yüklenemedi, mevcut sürüm korunuyor: {e}")
+        finally:
+            # Başarısız olsa bile aynı işaretçi için tekrar denenmez
+            self._pointer_stamp = stamp
+            self._loading = False
+
+    def refresh(self):
+        """İşaretçi değiştiyse yeni sürümü arka planda yükler."""
+        stamp = self._pointer_mtime()
+        with self._lock:
+            if self._loading or stamp == self._pointer_stamp:
+                return
+            self._loading = True
+        threading.Thread(target=self._load, args=(stamp,), daemon=True).start()
+
+    def _initial_load(self):
+        with self._init_lock:
+            if self._bundle is None:
+                self._load(self._pointer_mtime())
+
+    def prefetch(self):
+        """İlk yüklemeyi arka planda başlatır (uygulama açılışı); current() gerekirse onun bitmesini bekler."""
+        with self._lock:
+            if self._bundle is not None or self._prefetch_thread is not None:
+                return
+            self._prefetch_thread = threading.Thread(target=self._initial_load, daemon=True)
+        self._prefetch_thread.start()
+
+    @property
+    def loading(self):
+        """İlk yükleme arka planda sürüyorsa True."""
+        return self._bundle is None and self._prefetch_thread is not None and self._prefetch_thread.is_alive()
+
+    def current(self, wait=True):
+        """
+        Aktif paketi döndürür. Süreçteki ilk yükleme dışında hiçbir zaman yükleme beklemez.
+        wait=False iken ilk yükleme henüz arka planda sürüyorsa beklemeden None döner.
+        """
+        if self._bundle is None:
+            if not wait and self.loading:
+                return None
+            self._initial_load()
+        elif time.monotonic() - self._last_check >= self.check_interval:
+            self._last_check = time.monotonic()
+            self.refresh()
+        return self._bundle
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EduAnalytix model registry")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Kayıtlı sürümleri listeler")
+    activate_parser = sub.add_parser("activate", help="Bir sürümü aktif yapar (geri alma)")
+    activate_parser.add_argument("version")
+    verify_parser = sub.add_parser("verify", help="Bir sürümün sağlama toplamlarını doğrular")
+    verify_parser.add_argument("version")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        active = get_active_version()
+        for name in list_versions():
+            with open(os.path.join(REGISTRY_DIR, name, BUNDLE_METRICS), "r") as f:
+                m = json.load(f)
+            marker = "*" if name == active else " "
+            print(f"{marker} {name}  MAE={m.get('mae', 0):.2f}  R2={m.get('r2', 0):.2f}  mod={m.get('mode', '-')}")
+    elif args.command == "activate":
+        activate_version(args.version)
+        print(f"✅ Aktif sürüm: {args.version}")
+    elif args.command == "verify":
+        verify_bundle(args.version)
+        print(f"✅ {args.version} doğrulandı.")
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import KFold, ParameterGrid
+
+# Proje dizin yapısına göre path ayarı
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..', '..'))
+sys.path.append(root_dir)
+
+from src.logic.ml_engine import MODEL_DIR, _build_model, _save_artifacts, load_training_split
+
+# Her (ayar, veri özeti, CV bölmesi, fold) sonucu burada ayrı bir JSON dosyası olarak saklanır
+SEARCH_CACHE_DIR = os.path.join(MODEL_DIR, "search_cache")
+LEADERBOARD_PATH = os.path.join(MODEL_DIR, "leaderboard.json")
+
+DEFAULT_PARAM_GRID = {
+    "n_estimators": [100, 150, 300],
+    "min_samples_split": [2, 5, 10],
+    "max_depth": [None, 20],
+    "max_features": [1.0, "sqrt"],
+}
+DEFAULT_CV_FOLDS = 5
+# KFold karıştırma ayarı; fold indeksleri bunlara ve fold sayısına bağlıdır
+CV_SHUFFLE = True
+CV_SEED = 42
+
+# İşçi süreçlerde bir kez yüklenen eğitim verisi
+_worker_X = None
+_worker_y = None
+
+
+def data_fingerprint(X, y):
+    """Eğitim verisinin içerik özetini (sha256) üretir; veri değişirse önbellek de geçersiz olur."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(X.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def config_key(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _cv_splitter(n_splits):
+    return KFold(n_splits=n_splits, shuffle=CV_SHUFFLE, random_state=CV_SEED if CV_SHUFFLE else None)
+
+
+def cv_key(n_splits):
+    """Aynı fold numarası farklı bölmelerde farklı satırlar demektir; önbellek bölme ayarlarına göre ayrılır."""
+    return f"kfold{n_splits}_" + (f"shuffle{CV_SEED}" if CV_SHUFFLE else "noshuffle")
+
+
+def _cache_path(data_hash, params, fold, n_splits):
+    return os.path.join(SEARCH_CACHE_DIR, data_hash[:16], cv_key(n_splits), f"{config_key(params)}_f{fold}.json")
+
+
+def _read_cache(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_cache(path, result):
+    # Yarıda kesilen yazımlar önbelleği bozmasın diye geçici dosya + os.replace
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(result, f)
+    os.replace(tmp_path, path)
+
+
+def _init_worker(X, y):
+    global _worker_X, _worker_y
+    _worker_X, _worker_y = X, y
+
+
+def _evaluate_fold(params, fold, n_splits):
+    """Tek bir (ayar, fold) çiftini eğitip doğrular. İşçi süreçte çalışır."""
+    splits = _cv_splitter(n_splits).split(_worker_X)
+    train_idx, val_idx = next(s for i, s in enumerate(splits) if i == fold)
+
+    start = time.perf_counter()
+    # Paralellik süreç havuzunda; her model tek çekirdek kullanır
+    model = _build_model(n_jobs=1, **params)
+    model.fit(_worker_X[train_idx], _worker_y[train_idx])
+    predictions = model.predict(_worker_X[val_idx])
+
+    return {
+        "params": params,
+        "fold": fold,
+        "mae": float(mean_absolute_error(_worker_y[val_idx], predictions)),
+        "r2": float(r2_score(_worker_y[val_idx], predictions)),
+        "fit_seconds": time.perf_counter() - start,
+    }
+
+
+def _build_leaderboard(results, n_splits):
+    rows = {}
+    for r in results:
+        row = rows.setdefault(config_key(r["params"]), {"params": r["params"], "maes": [], "r2s": [], "fit_seconds": 0.0})
+        row["maes"].append(r["mae"])
+        row["r2s"].append(r["r2"])
+        row["fit_seconds"] += r["fit_seconds"]
+
+    leaderboard = []
+    for row in rows.values():
+        if len(row["maes"]) < n_splits:
+            continue
+        leaderboard.append({
+            "params": row["params"],
+            "cv_mae": float(np.mean(row["maes"])),
+            "cv_mae_std": float(np.std(row["maes"])),
+            "cv_r2": float(np.mean(row["r2s"])),
+            "fit_seconds": row["fit_seconds"],
+        })
+    leaderboard.sort(key=lambda r: r["cv_mae"])
+    for rank, row in enumerate(leaderboard, start=1):
+        row["rank"] = rank
+    return leaderboard
+
+
+def run_search(param_grid=None, n_splits=DEFAULT_CV_FOLDS, workers=None):
+    """
+    Aday ayarları ve CV fold'larını süreç havuzuna dağıtır.
+    Daha önce hesaplanmış (ayar, veri özeti, CV bölmesi, fold) sonuçları önbellekten okunur; sadece yeniler eğitilir.
+    En iyi ayar tüm eğitim verisiyle yeniden eğitilip models/ klasörüne kaydedilir.
+    """
+    split = load_training_split()
+    if split is None:
+        return None
+    X_train, X_test, y_train, y_test, label_encoders = split
+
+    data_hash = data_fingerprint(X_train, y_train)
+    candidates = list(ParameterGrid(param_grid or DEFAULT_PARAM_GRID))
+    workers = workers or os.cpu_count() or 1
+
+    results, pending = [], []
+    for params in candidates:
+        for fold in range(n_splits):
+            cached = _read_cache(_cache_path(data_hash, params, fold, n_splits))
+            if cached is not None:
+                results.append(cached)
+            else:
+                pending.append((params, fold))
+
+    print(f"🔎 {len(candidates)} aday x {n_splits} fold: {len(results)} sonuç önbellekten, "
+          f"{len(pending)} iş {workers} süreçte eğitilecek...")
+
+    if pending:
+        X_values = X_train.to_numpy()
+        y_values = y_train.to_numpy()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(X_values, y_values)) as executor:
+            futures = [executor.submit(_evaluate_fold, params, fold, n_splits) for params, fold in pending]
+            for done, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                # Her sonuç hemen diske yazılır; çökme sonrası tekrar çalıştırmada atlanır
+                _write_cache(_cache_path(data_hash, result["params"], result["fold"], n_splits), result)
+                results.append(result)
+                print(f"   [{done}/{len(pending)}] {result['params']} fold={result['fold']} MAE={result['mae']:.3f}")
+
+    leaderboard = _build_leaderboard(results, n_splits)
+    best = leaderboard[0]
+    print(f"\n🏆 En iyi ayar: {best['params']} (CV MAE: {best['cv_mae']:.3f})")
+
+    # Kazanan, tüm çekirdeklerle tam eğitim verisi üzerinde yeniden eğitilir
+    model = _build_model(n_jobs=workers, **best["params"])
+    model.fit(X_train, y_train)
+    model.set_params(n_jobs=None)
+    predictions = model.predict(X_test)
+    mae = mean_absolute_error(y_test, predictions)
+    r2 = r2_score(y_test, predictions)
+
+    print(f"\n📊 --- Yeni Model Başarı Raporu ---")
+    print(f"Ortalama Hata Payı (MAE): {mae:.2f} puan")
+    print(f"Model Doğruluğu (R2 Score): {r2:.2f}")
+
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    with open(LEADERBOARD_PATH, "w") as f:
+        json.dump({"data_hash": data_hash, "cv_folds": n_splits, "cv": cv_key(n_splits), "leaderboard": leaderboard},
+                  f, indent=2)
+
+    _save_artifacts(model, label_encoders, {
+        "mae": mae, "r2": r2, "mode": "search",
+        "best_params": best["params"], "cv_mae": best["cv_mae"], "data_hash": data_hash
+    }, X_train)
+    print(f"📋 Sıralama tablosu kaydedildi: {LEADERBOARD_PATH}")
+    return leaderboard
+
+
+if __name__ == "__main__":
+    run_search()
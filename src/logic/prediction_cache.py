@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 30 * 60
+
+
+def make_key(model_version, encoded_row):
+    """Kodlanmış özellik vektörü ve model sürümünden hashlenebilir, kanonik bir anahtar üretir."""
+    return model_version, tuple(np.asarray(encoded_row).ravel().tolist())
+
+
+class PredictionCache:
+    """
+    Tek öğrenci tahminleri için sınırlı boyutlu LRU + TTL önbellek (süreç içi, thread-safe).
+    Anahtar model sürümünü içerdiği için yeni bir model devreye girdiğinde eski sonuçlar kullanılmaz;
+    farklı sürüme ait kayıtlar ilk yeni kayıtta temizlenir.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Geçerli bir kayıt varsa değerini, yoksa None döndürür."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            version = key[0]
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# Eğitimde görülmemiş (veya eksik) kategoriler bu koda eşlenir.
+# Toplu analiz sayfasının önceki davranışıyla uyumludur.
+UNKNOWN_CODE = 0
+
+
+class FeatureEncoder:
+    """
+    ml_engine.py'nin ürettiği encoders.pkl sözlüğünden kurulan ön işleme bileşeni.
+    Her kategorik sütun için bir arama tablosu (pd.Index) önceden hazırlanır; tek öğrenci
+    ve toplu analiz aynı yoldan, sütun başına tek vektörel adımda kodlanır.
+    """
+
+    def __init__(self, encoders, feature_names=None, unknown_code=UNKNOWN_CODE):
+        self.lookup = {col: pd.Index(np.asarray(le.classes_).astype(str)) for col, le in encoders.items()}
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.unknown_code = unknown_code
+
+    @classmethod
+    def from_model(cls, model, encoders):
+        return cls(encoders, getattr(model, "feature_names_in_", None))
+
+    def encode_column(self, col, values):
+        """Bir sütunu kodlarına çevirir; bilinmeyen değerler unknown_code olur. (kodlar, bilinmeyen sayısı) döndürür."""
+        # Önce sütundaki farklı değerler bulunur (factorize), arama tablosuna sadece onlar sorulur
+        labels, uniques = pd.factorize(values, use_na_sentinel=True)
+        index = self.lookup[col]
+        table = index.get_indexer(pd.Index(uniques, dtype=object).astype(str))
+        # LabelEncoder eğitimde astype(str) ile beslendiği için boş değerler 'nan' sınıfına denk gelir
+        # (-1 etiketi tablonun son elemanını seçer)
+        table = np.append(table, index.get_indexer(["nan"]))
+        codes = table[labels]
+        unknown = codes < 0
+        n_unknown = int(unknown.sum())
+        if n_unknown:
+            codes[unknown] = self.unknown_code
+        return codes, n_unknown
+
+    def transform(self, df):
+        """
+        Ham (normalize edilmiş sütun isimli) DataFrame'i modele hazır hale getirir.
+        Sonuç modelin feature_names_in_ sırasındadır; eksik sütunlar 0 ile doldurulur.
+        Sütun başına bilinmeyen değer sayıları sonucun attrs["unknown_counts"] alanındadır.
+        """
+        columns = self.feature_names or list(df.columns)
+        out, unknown_counts = {}, {}
+        for col in columns:
+            if col not in df.columns:
+                out[col] = np.zeros(len(df), dtype=np.int64)
+            elif col in self.lookup:
+                out[col], n_unknown = self.encode_column(col, df[col].to_numpy())
+                if n_unknown:
+                    unknown_counts[col] = n_unknown
+            else:
+                out[col] = df[col].to_numpy()
+        result = pd.DataFrame(out, index=df.index, columns=columns)
+        result.attrs["unknown_counts"] = unknown_counts
+        return result
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+# Proje dizin yapısına göre path ayarı
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..', '..'))
+sys.path.append(root_dir)
+
+from src.logic.batch_scoring import score_frame
+from src.logic.model_registry import MODEL_DIR, get_active_version, load_bundle
+from src.utils.instrumentation import print_summary, stage
+
+# Yeni bir model sürümünden sonra veritabanındaki tüm öğrenciler yeniden skorlanır:
+# öğrenciler id sırasıyla (keyset) parçalara bölünür, her parça kodlanır, tahmin edilir, kural motorundan
+# geçirilir ve model_version etiketli yeni AIPrediction satırları olarak tek işlemde eklenir.
+# Bu sürümle zaten skorlanmış öğrenciler sorguda atlanır; iş yarıda kesilirse kaldığı yerden devam eder.
+DEFAULT_CHUNK_SIZE = 5000
+CHECKPOINT_PATH = os.path.join(MODEL_DIR, "rescore_checkpoint.json")
+
+# İşçi süreçlerde (veya tek süreçli çalışmada ana süreçte) bir kez yüklenen model paketi
+_worker_bundle = None
+
+
+def _init_worker(version):
+    # fork ile devralınan bağlantı havuzu ana sürece aittir; işçi kendi bağlantılarını açar
+    from src.database.db_config import dispose_engine
+
+    global _worker_bundle
+    dispose_engine(close=False)
+    _worker_bundle = load_bundle(version, verify=False)
+
+
+def _rescore_range(after_id, upto_id):
+    """(after_id, upto_id] aralığındaki öğrencileri skorlayıp kaydeder; (after_id, upto_id, satır, süre) döndürür."""
+    from src.database.crud import get_students_to_rescore, save_rescored_predictions
+    from src.database.db_config import SessionLocal
+
+    start = time.perf_counter()
+    bundle = _worker_bundle
+    db = SessionLocal()
+    try:
+        with stage("rescore.read") as s:
+            students = get_students_to_rescore(db, bundle.version, after_id, upto_id)
+            s.rows = len(students)
+        if students.empty:
+            return after_id, upto_id, 0, time.perf_counter() - start
+        # Düz orman hem tahmin hem faktör katkıları için tek yürüyüş yapar (bkz. score_frame)
+        scored, _ = score_frame(students.copy(), bundle.predictor, bundle.preprocessor, explainer=bundle.predictor)
+        saved = save_rescored_predictions(db, students, scored, bundle.version)
+    finally:
+        db.close()
+    return after_id, upto_id, saved, time.perf_counter() - start
+
+
+def load_checkpoint(path, version):
+    """Aynı sürüm için kaydedilmiş ilerlemeyi döndürür; yoksa (ya da başka sürüme aitse) baştan başlanır."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        checkpoint = json.load(f)
+    return checkpoint if checkpoint.get("model_version") == version else None
+
+
+def save_checkpoint(path, version, watermark, scored):
+    """watermark: bu id'ye kadar (dahil) tüm öğrenciler skorlandı. Yarım dosya kalmasın diye yerine taşınarak yazılır."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"model_version": version, "watermark": watermark, "scored": scored,
+                   "updated_at": datetime.now().isoformat(timespec="seconds")}, f)
+    os.replace(tmp_path, path)
+
+
+def rescore_students(version=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=1, checkpoint_path=None, restart=False):
+    """
+    Veritabanındaki öğrencileri verilen (varsayılan: aktif) model sürümüyle yeniden skorlar.
+    workers > 1 ise parçalar süreç havuzunda paralel işlenir (her işçi kendi veritabanı bağlantısını açar).
+    Her tamamlanan parçadan sonra, kesintisiz tamamlanan en büyük id checkpoint dosyasına yazılır.
+    Eklenen tahmin sayısını döndürür.
+    """
+    from src.database.crud import count_students_to_rescore, rescore_chunk_bound
+    from src.database.db_config import SessionLocal, ensure_columns, ensure_indexes
+
+    global _worker_bundle
+
+    checkpoint_path = checkpoint_path or CHECKPOINT_PATH
+    version = version or get_active_version()
+    try:
+        bundle = load_bundle(version)
+    except FileNotFoundError:
+        print("🚨 Model dosyaları bulunamadı! Lütfen önce 'ml_engine.py' dosyasını çalıştırın.")
+        return 0
+    version = bundle.version
+    # model_version sütunu ve atlama indeksi eski veritabanlarında yoksa eklenir
+    ensure_columns()
+    ensure_indexes()
+
+    checkpoint = None if restart else load_checkpoint(checkpoint_path, version)
+    watermark = checkpoint["watermark"] if checkpoint else None
+    scored = checkpoint["scored"] if checkpoint else 0
+    if checkpoint:
+        print(f"↩️ Kaldığı yerden devam ediliyor: id > {watermark} ({scored:,} öğrenci önceden skorlandı)")
+
+    db = SessionLocal()
+    try:
+        total = count_students_to_rescore(db, version, watermark)
+        if not total:
+            print(f"✅ Tüm öğrenciler {version} sürümüyle zaten skorlanmış.")
+            return 0
+        workers = max(1, min(workers, -(-total // chunk_size)))
+        print(f"⏳ {total:,} öğrenci {version} sürümüyle yeniden skorlanıyor "
+              f"({chunk_size:,} öğrencilik parçalar, {workers} süreç)...")
+
+        def next_range(after_id):
+            bound = rescore_chunk_bound(db, version, after_id, chunk_size)
+            # Okuma işlemi açık kalmasın (SQLite WAL dosyası uzun süren okuyucu yüzünden büyümesin)
+            db.rollback()
+            return None if bound is None else (after_id, bound)
+
+        start = time.perf_counter()
+        done_rows, done_chunks = 0, 0
+        report_every = max(1, -(-total // chunk_size) // 20)
+        # Parçalar sırayla dağıtılır ama farklı sırada bitebilir; checkpoint, kendisinden önceki tüm
+        # parçalar bitmiş olan en büyük sınıra ilerletilir
+        pending, finished = [], {}
+
+        def record(chunk, rows):
+            nonlocal watermark, scored, done_rows, done_chunks
+            finished[chunk] = rows
+            done_rows += rows
+            done_chunks += 1
+            while pending and pending[0] in finished:
+                completed = pending.pop(0)
+                watermark = completed[1]
+                scored += finished.pop(completed)
+            save_checkpoint(checkpoint_path, version, watermark, scored)
+            if done_chunks % report_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"   {done_rows:,}/{total:,} öğrenci ({done_rows / max(elapsed, 1e-9):,.0f} satır/sn)")
+
+        if workers == 1:
+            _worker_bundle = bundle
+            chunk = next_range(watermark)
+            while chunk is not None:
+                pending.append(chunk)
+                record(chunk, _rescore_range(*chunk)[2])
+                chunk = next_range(chunk[1])
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(version,)) as executor:
+                futures = {}
+                chunk = next_range(watermark)
+                while chunk is not None or futures:
+                    # İşçi başına en fazla iki parça kuyrukta bekler; sınırlar işler ilerledikçe hesaplanır
+                    while chunk is not None and len(futures) < workers * 2:
+                        pending.append(chunk)
+                        futures[executor.submit(_rescore_range, *chunk)] = chunk
+                        chunk = next_range(chunk[1])
+                    completed, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in completed:
+                        record(futures.pop(future), future.result()[2])
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"🎉 {done_rows:,} öğrenci {elapsed:.1f} sn'de yeniden skorlandı "
+          f"({done_rows / max(elapsed, 1e-9):,.0f} satır/sn, model: {version}).")
+    return done_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Veritabanındaki öğrencileri yeni model sürümüyle yeniden skorlar.")
+    parser.add_argument("--version", default=None, help="Model sürümü (varsayılan: aktif sürüm)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="Paralel süreç sayısı (SQLite'ta yazımlar sıralanır)")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH, help="İlerleme dosyası")
+    parser.add_argument("--restart", action="store_true", help="Checkpoint'i yok sayıp baştan tara")
+    args = parser.parse_args(argv)
+
+    rescore_students(args.version, args.chunk_size, args.workers, args.checkpoint, args.restart)
+    # EDUANALYTIX_METRICS açıksa aşama süreleri özetlenir (işçi süreçlerinin ölçümleri dahil değildir)
+    print_summary()
+
+
+if __name__ == "__main__":
+    main()
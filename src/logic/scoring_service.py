@@ -0,0 +1,351 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+# Proje dizin yapısına göre path ayarı
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..', '..'))
+sys.path.append(root_dir)
+
+from src.logic.batch_scoring import normalize_columns
+from src.logic.drift import DriftMonitor
+from src.logic.model_registry import ModelServer
+from src.utils import instrumentation
+from src.utils.helpers import get_ai_feedback_batch
+from src.utils.instrumentation import stage
+
+# Eşzamanlı tek öğrenci istekleri en fazla MAX_BATCH satırlık ya da ilk istekten itibaren
+# MAX_WAIT_MS süre bekleyen mikro gruplarda toplanır; her grup tek bir predict çağrısıyla skorlanır.
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_REQUEST_TIMEOUT = 10.0
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# p50/p99 ve anlık verim son bu kadar istek üzerinden hesaplanır
+STATS_WINDOW = 10_000
+
+
+class ServiceStats:
+    """Son STATS_WINDOW isteğin gecikmesini ve grup boyutlarını tutar (thread-safe)."""
+
+    def __init__(self, window=STATS_WINDOW):
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self._latencies = deque(maxlen=window)
+        self._finished = deque(maxlen=window)
+        self._batch_sizes = deque(maxlen=window)
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record_batch(self, latencies, failed=False):
+        now = time.monotonic()
+        with self._lock:
+            self.requests += len(latencies)
+            self.batches += 1
+            if failed:
+                self.errors += len(latencies)
+            self._latencies.extend(latencies)
+            self._finished.extend([now] * len(latencies))
+            self._batch_sizes.append(len(latencies))
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.asarray(self._latencies, dtype=np.float64) * 1000
+            finished = list(self._finished)
+            batch_sizes = list(self._batch_sizes)
+            requests, batches, errors = self.requests, self.batches, self.errors
+        span = finished[-1] - finished[0] if len(finished) > 1 else 0.0
+        return {
+            "requests": requests,
+            "batches": batches,
+            "errors": errors,
+            "uptime_sec": time.monotonic() - self._started,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+            "mean_batch_size": float(np.mean(batch_sizes)) if batch_sizes else 0.0,
+            "requests_per_sec": (len(finished) - 1) / span if span > 0 else 0.0,
+        }
+
+
+class InvalidRecordError(ValueError):
+    """İstek girdisi eksik ya da hatalı; sadece o isteğe 400 döner."""
+
+
+def validate_record(record, preprocessor):
+    """
+    Tek öğrencinin ham girdisini denetler ve sütun isimleri normalize edilmiş bir kopyasını döndürür:
+    modelin tüm özellikleri dolu olmalı, sayısal özellikler sayıya çevrilebilmeli.
+    Hatalı kayıt gruba hiç girmez; böylece aynı gruptaki diğer istekler etkilenmez.
+    """
+    record = {str(key).strip().lower(): value for key, value in record.items()}
+    missing, invalid = [], []
+    for col in preprocessor.feature_names or []:
+        value = record.get(col)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            missing.append(col)
+        elif col not in preprocessor.lookup:
+            try:
+                record[col] = float(value)
+            except (TypeError, ValueError):
+                invalid.append(col)
+            else:
+                if np.isnan(record[col]):
+                    missing.append(col)
+    if missing or invalid:
+        problems = []
+        if missing:
+            problems.append(f"eksik alanlar: {', '.join(missing)}")
+        if invalid:
+            problems.append(f"sayı olmayan alanlar: {', '.join(invalid)}")
+        raise InvalidRecordError("; ".join(problems))
+    return record
+
+
+class _PendingRequest:
+    __slots__ = ("record", "future", "enqueued")
+
+    def __init__(self, record):
+        self.record = record
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+
+class MicroBatcher:
+    """
+    İstekleri bir kuyrukta toplayıp tek bir arka plan thread'inde gruplar halinde skorlar.
+    Model, encoder'lar ve düz orman ModelServer'dan alınır; aktif sürüm değişirse sonraki grup yenisini kullanır.
+    """
+
+    def __init__(self, model_server=None, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.model_server = model_server or ModelServer()
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.stats = ServiceStats()
+        # Aktif model sürümünün girdi dağılımı izleyicisi (sürüm değişince yenisi kurulur)
+        self.drift = None
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.drift is not None:
+            self.drift.flush()
+
+    def submit(self, record):
+        """
+        Tek öğrencinin ham girdisini denetleyip kuyruğa ekler; sonucu taşıyan bir Future döndürür.
+        Eksik/hatalı girdide InvalidRecordError fırlatır (kayıt kuyruğa girmez).
+        """
+        bundle = self.model_server.current()
+        if bundle is not None:
+            record = validate_record(record, bundle.preprocessor)
+        pending = _PendingRequest(record)
+        self._queue.put(pending)
+        return pending.future
+
+    def predict(self, record, timeout=DEFAULT_REQUEST_TIMEOUT):
+        return self.submit(record).result(timeout)
+
+    def _collect(self):
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        # Bekleme süresi ilk istekten başlar; grup dolarsa hemen skorlanır
+        deadline = batch[0].enqueued + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._score(batch)
+
+    def _drift_monitor(self, bundle):
+        if bundle.drift_reference is None:
+            return None
+        if self.drift is None or self.drift.model_version != bundle.version:
+            # Önceki sürümün son penceresi kaydedilir
+            if self.drift is not None:
+                self.drift.flush()
+            self.drift = DriftMonitor(bundle.drift_reference, bundle.version, source="service")
+        return self.drift
+
+    def _score(self, batch):
+        bundle = None
+        try:
+            bundle = self.model_server.current()
+            if bundle is None:
+                raise RuntimeError("Model yüklenemedi; önce 'ml_engine.py' çalıştırılmalı.")
+            scores, feedback = self._score_records(bundle, batch)
+        except Exception as e:
+            if len(batch) > 1 and bundle is not None:
+                # Denetimden geçip yine de hata veren bir kayıt tüm grubu düşürmesin: satır satır yeniden denenir
+                for item in batch:
+                    self._score([item])
+                return
+            for item in batch:
+                item.future.set_exception(e)
+            self.stats.record_batch([time.monotonic() - item.enqueued for item in batch], failed=True)
+            return
+
+        for item, score, risk, code in zip(batch, scores, feedback["risk_label"], feedback["advice_code"]):
+            item.future.set_result({
+                "score": round(float(score), 1),
+                "risk_level": risk,
+                "advice_code": int(code),
+                "model_version": bundle.version,
+            })
+        self.stats.record_batch([time.monotonic() - item.enqueued for item in batch])
+
+    def _score_records(self, bundle, batch):
+        df = normalize_columns(pd.DataFrame.from_records([item.record for item in batch]))
+        with stage("encode", rows=len(df)):
+            processed = bundle.preprocessor.transform(df)
+        with stage("predict", rows=len(df)):
+            scores = bundle.predictor.predict(processed)
+        with stage("feedback", rows=len(df)):
+            feedback = get_ai_feedback_batch(scores, df)
+        # Kayma sayıları grup başarıyla skorlandıktan sonra eklenir (satır satır yeniden denemede iki kez sayılmasın)
+        monitor = self._drift_monitor(bundle)
+        if monitor is not None:
+            with stage("drift", rows=len(df)):
+                monitor.update(processed)
+        return scores, feedback
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /predict  tek öğrencinin girdileri (JSON nesnesi) -> skor, risk ve öneri kodu
+    GET  /stats    p50/p99 gecikme, verim ve ortalama grup boyutu
+    GET  /health   servis ayakta mı
+    GET  /drift    aktif model için özellik başına PSI / KS (eğitim dağılımına göre)
+    GET  /metrics  aşama histogramları, Prometheus metin biçiminde (EDUANALYTIX_METRICS açıksa dolar)
+    """
+
+    # Keep-alive: yük üreticisi aynı bağlantı üzerinden art arda istek gönderebilir
+    protocol_version = "HTTP/1.1"
+    batcher = None
+    request_timeout = DEFAULT_REQUEST_TIMEOUT
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, self.batcher.stats.snapshot())
+        elif self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/drift":
+            drift = self.batcher.drift
+            self._send_json(200, {"model_version": drift.model_version, "rows": drift.rows, "features": drift.scores()}
+                            if drift is not None else {"rows": 0, "features": []})
+        elif self.path == "/metrics":
+            body = instrumentation.export_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": "bulunamadı"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": "bulunamadı"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            record = json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            self._send_json(400, {"error": "geçersiz JSON"})
+            return
+        if not isinstance(record, dict):
+            self._send_json(400, {"error": "istek gövdesi tek öğrencinin girdilerini içeren bir JSON nesnesi olmalı"})
+            return
+
+        try:
+            self._send_json(200, self.batcher.predict(record, self.request_timeout))
+        except InvalidRecordError as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        # Her istek için satır yazılmaz; özet istatistikler periyodik olarak basılır
+        pass
+
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch=DEFAULT_MAX_BATCH,
+                  max_wait_ms=DEFAULT_MAX_WAIT_MS, model_server=None):
+    """Mikro gruplayıcıyı başlatır ve HTTP sunucusunu (henüz dinlemeye başlamadan) döndürür."""
+    batcher = MicroBatcher(model_server, max_batch=max_batch, max_wait_ms=max_wait_ms).start()
+    handler = type("BoundScoringRequestHandler", (ScoringRequestHandler,), {"batcher": batcher})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.batcher = batcher
+    return server
+
+
+def _report_loop(batcher, interval, stop):
+    last_requests = 0
+    while not stop.wait(interval):
+        stats = batcher.stats.snapshot()
+        if stats["requests"] != last_requests:
+            last_requests = stats["requests"]
+            print(f"📈 {stats['requests']:,} istek | p50 {stats['p50_ms']:.1f} ms | p99 {stats['p99_ms']:.1f} ms | "
+                  f"{stats['requests_per_sec']:,.0f} istek/sn | ort. grup {stats['mean_batch_size']:.1f}")
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+          report_interval=10.0):
+    """Skorlama servisini başlatır ve Ctrl+C'ye kadar çalıştırır."""
+    model_server = ModelServer()
+    bundle = model_server.current()
+    if bundle is None:
+        print("🚨 Model dosyaları bulunamadı! Lütfen önce 'ml_engine.py' dosyasını çalıştırın.")
+        return
+
+    server = create_server(host, port, max_batch, max_wait_ms, model_server)
+    stop = threading.Event()
+    if report_interval:
+        threading.Thread(target=_report_loop, args=(server.batcher, report_interval, stop), daemon=True).start()
+    print(f"🚀 Skorlama servisi http://{host}:{port} adresinde (model: {bundle.version}, "
+          f"grup: en fazla {max_batch} satır / {max_wait_ms:g} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Servis durduruluyor...")
+    finally:
+        stop.set()
+        server.server_close()
+        server.batcher.stop()
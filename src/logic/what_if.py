@@ -0,0 +1,151 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.helpers import RISK_TIERS
+
+# "Ne olurdu?" analizi: tek öğrencinin kodlanmış satırından, seçilen faktörlerin ızgarası kadar varyant
+# üretilir ve hepsi tek bir predict çağrısıyla skorlanır. Isı haritası, tepki eğrileri ve en küçük
+# değişiklik sıralaması aynı ızgaradan (dilimleriyle) hesaplanır.
+
+# Ayarlanabilir faktörler: (etiket, en az, en çok, adım, değişim birimi)
+# Değişim birimi, sıralamada farklı faktörleri karşılaştırmak içindir: 2 saat çalışma ≈ 5 puan devam ≈ 1 özel ders
+ADJUSTABLE_FACTORS = {
+    "hours_studied": ("Haftalık Çalışma Saati", 0, 44, 1, 2),
+    "attendance": ("Devam Oranı (%)", 60, 100, 1, 5),
+    "sleep_hours": ("Günlük Uyku Saati", 4, 10, 1, 1),
+    "tutoring_sessions": ("Aylık Özel Ders Sayısı", 0, 8, 1, 1),
+    "physical_activity": ("Haftalık Spor Saati", 0, 6, 1, 1),
+}
+
+# Yüksek Risk bandının üst sınırı (RISK_TIERS'taki en düşük eşik)
+HIGH_RISK_THRESHOLD = RISK_TIERS[-2][0]
+
+# Tek predict çağrısındaki en fazla varyant; etkileşimli gecikme için ızgara gerekirse seyreltilir
+DEFAULT_MAX_POINTS = 6000
+# Seyreltilen eksenlerde bile mevcut değerin bu kadar adım çevresi tam çözünürlükte kalır (küçük değişiklikler için)
+NEAR_STEPS = 3
+
+WhatIfResult = namedtuple("WhatIfResult", ["factors", "axes", "base_values", "base_index", "scores"])
+
+
+def axis_values(factor, base_value, stride=1):
+    """
+    Faktörün aralığındaki değerler (stride adımında). Öğrencinin mevcut değeri ve çevresindeki NEAR_STEPS adım
+    her zaman eksende yer alır.
+    """
+    _, low, high, step, _ = ADJUSTABLE_FACTORS[factor]
+    values = np.arange(low, high + step, step * stride, dtype=np.float64)
+    near = float(base_value) + step * np.arange(-NEAR_STEPS, NEAR_STEPS + 1)
+    near = near[(near >= min(low, base_value)) & (near <= max(high, base_value))]
+    return np.unique(np.concatenate([values, near]))
+
+
+def grid_axes(base_values, factors, max_points=DEFAULT_MAX_POINTS):
+    """
+    Toplam nokta sayısı max_points'i aşmayana kadar en uzun ekseni seyrelterek ızgara eksenlerini kurar.
+    Mevcut değerin çevresi seyreltilmediği için çok faktörlü ızgaralar bu sınırı bir miktar aşabilir.
+    """
+    strides = {factor: 1 for factor in factors}
+    while True:
+        axes = {factor: axis_values(factor, base_values[factor], strides[factor]) for factor in factors}
+        sizes = {factor: len(values) for factor, values in axes.items()}
+        if np.prod(list(sizes.values())) <= max_points or all(size <= 2 * NEAR_STEPS + 3 for size in sizes.values()):
+            return axes
+        strides[max(sizes, key=sizes.get)] += 1
+
+
+def build_variants(processed_row, axes):
+    """Kodlanmış tek satırı, eksenlerin kartezyen çarpımı kadar satırlık bir matrise çoğaltır."""
+    columns = list(processed_row.columns)
+    grids = np.meshgrid(*axes.values(), indexing="ij")
+    matrix = np.repeat(processed_row.to_numpy(dtype=np.float64), grids[0].size, axis=0)
+    for factor, grid in zip(axes, grids):
+        matrix[:, columns.index(factor)] = grid.ravel()
+    return pd.DataFrame(matrix, columns=columns)
+
+
+def explore(model, processed_row, factors, max_points=DEFAULT_MAX_POINTS):
+    """
+    Seçilen faktörlerin ızgarasını tek predict çağrısıyla skorlar.
+    Büyük ızgaralarda sklearn modeli düz ormandan hızlıdır (düz orman tek satır gecikmesi için tasarlandı);
+    iki yol da aynı tahmini üretir.
+    """
+    base_values = {factor: float(processed_row[factor].iloc[0]) for factor in factors}
+    axes = grid_axes(base_values, factors, max_points)
+    scores = np.asarray(model.predict(build_variants(processed_row, axes)), dtype=np.float64)
+    base_index = tuple(int(np.searchsorted(values, base_values[factor])) for factor, values in axes.items())
+    return WhatIfResult(list(factors), axes, base_values, base_index, scores.reshape([len(v) for v in axes.values()]))
+
+
+def base_score(result):
+    return float(result.scores[result.base_index])
+
+
+def response_curve(result, factor):
+    """Diğer faktörler mevcut değerlerinde sabitken tek faktörün tepki eğrisi: (değerler, skorlar)."""
+    i = result.factors.index(factor)
+    index = list(result.base_index)
+    index[i] = slice(None)
+    return result.axes[factor], result.scores[tuple(index)]
+
+
+def heatmap(result, x_factor, y_factor):
+    """İki faktörün ızgarası (diğerleri sabit): (x değerleri, y değerleri, skorlar[y, x])."""
+    index = list(result.base_index)
+    ix, iy = result.factors.index(x_factor), result.factors.index(y_factor)
+    index[ix] = index[iy] = slice(None)
+    grid = result.scores[tuple(index)]
+    # Dilim, faktörlerin ızgaradaki sırasıyla gelir; satırlar y olacak şekilde çevrilir
+    return result.axes[x_factor], result.axes[y_factor], (grid.T if ix < iy else grid)
+
+
+def smallest_changes(result, target=HIGH_RISK_THRESHOLD, top=5):
+    """
+    Skoru hedefe (varsayılan: Yüksek Risk bandının dışına) taşıyan varyantlar içinden en küçük değişiklikleri
+    sıralar. Maliyet, değişim birimleriyle ölçülen toplam değişimdir; bir öneri daha ucuz bir önerinin
+    üzerine ek değişiklik yapıyorsa (ona baskın değilse) listelenmez.
+    """
+    # Öğrenci hedefin zaten üzerindeyse önerilecek bir değişiklik yoktur
+    if base_score(result) >= target:
+        return []
+    grids = np.meshgrid(*result.axes.values(), indexing="ij")
+    scores = result.scores.ravel()
+    reached = np.flatnonzero(scores >= target)
+    if not len(reached):
+        return []
+
+    deltas = np.column_stack([grid.ravel()[reached] - result.base_values[factor]
+                              for factor, grid in zip(result.factors, grids)])
+    units = np.array([ADJUSTABLE_FACTORS[factor][4] for factor in result.factors], dtype=np.float64)
+    cost = (np.abs(deltas) / units).sum(axis=1)
+    changed = (deltas != 0).sum(axis=1)
+    # Önce maliyet, eşitlikte daha az faktör, sonra daha yüksek skor
+    order = np.lexsort((-scores[reached], changed, cost))
+
+    picked = []
+    for i in order:
+        delta = deltas[i]
+        # Aynı yönde ve her faktörde en fazla bu kadar değişiklik içeren daha ucuz bir öneri varsa atlanır
+        if any(np.all((np.sign(p) == np.sign(delta)) | (p == 0)) and np.all(np.abs(p) <= np.abs(delta))
+               for p in (deltas[j] for j in picked)):
+            continue
+        picked.append(i)
+        if len(picked) == top:
+            break
+
+    return [{
+        "changes": {factor: (result.base_values[factor], float(result.base_values[factor] + d))
+                    for factor, d in zip(result.factors, deltas[i]) if d != 0},
+        "score": float(scores[reached[i]]),
+        "cost": float(cost[i]),
+    } for i in picked]
+
+
+def next_target(score):
+    """Öğrencinin bir üst risk bandının eşiği (en üst banttaysa None)."""
+    for threshold, *_ in reversed(RISK_TIERS[:-1]):
+        if score < threshold:
+            return threshold
+    return None
@@ -1,12 +1,7 @@
 import sys
 import os
-import json
 import pandas as pd
 import streamlit as st
-import joblib
-import plotly.express as px
-from sqlalchemy.orm import Session
-import base64  # HTML indirmek için gerekli
 
 # --- PATH AYARI ---
 # Proje kök dizinini bulup ekliyoruz ki src modülleri görülebilsin
@@ -14,94 +9,210 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.abspath(os.path.join(current_dir, '..', '..'))
 sys.path.append(root_dir)
 
-from src.database.db_config import SessionLocal
-from src.database.models import Student, AIPrediction
+# Açılışı hızlandırmak için ağır modüller (plotly, SQLAlchemy / veritabanı katmanı) sadece
+# kullanıldıkları fonksiyonların içinde import edilir; motor da ilk sorguda oluşturulur.
 # Akıllı öneri motorunu dahil ediyoruz (Veli/Öğretmen ayrımı olan versiyon)
-from src.utils.helpers import get_ai_feedback
+from src.utils.helpers import get_ai_feedback, RISK_TIERS
+from src.logic.model_registry import ModelServer
+from src.logic.prediction_cache import PredictionCache, make_key
+from src.logic.batch_scoring import score_csv_stream, iter_results, normalize_columns
+from src.logic.drift import DriftMonitor, drift_status, MIN_SAMPLES, PSI_ALERT, PSI_WARN
+from src.logic import what_if
+from src.logic.attribution import explain, top_factor_strings
+from src.utils.reports import render_report, write_reports_zip, iter_report_frames_from_results, iter_report_frames_from_db
+from src.utils import instrumentation
+from src.utils.instrumentation import stage
 
 st.set_page_config(page_title="EduAnalytix Pro", layout="wide", page_icon="🎓")
 
 
 # --- MODELLERİ YÜKLE ---
 @st.cache_resource
-def load_ai_assets():
-    try:
-        model_path = os.path.join(root_dir, "models", "student_score_model.pkl")
-        encoders_path = os.path.join(root_dir, "models", "encoders.pkl")
-        metrics_path = os.path.join(root_dir, "models", "metrics.json")
+def get_model_server():
+    # Süreç başına tek bir sunucu; yeni eğitilen sürümler yeniden başlatmadan arka planda devreye alınır.
+    # İlk yükleme (joblib + sklearn modeli) arka planda başlar, sayfa modeli beklemeden çizilir.
+    server = ModelServer()
+    server.prefetch()
+    return server
+
+
+@st.cache_resource
+def get_prediction_cache():
+    # Oturumlar arasında paylaşılır; anahtar model sürümünü içerdiği için model değişince kendiliğinden geçersizleşir
+    return PredictionCache()
+
+
+@st.cache_resource
+def get_drift_monitor(model_version, _reference):
+    # Model sürümü başına bir izleyici; sayılar oturumlar arasında paylaşılır ve periyodik olarak veritabanına yazılır
+    return DriftMonitor(_reference, model_version, source="dashboard")
+
+
+def current_drift_monitor():
+    """Aktif model sürümünün kayma izleyicisi; referans taslağı olmayan eski paketlerde None."""
+    bundle = get_model_server().current(wait=False)
+    if bundle is None or bundle.drift_reference is None:
+        return None
+    return get_drift_monitor(bundle.version, bundle.drift_reference)
+
+
+def load_ai_assets(wait=True):
+    """
+    Aktif paketin o anki referansını alır; bir sayfa çalıştırması boyunca aynı sürüm kullanılır.
+    wait=False iken model henüz arka planda yükleniyorsa beklemeden None değerleri döner.
+    """
+    bundle = get_model_server().current(wait=wait)
+    if bundle is None:
+        return None, None, None, None, None
+    return bundle.model, bundle.metrics, bundle.predictor, bundle.preprocessor, bundle.version
+
 
-        model = joblib.load(model_path)
-        encoders = joblib.load(encoders_path)
+def wait_for_ai_assets():
+    # İlk tahminde model hâlâ yükleniyorsa kullanıcıya bekleme göstergesi gösterilir
+    if get_model_server().loading:
+        with st.spinner("⏳ Model yükleniyor..."):
+            return load_ai_assets()
+    return load_ai_assets()
 
-        metrics = None
-        if os.path.exists(metrics_path):
-            with open(metrics_path, "r") as f:
-                metrics = json.load(f)
-        return model, encoders, metrics
-    except FileNotFoundError:
-        return None, None, None
 
+# Model yüklemesi sayfa seçiminden bağımsız olarak açılışta başlatılır
+get_model_server()
 
-model, encoders, metrics = load_ai_assets()
+# Geçmiş sayfasındaki risk filtresi: tek öğrenci ve toplu analizin ürettiği tüm etiketler
+HISTORY_RISK_LEVELS = [tier[1] for tier in RISK_TIERS]
 
 
 # --- RAPOR OLUŞTURUCU (HTML) ---
 def create_report_html(student_name, score, risk, advice_list):
     """
     Sadece VELİYE GÖSTERİLECEK bilgileri içeren temiz bir HTML rapor oluşturur.
-    Öğretmen notları buraya dahil edilmez.
+    Öğretmen notları buraya dahil edilmez. Şablon toplu raporlarla ortaktır (src/utils/reports.py).
     """
-    advice_html = "".join([f"<li style='margin-bottom:10px;'>{item}</li>" for item in advice_list])
-
-    # Basit ve Şık bir HTML Tasarımı
-    html_content = f"""
-    <html>
-    <head>
-        <style>
-            body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; color: #333; padding: 20px; background-color: #f4f4f4; }}
-            .container {{ max-width: 800px; margin: 0 auto; background-color: #fff; padding: 40px; border-radius: 15px; box-shadow: 0 4px 8px rgba(0,0,0,0.1); }}
-            .header {{ text-align: center; border-bottom: 2px solid #4CAF50; padding-bottom: 20px; margin-bottom: 30px; }}
-            .header h1 {{ margin: 0; color: #2E7D32; }}
-            .score-box {{ background-color: #f9f9f9; padding: 20px; border-radius: 10px; text-align: center; margin-bottom: 30px; border: 1px solid #e0e0e0; }}
-            .score {{ font-size: 48px; font-weight: bold; color: #4CAF50; margin: 10px 0; }}
-            .risk {{ font-size: 22px; font-weight: bold; color: #555; }}
-            .advice-section {{ background-color: #e8f5e9; padding: 25px; border-radius: 10px; border-left: 5px solid #4CAF50; }}
-            h2 {{ color: #2E7D32; margin-top: 0; }}
-            ul {{ padding-left: 20px; }}
-            .footer {{ margin-top: 40px; text-align: center; font-size: 12px; color: #888; border-top: 1px solid #eee; padding-top: 20px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🎓 EduAnalytix Gelişim Raporu</h1>
-                <p>Sayın Veli,</p>
-            </div>
-
-            <p style="font-size: 16px;">Öğrencimiz <strong>{student_name}</strong> için yapılan yapay zeka destekli akademik performans analizi sonuçları aşağıdadır.</p>
-
-            <div class="score-box">
-                <div style="font-size: 14px; text-transform: uppercase; letter-spacing: 1px;">Tahmini Dönem Sonu Başarısı</div>
-                <div class="score">{score:.1f} / 100</div>
-                <div class="risk">Genel Durum: {risk}</div>
-            </div>
-
-            <div class="advice-section">
-                <h2>💡 Gelişim ve Destek Önerileri</h2>
-                <ul>
-                    {advice_html}
-                </ul>
-            </div>
-
-            <div class="footer">
-                Bu rapor EduAnalytix Yapay Zeka Destekli Karar Destek Sistemi tarafından oluşturulmuştur. <br>
-                Okul Rehberlik Servisi
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    return html_content
+    with stage("render_html", rows=1):
+        return render_report(student_name, score, risk, advice_list)
+
+
+# --- TOPLU RAPOR (ZIP) ---
+def _discard_report_zip(key):
+    previous = st.session_state.pop(key, None)
+    if previous is not None and os.path.exists(previous.path):
+        os.remove(previous.path)
+
+
+def _discard_batch_summary():
+    """Önceki toplu analizin özetini, geçici sonuç dosyasını ve rapor ZIP'ini siler."""
+    previous = st.session_state.pop('batch_summary', None)
+    st.session_state.pop('batch_summary_upload', None)
+    if previous is not None and os.path.exists(previous.result_path):
+        os.remove(previous.result_path)
+    _discard_report_zip('batch_reports')
+
+
+def _upload_key(uploaded_file):
+    # Aynı isimli dosya yeniden yüklense de file_id değişir; eski Streamlit sürümlerinde ad + boyut kullanılır
+    if uploaded_file is None:
+        return None
+    return getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+
+
+def show_report_export(key, label, total, frames_factory):
+    """Raporları işçi havuzunda üretip geçici bir ZIP dosyasına akıtır ve indirme butonu gösterir."""
+    if st.button(label):
+        _discard_report_zip(key)
+        progress_bar = st.progress(0.0, text="Raporlar hazırlanıyor...")
+        try:
+            with stage("report_zip") as s:
+                st.session_state[key] = write_reports_zip(
+                    frames_factory(),
+                    progress_callback=lambda n: progress_bar.progress(min(n / max(total, 1), 1.0),
+                                                                      text=f"Raporlar hazırlanıyor... {n}/{total}")
+                )
+                s.rows = st.session_state[key].count
+        except Exception as e:
+            st.error(f"Rapor oluşturma hatası: {e}")
+            return
+
+    export = st.session_state.get(key)
+    if export is not None and os.path.exists(export.path):
+        st.caption(f"{export.count} rapor {export.seconds:.1f} sn'de hazırlandı ({export.reports_per_sec:,.0f} rapor/sn).")
+        with open(export.path, "rb") as f:
+            st.download_button(
+                label=f"📥 Veli Raporlarını İndir (ZIP, {export.count} rapor)",
+                data=f,
+                file_name="Veli_Raporlari.zip",
+                mime="application/zip",
+                key=f"{key}_download"
+            )
+
+
+# --- NE OLURDU? (SENARYO ANALİZİ) ---
+@st.cache_data(max_entries=64, show_spinner=False)
+def run_what_if(model_version, processed_row, factors, _model):
+    # Aynı öğrenci, faktörler ve model sürümü için ızgara bir kez skorlanır
+    import time
+    start = time.perf_counter()
+    result = what_if.explore(_model, processed_row, list(factors))
+    return result, time.perf_counter() - start
+
+
+def _change_text(changes):
+    return ", ".join(f"{what_if.ADJUSTABLE_FACTORS[f][0]}: {old:g} → {new:g}" for f, (old, new) in changes.items())
+
+
+def show_what_if(model, preprocessor, model_version, input_df):
+    """Öğrencinin seçilen faktörlerdeki değişikliklere tepkisini tek bir toplu tahminle gösterir."""
+    labels = {f: spec[0] for f, spec in what_if.ADJUSTABLE_FACTORS.items()}
+    factors = st.multiselect("Değiştirilebilir Faktörler", list(labels), format_func=labels.get,
+                             default=["hours_studied", "attendance", "sleep_hours", "tutoring_sessions"])
+    if not factors:
+        st.info("En az bir faktör seçin.")
+        return
+
+    with stage("what_if"):
+        result, seconds = run_what_if(model_version, preprocessor.transform(input_df), tuple(factors), model)
+    current = what_if.base_score(result)
+    st.caption(f"{result.scores.size:,} senaryo tek tahmin çağrısıyla {seconds * 1000:.0f} ms'de skorlandı "
+               f"(mevcut tahmin: {current:.1f}).")
+
+    import plotly.express as px
+
+    # En küçük değişiklikler: Yüksek Risk'teyse bandın dışı, değilse bir üst bant hedeflenir
+    target = what_if.HIGH_RISK_THRESHOLD if current < what_if.HIGH_RISK_THRESHOLD else what_if.next_target(current)
+    if target is None:
+        st.success("Öğrenci zaten en üst bantta.")
+    else:
+        st.markdown(f"**🎯 Skoru {target} ve üzerine taşıyan en küçük değişiklikler**")
+        suggestions = what_if.smallest_changes(result, target)
+        if suggestions:
+            st.dataframe(pd.DataFrame({
+                "Değişiklik": [_change_text(s["changes"]) for s in suggestions],
+                "Tahmini Not": [round(s["score"], 1) for s in suggestions],
+                "Değişim Büyüklüğü": [round(s["cost"], 1) for s in suggestions],
+            }), use_container_width=True, hide_index=True)
+        else:
+            st.warning("Seçilen faktörlerin aralığında hedefe ulaşan bir senaryo bulunamadı.")
+
+    if len(factors) >= 2:
+        c1, c2 = st.columns(2)
+        x_factor = c1.selectbox("Yatay Eksen", factors, format_func=labels.get, index=0)
+        y_factor = c2.selectbox("Dikey Eksen", [f for f in factors if f != x_factor], format_func=labels.get)
+        xs, ys, grid = what_if.heatmap(result, x_factor, y_factor)
+        fig = px.imshow(grid, x=xs, y=ys, origin="lower", aspect="auto", color_continuous_scale="RdYlGn",
+                        labels={"x": labels[x_factor], "y": labels[y_factor], "color": "Tahmini Not"},
+                        title="Tahmini Not Isı Haritası (diğer faktörler sabit)")
+        fig.add_scatter(x=[result.base_values[x_factor]], y=[result.base_values[y_factor]], mode="markers",
+                        marker=dict(symbol="x", size=12, color="black"), name="Mevcut", showlegend=False)
+        st.plotly_chart(fig, use_container_width=True)
+
+    curves = []
+    for factor in factors:
+        values, scores = what_if.response_curve(result, factor)
+        curves.append(pd.DataFrame({"Faktör": labels[factor], "Değer": values, "Tahmini Not": scores}))
+    fig = px.line(pd.concat(curves), x="Değer", y="Tahmini Not", facet_col="Faktör", facet_col_wrap=2,
+                  markers=True, title="Tepki Eğrileri (tek faktör değişirken)")
+    fig.update_xaxes(matches=None, showticklabels=True)
+    fig.add_hline(y=what_if.HIGH_RISK_THRESHOLD, line_dash="dash", line_color="red")
+    st.plotly_chart(fig, use_container_width=True)
 
 
 # --- SAYFA 1: ANALİZ ---
@@ -109,9 +220,14 @@ def show_analysis_page():
     st.title("🎓 Yeni Öğrenci Analizi")
     st.markdown("---")
 
-    if not model:
-        st.error("🚨 Model dosyaları bulunamadı! Lütfen önce 'ml_engine.py' dosyasını çalıştırın.")
-        return
+    model, metrics, predictor, preprocessor, model_version = load_ai_assets(wait=False)
+    model_loading = not model and get_model_server().loading
+    if not model and not model_loading:
+        # Arka plandaki yükleme tam bu arada bitmiş olabilir; hâlâ model yoksa dosyalar eksiktir
+        model, metrics, predictor, preprocessor, model_version = load_ai_assets()
+        if not model:
+            st.error("🚨 Model dosyaları bulunamadı! Lütfen önce 'ml_engine.py' dosyasını çalıştırın.")
+            return
 
     # --- SOL MENÜ ---
     st.sidebar.header("📝 Öğrenci Bilgileri")
@@ -120,8 +236,21 @@ def show_analysis_page():
             st.write(f"**Doğruluk (R2):** %{metrics['r2'] * 100:.1f}")
             st.write(f"**Hata Payı:** ±{metrics['mae']:.1f} Puan")
             st.caption(f"Son Eğitim: {metrics.get('last_trained', '-')}")
+            if metrics.get("mode") == "incremental":
+                base = metrics.get("base_metrics") or {}
+                base_text = (f" (temel model: R2 %{base['r2'] * 100:.1f}, ±{base['mae']:.1f} puan)"
+                             if base.get("r2") is not None and base.get("mae") is not None else "")
+                st.caption(f"Artımlı güncelleme: {metrics['incremental']['test_rows']} yeni gerçek not "
+                           f"üzerinde ölçüldü{base_text}")
             if metrics['r2'] > 0:
                 st.progress(metrics['r2'])
+    elif model_loading:
+        st.sidebar.caption("⏳ Model arka planda yükleniyor...")
+
+    cache_stats = get_prediction_cache().stats()
+    with st.sidebar.expander("⚡ Tahmin Önbelleği", expanded=False):
+        st.write(f"**İsabet:** {cache_stats['hits']}  |  **Iska:** {cache_stats['misses']}")
+        st.caption(f"İsabet oranı: %{cache_stats['hit_rate'] * 100:.0f} · Kayıt sayısı: {cache_stats['size']}")
 
     first_name = st.sidebar.text_input("Öğrenci Adı")
     last_name = st.sidebar.text_input("Öğrenci Soyadı")
@@ -171,35 +300,50 @@ def show_analysis_page():
             if not first_name or not last_name:
                 st.warning("Lütfen önce öğrenci adını ve soyadını girin.")
             else:
-                # 1. Veriyi Hazırla
-                processed_df = input_df.copy()
-
-                # 2. Encoding (Kategorik verileri sayıya çevir)
-                for col, encoder in encoders.items():
-                    if col in processed_df.columns:
-                        try:
-                            processed_df[col] = encoder.transform(processed_df[col].astype(str))
-                        except:
-                            processed_df[col] = 0
-
-                # --- KRİTİK DÜZELTME BURASI ---
-                # Modelin eğitim sırasında gördüğü sütunların listesini alıyoruz
-                if hasattr(model, 'feature_names_in_'):
-                    # processed_df içindeki sütunları, modelin beklediği sıraya göre diziyoruz
-                    processed_df = processed_df[model.feature_names_in_]
-                # ------------------------------
-
-                # 3. Tahmin Yap
-                pred = model.predict(processed_df)[0]
-
-                # 4. Geri Bildirim Al
-                feedback = get_ai_feedback(pred, input_df.iloc[0])
-
-                st.session_state['prediction_result'] = {
-                    'score': pred,
-                    'feedback': feedback,
-                    'processed_df': processed_df
-                }
+                model, metrics, predictor, preprocessor, model_version = wait_for_ai_assets()
+                if not model:
+                    st.error("🚨 Model yüklenemedi! Lütfen önce 'ml_engine.py' dosyasını çalıştırın.")
+                    return
+
+                # 1-2. Encoding (Kategorik verileri sayıya çevir, modelin beklediği sütun sırasına diz)
+                with stage("encode", rows=1):
+                    processed_df = preprocessor.transform(input_df)
+                monitor = current_drift_monitor()
+                if monitor is not None:
+                    with stage("drift", rows=1):
+                        monitor.update(processed_df)
+                unknown_counts = processed_df.attrs["unknown_counts"]
+                if unknown_counts:
+                    st.warning(f"Modelin tanımadığı değerler varsayılan koda çevrildi: {unknown_counts}")
+
+                # Aynı kodlanmış girdi ve model sürümü daha önce hesaplandıysa model hiç çağrılmaz.
+                # Bilinmeyen değerler varsayılan koda düştüğü için bu girdiler önbelleğe alınmaz.
+                cache = get_prediction_cache()
+                cache_key = make_key(model_version, processed_df.to_numpy()[0])
+                result = None if unknown_counts else cache.get(cache_key)
+
+                if result is None:
+                    # 3. Tahmin Yap
+                    with stage("predict", rows=1):
+                        pred = predictor.predict(processed_df)[0]
+
+                    # 4. Geri Bildirim Al
+                    with stage("feedback", rows=1):
+                        feedback = get_ai_feedback(pred, input_df.iloc[0])
+
+                    # 5. Öğrencinin kendi faktör katkıları (ağaç yolu yöntemi, düz orman üzerinde)
+                    with stage("attribution", rows=1):
+                        bias, contributions = explain(predictor, processed_df)
+                    top_factors = top_factor_strings(contributions.to_numpy(), contributions.columns)[0]
+                    contributions = contributions.iloc[0].rename('Katkı').rename_axis('Faktör').reset_index()
+
+                    result = {'score': pred, 'feedback': feedback, 'bias': bias,
+                              'contributions': contributions, 'top_factors': top_factors,
+                              'model_version': model_version}
+                    if not unknown_counts:
+                        cache.put(cache_key, result)
+
+                st.session_state['prediction_result'] = result
 
         if st.session_state['prediction_result']:
             res = st.session_state['prediction_result']
@@ -248,33 +392,37 @@ def show_analysis_page():
             st.markdown("---")
 
             # Grafik
-            importances = pd.DataFrame({
-                'Faktör': res['processed_df'].columns,
-                'Önem': model.feature_importances_
-            }).sort_values(by='Önem', ascending=False).head(5)
-
             with st.expander("📊 Etkili Faktörleri Gör"):
-                fig = px.bar(importances, x='Önem', y='Faktör', orientation='h', title="Başarıyı Etkileyen Faktörler")
+                import plotly.express as px
+                # Mutlak katkısı en büyük faktörler; pozitif katkı notu ortalamanın üzerine taşır
+                top = res['contributions'].reindex(
+                    res['contributions']['Katkı'].abs().sort_values(ascending=False).index).head(8)
+                top['Yön'] = top['Katkı'].ge(0).map({True: "Artırıyor", False: "Düşürüyor"})
+                fig = px.bar(top.iloc[::-1], x='Katkı', y='Faktör', orientation='h', color='Yön',
+                             color_discrete_map={"Artırıyor": "#2ca02c", "Düşürüyor": "#d62728"},
+                             title="Bu Öğrencinin Notunu Etkileyen Faktörler")
                 st.plotly_chart(fig, use_container_width=True)
+                st.caption(f"Ortalama öğrenci tahmini {res['bias']:.1f}; faktör katkıları bu değeri "
+                           f"{res['score']:.1f} notuna taşır.")
+
+            # Senaryolar kenar çubuğundaki güncel girdilerden üretilir
+            if st.toggle("🔮 Ne Olurdu? (Senaryo Analizi)"):
+                model, _, _, preprocessor, model_version = wait_for_ai_assets()
+                show_what_if(model, preprocessor, model_version, input_df)
 
             # Kaydetme Butonu
             if st.button("💾 Analizi Veritabanına Kaydet"):
+                from src.database.db_config import SessionLocal
+                from src.database.crud import save_student_prediction
+
                 db = SessionLocal()
                 try:
-                    new_student = Student(first_name=first_name, last_name=last_name, **input_df.iloc[0].to_dict())
-                    db.add(new_student)
-                    db.commit()
-                    db.refresh(new_student)
-
-                    new_pred = AIPrediction(
-                        student_id=new_student.id,
-                        predicted_score=float(res['score']),
-                        risk_level=fb['risk_label'],
-                        top_factors="Manual Analysis",
-                        recommendation=fb['final_text_for_db']  # Veritabanına birleşik metni kaydediyoruz
+                    save_student_prediction(
+                        db,
+                        {"first_name": first_name, "last_name": last_name, **input_df.iloc[0].to_dict()},
+                        res['score'], fb,  # Veritabanına birleşik metni kaydediyoruz
+                        top_factors=res['top_factors'], model_version=res['model_version']
                     )
-                    db.add(new_pred)
-                    db.commit()
                     st.success(f"✅ {first_name} {last_name} sisteme kaydedildi!")
                 except Exception as e:
                     st.error(f"Hata: {e}")
@@ -291,7 +439,7 @@ def show_analysis_page():
         """)
 
 
-# --- SAYFA 2: TOPLU ANALİZ (Düzeltilmiş Versiyon) ---
+# --- SAYFA 2: TOPLU ANALİZ (Akışlı Versiyon) ---
 def show_batch_analysis_page():
     st.title("📂 Toplu Sınıf Analizi")
     st.markdown("---")
@@ -299,127 +447,107 @@ def show_batch_analysis_page():
     st.info("💡 **Bilgi:** Yükleyeceğiniz CSV dosyasındaki sütun isimleri otomatik olarak eşleştirilecektir.")
 
     uploaded_file = st.file_uploader("Sınıf Listesi Yükle (CSV)", type=["csv"])
+    # Sonuçlar yüklendikleri dosyaya bağlıdır; dosya değişirse (veya kaldırılırsa) eski özet gösterilmez/kaydedilmez
+    if 'batch_summary' in st.session_state and st.session_state.get('batch_summary_upload') != _upload_key(uploaded_file):
+        _discard_batch_summary()
 
     if uploaded_file is not None:
         try:
-            input_df = pd.read_csv(uploaded_file)
-
-            # --- DÜZELTME: Sütun isimlerini normalize et ---
-            input_df.columns = input_df.columns.str.strip().str.lower()
-
-            st.success(f"✅ Dosya yüklendi! Toplam {len(input_df)} öğrenci bulundu.")
+            st.success(f"✅ Dosya yüklendi! ({uploaded_file.size / (1024 * 1024):.1f} MB)")
 
             with st.expander("📄 Yüklenen Veriyi Gör", expanded=False):
-                st.dataframe(input_df.head())
+                # Önizleme için sadece ilk satırlar okunur
+                st.dataframe(normalize_columns(pd.read_csv(uploaded_file, nrows=5)))
+                uploaded_file.seek(0)
 
             if st.button("🚀 Toplu Analizi Başlat", type="primary"):
+                # Dosya parça parça okunur, kodlanır ve tahmin edilir; bellekte sadece özet kalır
+                uploaded_file.seek(0)
+                model, _, predictor, preprocessor, model_version = wait_for_ai_assets()
+                if not model:
+                    st.error("🚨 Model dosyaları bulunamadı! Lütfen önce 'ml_engine.py' dosyasını çalıştırın.")
+                    return
+                progress_bar = st.progress(0.0, text="Analiz ediliyor...")
+                monitor = current_drift_monitor()
+                try:
+                    summary = score_csv_stream(
+                        uploaded_file, model, preprocessor,
+                        progress_callback=lambda p: progress_bar.progress(p, text=f"Analiz ediliyor... %{p * 100:.0f}"),
+                        total_bytes=uploaded_file.size, monitor=monitor, explainer=predictor
+                    )
+                except Exception as e:
+                    st.error(f"Tahmin sırasında hata: {e}")
+                    return
+                summary.model_version = model_version
+                # Her toplu analiz ayrı bir kayma penceresi olarak kaydedilir
+                if monitor is not None:
+                    monitor.flush()
+
+                _discard_batch_summary()
+                st.session_state['batch_summary'] = summary
+                st.session_state['batch_summary_upload'] = _upload_key(uploaded_file)
+
+            summary = st.session_state.get('batch_summary')
+            if summary is None:
+                return
+
+            if summary.unknown_counts:
+                st.warning(f"Modelin tanımadığı değerler varsayılan koda çevrildi: {summary.unknown_counts}")
+
+            # Görselleştirme (yürüyen toplamlardan)
+            st.markdown(f"### 📊 Sınıf Analiz Raporu ({summary.count} öğrenci, ortalama {summary.mean_score:.1f})")
+            c1, c2 = st.columns(2)
+
+            import plotly.express as px
+            color_map = {'Düşük Risk': '#28a745', 'Orta Risk': '#ffc107', 'Yüksek Risk': '#dc3545'}
+
+            fig_pie = px.pie(summary.risk_frame(), values='Sayı', names='Risk', title="Sınıf Risk Dağılımı",
+                             color='Risk', color_discrete_map=color_map)
+            c1.plotly_chart(fig_pie, use_container_width=True)
+
+            fig_hist = px.bar(summary.histogram_frame(), x="Tahmini_Not", y="Sayı", title="Not Dağılımı",
+                              color_discrete_sequence=['#17a2b8'])
+            fig_hist.update_traces(width=5)
+            fig_hist.add_vline(x=50, line_dash="dash", line_color="red", annotation_text="Geçme Sınırı")
+            c2.plotly_chart(fig_hist, use_container_width=True)
+
+            st.caption(f"İlk {len(summary.preview)} satır gösteriliyor. Tüm sonuçlar için dosyayı indirin.")
+            st.dataframe(summary.preview[['Tahmini_Not', 'Risk_Durumu']], use_container_width=True)
 
-                processed_df = input_df.copy()
+            with open(summary.result_path, "rb") as f:
+                st.download_button(
+                    label=f"📥 Tüm Sonuçları İndir ({summary.result_format.upper()})",
+                    data=f,
+                    file_name=f"Toplu_Analiz.{summary.result_format}",
+                    mime="application/octet-stream"
+                )
 
-                # Encoder İşlemi
-                for col, encoder in encoders.items():
-                    if col in processed_df.columns:
-                        processed_df[col] = processed_df[col].astype(str).apply(
-                            lambda x: encoder.transform([x])[0] if x in encoder.classes_ else 0
-                        )
+            # Toplu Veli Raporları
+            st.markdown("---")
+            show_report_export('batch_reports', "📦 Tüm Veli Raporlarını Oluştur (ZIP)", summary.count,
+                               lambda: iter_report_frames_from_results(summary.result_path))
 
-                # Eksik sütun kontrolü
-                expected_cols = model.feature_names_in_ if hasattr(model, 'feature_names_in_') else processed_df.columns
+            # Veritabanına Kayıt
+            st.markdown("---")
+            if st.button("💾 Tüm Sonuçları Kaydet"):
+                from src.database.db_config import SessionLocal
+                from src.database.crud import bulk_save_batch_results
 
-                for col in expected_cols:
-                    if col not in processed_df.columns:
-                        processed_df[col] = 0
+                db = SessionLocal()
+                progress_bar = st.progress(0)
 
-                # Tahmin
                 try:
-                    processed_df = processed_df[expected_cols]
-                    predictions = model.predict(processed_df)
+                    # Tek işlem (transaction) içinde, büyük gruplar halinde toplu kayıt
+                    success_count = bulk_save_batch_results(
+                        db, iter_results(summary.result_path),
+                        progress_callback=lambda n: progress_bar.progress(n / summary.count),
+                        model_version=summary.model_version
+                    )
+                    st.success(f"✅ {success_count} öğrenci başarıyla kaydedildi!")
                 except Exception as e:
-                    st.error(f"Tahmin sırasında hata: {e}")
-                    return
-
-                # Sonuçları Birleştir
-                results_df = input_df.copy()
-                results_df['Tahmini_Not'] = predictions.round(1)
-
-                def get_risk_label(score):
-                    if score >= 85:
-                        return "Düşük Risk"
-                    elif score >= 50:
-                        return "Orta Risk"
-                    else:
-                        return "Yüksek Risk"
-
-                results_df['Risk_Durumu'] = results_df['Tahmini_Not'].apply(get_risk_label)
-
-                # Görselleştirme
-                st.markdown("### 📊 Sınıf Analiz Raporu")
-                c1, c2 = st.columns(2)
-
-                risk_counts = results_df['Risk_Durumu'].value_counts().reset_index()
-                risk_counts.columns = ['Risk', 'Sayı']
-
-                color_map = {'Düşük Risk': '#28a745', 'Orta Risk': '#ffc107', 'Yüksek Risk': '#dc3545'}
-
-                fig_pie = px.pie(risk_counts, values='Sayı', names='Risk', title="Sınıf Risk Dağılımı",
-                                 color='Risk', color_discrete_map=color_map)
-                c1.plotly_chart(fig_pie, use_container_width=True)
-
-                fig_hist = px.histogram(results_df, x="Tahmini_Not", nbins=20, title="Not Dağılımı",
-                                        color_discrete_sequence=['#17a2b8'])
-                fig_hist.add_vline(x=50, line_dash="dash", line_color="red", annotation_text="Geçme Sınırı")
-                c2.plotly_chart(fig_hist, use_container_width=True)
-
-                st.dataframe(results_df[['Tahmini_Not', 'Risk_Durumu']], use_container_width=True)
-
-                # Veritabanına Kayıt
-                st.markdown("---")
-                if st.button("💾 Tüm Sonuçları Kaydet"):
-                    db = SessionLocal()
-                    progress_bar = st.progress(0)
-                    success_count = 0
-
-                    try:
-                        for idx, row in results_df.iterrows():
-                            f_name = row.get('first_name', "Öğrenci")
-                            l_name = row.get('last_name', f"{idx + 1}")
-
-                            # Student Tablosu İçin Veri Hazırlığı
-                            student_data = row.to_dict()
-
-                            # Fazlalıkları temizle
-                            for key in ['Tahmini_Not', 'Risk_Durumu', 'first_name', 'last_name']:
-                                if key in student_data:
-                                    del student_data[key]
-
-                            # Sadece model sütunlarını al
-                            valid_columns = [c.name for c in Student.__table__.columns]
-                            student_data = {k: v for k, v in student_data.items() if k in valid_columns}
-
-                            new_student = Student(first_name=str(f_name), last_name=str(l_name), **student_data)
-                            db.add(new_student)
-                            db.commit()
-                            db.refresh(new_student)
-
-                            # Prediction Tablosu
-                            feedback = get_ai_feedback(row['Tahmini_Not'], row)
-                            new_pred = AIPrediction(
-                                student_id=new_student.id,
-                                predicted_score=row['Tahmini_Not'],
-                                risk_level=row['Risk_Durumu'],
-                                top_factors="Toplu Analiz",
-                                recommendation=feedback['final_text_for_db']
-                            )
-                            db.add(new_pred)
-                            success_count += 1
-                            progress_bar.progress(success_count / len(results_df))
-
-                        db.commit()
-                        st.success(f"✅ {success_count} öğrenci başarıyla kaydedildi!")
-                    except Exception as e:
-                        st.error(f"Kayıt hatası: {e}")
-                    finally:
-                        db.close()
+                    st.error(f"Kayıt hatası: {e}")
+                finally:
+                    db.close()
 
         except Exception as e:
             st.error(f"CSV işlenirken hata: {e}")
@@ -430,35 +558,185 @@ def show_history_page():
     st.title("🗂️ Geçmiş Analiz Kayıtları")
     st.markdown("Veritabanında kayıtlı tüm analizler.")
 
+    # Filtreler SQL sorgusuna eklenir; tablo hiçbir zaman tamamen belleğe alınmaz
+    f1, f2, f3 = st.columns(3)
+    risk_levels = f1.multiselect("Risk Durumu", HISTORY_RISK_LEVELS)
+    date_range = f2.date_input("Tarih Aralığı", value=[])
+    name = f3.text_input("Ad / Soyad Ara")
+    filters = {
+        "risk_levels": risk_levels,
+        "date_from": date_range[0] if len(date_range) > 0 else None,
+        "date_to": date_range[1] if len(date_range) > 1 else None,
+        "name": name.strip() or None,
+    }
+
+    # Filtre değişince ilk sayfaya dönülür; imleç yığını önceki sayfalara geri gitmek için tutulur
+    if st.session_state.get('history_filters') != filters:
+        st.session_state['history_filters'] = filters
+        st.session_state['history_cursors'] = [None]
+    cursors = st.session_state['history_cursors']
+
+    from src.database.db_config import SessionLocal
+    from src.database.crud import get_prediction_history, get_prediction_summary, HISTORY_PAGE_SIZE
+
     db = SessionLocal()
-    results = db.query(
-        Student.first_name, Student.last_name, AIPrediction.predicted_score,
-        AIPrediction.risk_level, AIPrediction.prediction_date, AIPrediction.recommendation
-    ).join(AIPrediction).order_by(AIPrediction.prediction_date.desc()).all()
-    db.close()
-
-    if results:
-        df = pd.DataFrame(results, columns=["Ad", "Soyad", "Tahmini Not", "Risk", "Tarih", "Öneri"])
+    try:
+        summary = get_prediction_summary(db, **filters)
+        if not summary['total']:
+            st.warning("Filtrelere uyan kayıt bulunamadı." if any(filters.values()) else "Henüz hiç kayıt bulunmuyor.")
+            return
+
+        rows, next_cursor = get_prediction_history(db, HISTORY_PAGE_SIZE, after=cursors[-1], **filters)
+        df = pd.DataFrame(rows, columns=["id", "Ad", "Soyad", "Tahmini Not", "Risk", "Tarih", "Etkili Faktörler", "Öneri"]).drop(columns="id")
         df['Tarih'] = pd.to_datetime(df['Tarih']).dt.strftime('%d-%m-%Y %H:%M')
         df['Tahmini Not'] = df['Tahmini Not'].round(1)
 
         st.dataframe(df, use_container_width=True)
 
+        n1, n2, n3 = st.columns([1, 2, 1])
+        if n1.button("⬅️ Önceki Sayfa", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+        n2.caption(f"Sayfa {len(cursors)} · {summary['total']} kayıttan {len(df)} tanesi gösteriliyor")
+        if n3.button("Sonraki Sayfa ➡️", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+
         c1, c2, c3 = st.columns(3)
-        c1.metric("Toplam Analiz", len(df))
-        c2.metric("Ortalama Başarı", f"{df['Tahmini Not'].mean():.1f}")
-        risky = len(df[df['Risk'].str.contains("Yüksek") | df['Risk'].str.contains("Kritik")])
-        c3.metric("Riskli Öğrenci", risky, delta_color="inverse")
+        c1.metric("Toplam Analiz", summary['total'])
+        c2.metric("Ortalama Başarı", f"{summary['mean_score']:.1f}", help=f"Standart sapma: ±{summary['std_score']:.1f}")
+        c3.metric("Riskli Öğrenci", summary['risky'], delta_color="inverse")
+
+        st.markdown("---")
+        show_report_export('history_reports', "📦 Filtrelenen Veli Raporlarını Oluştur (ZIP)", summary['total'],
+                           lambda: iter_report_frames_from_db(db, **filters))
+    finally:
+        db.close()
+
+
+# --- SAYFA 4: VERİ KAYMASI ---
+def show_drift_page():
+    st.title("📉 Veri Kayması İzleme")
+    st.markdown("Skorlanan öğrenci girdilerinin dağılımı, modelin eğitildiği veriyle özellik bazında karşılaştırılır "
+                f"(PSI < {PSI_WARN} kararlı, {PSI_WARN}-{PSI_ALERT} hafif kayma, > {PSI_ALERT} belirgin kayma).")
+
+    # Model açılışta arka planda yükleniyorsa beklenir
+    wait_for_ai_assets()
+    monitor = current_drift_monitor()
+    if monitor is None:
+        st.info("Aktif model paketinde eğitim dağılımı taslağı yok. Modeli 'ml_engine.py' ile yeniden eğitin.")
+        return
+
+    import plotly.express as px
+    st.subheader(f"⚡ Anlık Durum (model: {monitor.model_version})")
+    scores = pd.DataFrame(monitor.scores())
+    scores["Durum"] = [drift_status(p, n) for p, n in zip(scores["psi"], scores["samples"])]
+    c1, c2, c3 = st.columns(3)
+    c1.metric("İzlenen Girdi", f"{monitor.rows:,}", help=f"Skorlar en az {MIN_SAMPLES} girdiden sonra güvenilirdir.")
+    c2.metric("En Yüksek PSI", f"{scores['psi'].max():.3f}" if monitor.rows else "-")
+    c3.metric("Belirgin Kayma", int(scores["Durum"].str.startswith("🔴").sum()), delta_color="inverse")
+
+    if not monitor.rows:
+        st.info("Bu süreçte henüz skorlanan girdi yok; analiz yapıldıkça dolacaktır.")
     else:
-        st.warning("Henüz hiç kayıt bulunmuyor.")
+        st.dataframe(scores.rename(columns={"feature": "Özellik", "psi": "PSI", "ks": "KS", "samples": "Örnek"})
+                     .round(3), use_container_width=True, hide_index=True)
+
+        fig = px.bar(scores, x="psi", y="feature", orientation="h", title="Özellik Başına PSI")
+        fig.add_vline(x=PSI_WARN, line_dash="dot", line_color="orange")
+        fig.add_vline(x=PSI_ALERT, line_dash="dash", line_color="red")
+        st.plotly_chart(fig, use_container_width=True)
+
+        feature = st.selectbox("Dağılımı Karşılaştır", scores["feature"])
+        expected, actual, labels = monitor.distributions(feature)
+        compare = pd.DataFrame({"Kova": labels * 2, "Oran": list(expected) + list(actual),
+                                "Veri": ["Eğitim"] * len(labels) + ["Skorlanan"] * len(labels)})
+        st.plotly_chart(px.bar(compare, x="Kova", y="Oran", color="Veri", barmode="group",
+                               title=f"{feature}: eğitim ve skorlanan girdi dağılımı"), use_container_width=True)
+
+    st.subheader("🕒 Kayıtlı Pencereler")
+    from src.database.db_config import SessionLocal
+    from src.database.crud import get_drift_history
+
+    db = SessionLocal()
+    try:
+        rows = get_drift_history(db, monitor.model_version)
+    except Exception as e:
+        st.warning(f"Kayma geçmişi okunamadı: {e}")
+        return
+    finally:
+        db.close()
+    if not rows:
+        st.caption("Henüz veritabanına yazılmış bir pencere yok.")
+        return
+
+    history = pd.DataFrame(rows, columns=["Zaman", "Özellik", "Kaynak", "Örnek", "PSI", "KS"])
+    latest = history.drop_duplicates("Özellik").sort_values("PSI", ascending=False)
+    selected = st.multiselect("Özellikler", sorted(history["Özellik"].unique()), default=list(latest["Özellik"][:3]))
+    if selected:
+        fig = px.line(history[history["Özellik"].isin(selected)].sort_values("Zaman"), x="Zaman", y="PSI",
+                      color="Özellik", markers=True, hover_data=["Kaynak", "Örnek"], title="Pencere Başına PSI")
+        fig.add_hline(y=PSI_ALERT, line_dash="dash", line_color="red")
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# --- SAYFA 5: AŞAMA ÖLÇÜMLERİ (YÖNETİCİ) ---
+def _bucket_label(bound):
+    return "> 300 sn" if bound == "+Inf" else f"≤ {bound * 1000:g} ms"
+
+
+def show_metrics_page():
+    st.title("🛠️ Aşama Ölçümleri")
+    st.markdown("Bu sunucu süreci başladığından beri ölçülen boru hattı aşamalarının gecikme ve satır sayıları.")
+
+    rows = instrumentation.snapshot()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.button("🔄 Yenile")
+    c2.download_button("📥 Prometheus", instrumentation.export_prometheus(),
+                       file_name="eduanalytix_metrics.prom", mime="text/plain")
+    c3.download_button("📥 JSON Lines", instrumentation.export_jsonl(),
+                       file_name="eduanalytix_metrics.jsonl", mime="application/json")
+    if c4.button("🧹 Sıfırla"):
+        instrumentation.reset()
+        st.rerun()
+
+    if not rows:
+        st.info("Henüz ölçülen bir aşama yok; analiz yapıldıkça tablo dolacaktır.")
+        return
+
+    df = pd.DataFrame(rows)
+    st.dataframe(df.round(2), use_container_width=True, hide_index=True)
+
+    import plotly.express as px
+    latency = df.melt(id_vars="stage", value_vars=["p50_ms", "p99_ms"], var_name="Yüzdelik", value_name="ms")
+    fig = px.bar(latency, x="ms", y="stage", color="Yüzdelik", barmode="group", orientation="h",
+                 title="Aşama Başına Gecikme (p50 / p99)")
+    st.plotly_chart(fig, use_container_width=True)
+
+    selected = st.selectbox("Süre Dağılımı", df["stage"])
+    buckets = instrumentation.histogram(selected)
+    # Boş uç kovalar gösterilmez
+    filled = [i for i, (_, n) in enumerate(buckets) if n]
+    if filled:
+        buckets = buckets[filled[0]:filled[-1] + 1]
+        hist = pd.DataFrame({"Kova": [_bucket_label(b) for b, _ in buckets], "Sayı": [n for _, n in buckets]})
+        st.plotly_chart(px.bar(hist, x="Kova", y="Sayı", title=f"{selected} süre histogramı"), use_container_width=True)
 
 
 # --- ANA UYGULAMA MANTIĞI ---
-page = st.sidebar.selectbox("📌 Sayfa Seçimi", ["📊 Analiz Yap", "📂 Toplu Analiz", "🗂️ Geçmiş Kayıtlar"])
+PAGES = ["📊 Analiz Yap", "📂 Toplu Analiz", "🗂️ Geçmiş Kayıtlar", "📉 Veri Kayması"]
+# Ölçüm sayfası sadece EDUANALYTIX_METRICS açıkken gösterilir
+if instrumentation.is_enabled():
+    PAGES.append("🛠️ Ölçümler")
+page = st.sidebar.selectbox("📌 Sayfa Seçimi", PAGES)
 
 if page == "📊 Analiz Yap":
     show_analysis_page()
 elif page == "📂 Toplu Analiz":
     show_batch_analysis_page()
+elif page == "📉 Veri Kayması":
+    show_drift_page()
+elif page == "🛠️ Ölçümler":
+    show_metrics_page()
 else:
     show_history_page()
\ No newline at end of file
@@ -1,3 +1,80 @@
+import numpy as np
+import pandas as pd
+
+# 1. RİSK KADEMELERİ: (alt sınır, etiket, renk, ikon, başlık) - yukarıdan aşağı ilk uyan seçilir
+RISK_TIERS = [
+    (85, "Düşük Risk", "success", "🏆", "Üstün Başarı Potansiyeli"),
+    (70, "Güvenli Bölge", "info", "📈", "İstikrarlı Gelişim"),
+    (50, "Orta Risk", "warning", "⚠️", "Kritik Eşik"),
+    (None, "Yüksek Risk", "error", "🚨", "Acil Akademik Müdahale"),
+]
+
+# 2. PROFİL SENARYOLARI: advice_code içinde birer bit olarak tutulur (0 = özel durum yok)
+ADVICE_UNDERPERFORMING = 1  # Senaryo A
+ADVICE_INEFFICIENT = 2      # Senaryo B
+ADVICE_EXTERNAL = 4         # Senaryo C
+ADVICE_MOTIVATION = 8       # Senaryo D
+
+# Metinler sadece gösterilecekleri veya kaydedilecekleri zaman üretilir (bkz. render_advice)
+ADVICE_TEMPLATES = {
+    # SENARYO A: "Potansiyeli Altında Kalanlar" (Geçmişi iyi ama mevcut çabası düşük)
+    ADVICE_UNDERPERFORMING: (
+        "Öğrencimizin geçmişteki {prev_score} puanlık başarısı, yüksek bir potansiyele sahip olduğunu kanıtlıyor. "
+        "Ancak haftalık {hours} saatlik çalışma temposu, bu potansiyelin altında kalmasına neden oluyor. "
+        "Evde başarının sadece zeka değil, disiplinle desteklenmesi gerektiğini vurgulayan bir rutin oluşturulmalıdır.",
+        "Öğrenci 'Düşük Çaba / Yüksek Potansiyel' profilinde. Akademik bir bıkkınlık yaşıyor olabilir. "
+        "Öğrenciye ilgi duyduğu alanlarda proje tabanlı sorumluluklar verilerek içsel motivasyonu tekrar tetiklenmelidir."
+    ),
+    # SENARYO B: "Çabalayan Ama Verim Alamayanlar" (Çalışma saati yüksek ama skor düşük)
+    ADVICE_INEFFICIENT: (
+        "Haftalık {hours} saatlik yoğun çalışma temposuna rağmen notların beklenen seviyeye gelmemesi, 'verimsiz çalışma' sinyali veriyor. "
+        "Çocuğunuzun ders başında geçirdiği süreden ziyade, konuyu anlayıp anlamadığına odaklanmalı; "
+        "çalışma sırasında dikkat dağıtıcı unsurlar (telefon/gürültü) minimize edilmelidir.",
+        "Öğrenci yüksek çaba sarf ediyor ancak öğrenme stratejilerinde problem var. "
+        "Aktif geri çağırma (active recall) ve aralıklı tekrar teknikleri konusunda rehberlik edilmeli, "
+        "temel kavramlardaki eksikleri için 'scaffolding' (iskele kurma) yöntemiyle destek verilmelidir."
+    ),
+    # SENARYO C: "Dışsal Faktör Kaynaklı Düşüş" (Uyku veya Devamsızlık sorunu)
+    ADVICE_EXTERNAL: (
+        "Analizimiz, başarının önündeki asıl engelin akademik değil, yaşam tarzı kaynaklı ({reason}) olduğunu gösteriyor. "
+        "Zihinsel tazelik olmadan öğrenme gerçekleşemez; lütfen evdeki {sleep} saatlik uyku düzenini en az 8 saate çekmeye odaklanın.",
+        "Öğrencinin bilişsel performansı fiziksel yorgunluk/devamsızlık nedeniyle kısıtlanıyor. "
+        "Sınıf içi performansı düşük olduğunda eleştirmek yerine, okula aidiyet hissini artıracak sosyal katılımlar teşvik edilmelidir."
+    ),
+    # SENARYO D: "Motivasyon ve Çevre Etkisi"
+    ADVICE_MOTIVATION: (
+        "Öğrencimizin mevcut isteksizliği, akademik hedeflerle bağ kuramamasından kaynaklanıyor olabilir. "
+        "Onunla okul dışı hobileri üzerinden bağ kurarak, bu hobilerin akademik başarıyla nasıl ilişkilendiğini (örn: disiplin) sabırla anlatmalısınız.",
+        "Öğrenci 'Düşük Motivasyon' veya 'Olumsuz Akran Etkisi' risk grubunda. "
+        "Sınıf içinde onu pozitif rol modellerle gruplandırarak sosyal öğrenme yoluyla tutum değişikliği hedeflenmelidir."
+    ),
+}
+
+# 3. GENEL TAMAMLAYICI NOTLAR (Eğer özel durum yoksa)
+NEUTRAL_ADVICE = (
+    "Mevcut veriler öğrencimizin dengeli bir gelişim sergilediğini gösteriyor. Bu istikrarı korumak için evdeki huzurlu çalışma ortamını sürdürmeniz yeterlidir.",
+    "Öğrenci mevcut müfredatla uyumlu ilerliyor. Zorluk seviyesi kademeli artırılarak kapasitesi zorlanabilir."
+)
+
+
+def render_advice(advice_code, hours=0, prev_score=0, sleep=7):
+    """advice_code'daki senaryoların veli ve öğretmen metinlerini üretir: (parent_advice, teacher_advice)."""
+    if not advice_code:
+        return [NEUTRAL_ADVICE[0]], [NEUTRAL_ADVICE[1]]
+
+    reason = "yetersiz uyku düzeni" if sleep < 6 else "devamsızlık kaynaklı konu kopukluğu"
+    parent_advice, teacher_advice = [], []
+    for flag, (parent_template, teacher_text) in ADVICE_TEMPLATES.items():
+        if advice_code & flag:
+            parent_advice.append(parent_template.format(hours=hours, prev_score=prev_score, sleep=sleep, reason=reason))
+            teacher_advice.append(teacher_text)
+    return parent_advice, teacher_advice
+
+
+def text_for_db(parent_advice):
+    return "VELI: " + " ".join(parent_advice)[:200]
+
+
 def get_ai_feedback(score, student_data):
     """
     Öğrenci verilerini kombine ederek derinlemesine bir profil analizi yapar.
@@ -11,78 +88,98 @@ def get_ai_feedback(score, student_data):
     sleep = student_data.get('sleep_hours', 7)
     motivation = str(student_data.get('motivation_level', 'Medium')).lower()
 
-    feedback = {
-        "risk_label": "", "color": "", "icon": "", "title": "",
-        "parent_advice": [], "teacher_advice": [], "final_text_for_db": ""
+    # 1. RİSK VE DURUM TESPİTİ (Görsel Göstergeler)
+    for threshold, risk_label, color, icon, title in RISK_TIERS:
+        if threshold is None or score >= threshold:
+            break
+
+    # 2. ÖĞRENCİ PROFİL ANALİZİ (Mini Analiz ve Neden-Sonuç İlişkisi)
+    advice_code = 0
+    if prev_score > score + 10 and hours < 10:
+        advice_code |= ADVICE_UNDERPERFORMING
+    elif hours > 15 and score < 70:
+        advice_code |= ADVICE_INEFFICIENT
+    if sleep < 6 or attendance < 80:
+        advice_code |= ADVICE_EXTERNAL
+    if motivation == "low" or student_data.get('peer_influence') == 'Negative':
+        advice_code |= ADVICE_MOTIVATION
+
+    parent_advice, teacher_advice = render_advice(advice_code, hours, prev_score, sleep)
+    return {
+        "risk_label": risk_label, "color": color, "icon": icon, "title": title, "advice_code": advice_code,
+        "parent_advice": parent_advice, "teacher_advice": teacher_advice,
+        "final_text_for_db": text_for_db(parent_advice)
     }
 
-    # 1. RİSK VE DURUM TESPİTİ (Görsel Göstergeler)
-    if score >= 85:
-        feedback.update(
-            {"risk_label": "Düşük Risk", "color": "success", "icon": "🏆", "title": "Üstün Başarı Potansiyeli"})
-    elif score >= 70:
-        feedback.update({"risk_label": "Güvenli Bölge", "color": "info", "icon": "📈", "title": "İstikrarlı Gelişim"})
-    elif score >= 50:
-        feedback.update({"risk_label": "Orta Risk", "color": "warning", "icon": "⚠️", "title": "Kritik Eşik"})
+
+def _numeric_column(df, col, default):
+    if col not in df.columns:
+        return np.full(len(df), default, dtype=np.float64)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _raw_column(df, col, default):
+    # Metinlere tek öğrenci yolundaki gibi ham değer girer (eksik değerler NaN)
+    if col not in df.columns:
+        return np.full(len(df), default, dtype=object)
+    values = df[col].to_numpy(dtype=object)
+    return np.where(pd.isna(values), np.nan, values)
+
+
+def get_ai_feedback_batch(scores, df):
+    """
+    get_ai_feedback'in DataFrame versiyonu: tüm eşikler ve senaryolar boolean maskelerle tek geçişte hesaplanır.
+    risk_label, color, icon, title ve advice_code sütunlu bir DataFrame döndürür (df ile aynı index).
+    Metinler için render_advice / advice_texts_for_db kullanılır. Eksik değerli karşılaştırmalar False sayılır.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    hours = _numeric_column(df, 'hours_studied', 0)
+    prev_score = _numeric_column(df, 'previous_scores', 0)
+    attendance = _numeric_column(df, 'attendance', 100)
+    sleep = _numeric_column(df, 'sleep_hours', 7)
+    if 'motivation_level' in df.columns:
+        low_motivation = df['motivation_level'].astype(str).str.lower().eq("low").to_numpy(dtype=bool, na_value=False)
     else:
-        feedback.update({"risk_label": "Yüksek Risk", "color": "error", "icon": "🚨", "title": "Acil Akademik Müdahale"})
+        low_motivation = np.zeros(len(df), dtype=bool)
+    if 'peer_influence' in df.columns:
+        negative_peer = df['peer_influence'].eq('Negative').to_numpy(dtype=bool, na_value=False)
+    else:
+        negative_peer = np.zeros(len(df), dtype=bool)
 
-    # 2. ÖĞRENCİ PROFİL ANALİZİ (Mini Analiz ve Neden-Sonuç İlişkisi)
+    # 1. Risk kademesi (NaN puan, tek öğrenci yolundaki gibi son kademeye düşer)
+    tier = np.select([scores >= threshold for threshold, *_ in RISK_TIERS[:-1]],
+                     list(range(len(RISK_TIERS) - 1)), default=len(RISK_TIERS) - 1)
 
-    # SENARYO A: "Potansiyeli Altında Kalanlar" (Geçmişi iyi ama mevcut çabası düşük)
-    if prev_score > score + 10 and hours < 10:
-        feedback["parent_advice"].append(
-            f"Öğrencimizin geçmişteki {prev_score} puanlık başarısı, yüksek bir potansiyele sahip olduğunu kanıtlıyor. "
-            f"Ancak haftalık {hours} saatlik çalışma temposu, bu potansiyelin altında kalmasına neden oluyor. "
-            "Evde başarının sadece zeka değil, disiplinle desteklenmesi gerektiğini vurgulayan bir rutin oluşturulmalıdır."
-        )
-        feedback["teacher_advice"].append(
-            "Öğrenci 'Düşük Çaba / Yüksek Potansiyel' profilinde. Akademik bir bıkkınlık yaşıyor olabilir. "
-            "Öğrenciye ilgi duyduğu alanlarda proje tabanlı sorumluluklar verilerek içsel motivasyonu tekrar tetiklenmelidir."
-        )
+    # 2. Senaryolar (A ve B birbirini dışlar)
+    underperforming = (prev_score > scores + 10) & (hours < 10)
+    inefficient = ~underperforming & (hours > 15) & (scores < 70)
+    external = (sleep < 6) | (attendance < 80)
+    motivation = low_motivation | negative_peer
+    advice_code = (underperforming * ADVICE_UNDERPERFORMING + inefficient * ADVICE_INEFFICIENT
+                   + external * ADVICE_EXTERNAL + motivation * ADVICE_MOTIVATION).astype(np.int8)
 
-    # SENARYO B: "Çabalayan Ama Verim Alamayanlar" (Çalışma saati yüksek ama skor düşük)
-    elif hours > 15 and score < 70:
-        feedback["parent_advice"].append(
-            f"Haftalık {hours} saatlik yoğun çalışma temposuna rağmen notların beklenen seviyeye gelmemesi, 'verimsiz çalışma' sinyali veriyor. "
-            "Çocuğunuzun ders başında geçirdiği süreden ziyade, konuyu anlayıp anlamadığına odaklanmalı; "
-            "çalışma sırasında dikkat dağıtıcı unsurlar (telefon/gürültü) minimize edilmelidir."
-        )
-        feedback["teacher_advice"].append(
-            "Öğrenci yüksek çaba sarf ediyor ancak öğrenme stratejilerinde problem var. "
-            "Aktif geri çağırma (active recall) ve aralıklı tekrar teknikleri konusunda rehberlik edilmeli, "
-            "temel kavramlardaki eksikleri için 'scaffolding' (iskele kurma) yöntemiyle destek verilmelidir."
-        )
+    tiers = np.array([t[1:] for t in RISK_TIERS], dtype=object)[tier]
+    return pd.DataFrame({
+        "risk_label": tiers[:, 0], "color": tiers[:, 1], "icon": tiers[:, 2], "title": tiers[:, 3],
+        "advice_code": advice_code,
+    }, index=df.index)
 
-    # SENARYO C: "Dışsal Faktör Kaynaklı Düşüş" (Uyku veya Devamsızlık sorunu)
-    if sleep < 6 or attendance < 80:
-        reason = "yetersiz uyku düzeni" if sleep < 6 else "devamsızlık kaynaklı konu kopukluğu"
-        feedback["parent_advice"].append(
-            f"Analizimiz, başarının önündeki asıl engelin akademik değil, yaşam tarzı kaynaklı ({reason}) olduğunu gösteriyor. "
-            f"Zihinsel tazelik olmadan öğrenme gerçekleşemez; lütfen evdeki {sleep} saatlik uyku düzenini en az 8 saate çekmeye odaklanın."
-        )
-        feedback["teacher_advice"].append(
-            "Öğrencinin bilişsel performansı fiziksel yorgunluk/devamsızlık nedeniyle kısıtlanıyor. "
-            "Sınıf içi performansı düşük olduğunda eleştirmek yerine, okula aidiyet hissini artıracak sosyal katılımlar teşvik edilmelidir."
-        )
 
-    # SENARYO D: "Motivasyon ve Çevre Etkisi"
-    if motivation == "low" or student_data.get('peer_influence') == 'Negative':
-        feedback["parent_advice"].append(
-            "Öğrencimizin mevcut isteksizliği, akademik hedeflerle bağ kuramamasından kaynaklanıyor olabilir. "
-            "Onunla okul dışı hobileri üzerinden bağ kurarak, bu hobilerin akademik başarıyla nasıl ilişkilendiğini (örn: disiplin) sabırla anlatmalısınız."
-        )
-        feedback["teacher_advice"].append(
-            "Öğrenci 'Düşük Motivasyon' veya 'Olumsuz Akran Etkisi' risk grubunda. "
-            "Sınıf içinde onu pozitif rol modellerle gruplandırarak sosyal öğrenme yoluyla tutum değişikliği hedeflenmelidir."
-        )
-
-    # 3. GENEL TAMAMLAYICI NOTLAR (Eğer özel durum yoksa)
-    if not feedback["parent_advice"]:
-        feedback["parent_advice"].append(
-            "Mevcut veriler öğrencimizin dengeli bir gelişim sergilediğini gösteriyor. Bu istikrarı korumak için evdeki huzurlu çalışma ortamını sürdürmeniz yeterlidir.")
-        feedback["teacher_advice"].append(
-            "Öğrenci mevcut müfredatla uyumlu ilerliyor. Zorluk seviyesi kademeli artırılarak kapasitesi zorlanabilir.")
-
-    feedback["final_text_for_db"] = "VELI: " + " ".join(feedback["parent_advice"])[:200]
-    return feedback
\ No newline at end of file
+def render_advice_batch(advice_codes, df):
+    """Her satır için render_advice sonucunu üretir (tekrar eden girdiler bir kez işlenir)."""
+    cache = {}
+    results = []
+    for values in zip(np.asarray(advice_codes).tolist(), _raw_column(df, 'hours_studied', 0),
+                      _raw_column(df, 'previous_scores', 0), _raw_column(df, 'sleep_hours', 7)):
+        # 10 ve 10.0 eşit hash'lenir ama metinde farklı yazılır; tip de anahtara girer
+        key = values + tuple(map(type, values[1:]))
+        advice = cache.get(key)
+        if advice is None:
+            advice = cache[key] = render_advice(*values)
+        results.append(advice)
+    return results
+
+
+def advice_texts_for_db(advice_codes, df):
+    """Her satır için get_ai_feedback'teki final_text_for_db metnini üretir."""
+    return [text_for_db(parent_advice) for parent_advice, _ in render_advice_batch(advice_codes, df)]
@@ -0,0 +1,267 @@
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Boru hattının aşamaları (kodlama, predict, öneri motoru, HTML, veritabanı yazımı, eğitim, seed) için
+# süre ve satır sayısı histogramları. Varsayılan olarak kapalıdır; kapalıyken stage() paylaşılan boş bir
+# bağlam döndürür ve tek maliyet bir global bayrak kontrolüdür.
+# Ortam değişkenleri:
+#   EDUANALYTIX_METRICS=1           ölçümleri açar
+#   EDUANALYTIX_METRICS_FILE=yol    ölçümleri açar ve süreç biterken anlık görüntüyü yazar
+#                                   (.prom -> Prometheus metin biçimi, diğerleri -> JSON lines)
+
+# Saniye cinsinden süre kovaları (Prometheus varsayılanlarına yakın, uzun eğitim adımları için genişletilmiş)
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                    30.0, 60.0, 300.0)
+ROW_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+METRIC_PREFIX = "eduanalytix_stage"
+
+_enabled = False
+_stages = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Sabit sınırlı kovalarla histogram (son kova +Inf); değer, sınırına eşit olduğu kovaya düşer (le)."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """
+        Kova içinde doğrusal aralıkla yaklaşık yüzdelik (Prometheus histogram_quantile ile aynı yöntem).
+        Kova sınırları gözlenen en küçük / en büyük değere daraltılır; tek gözlemde değerin kendisi döner.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            if n and cumulative + n >= rank:
+                lower = max(self.bounds[i - 1] if i > 0 else 0.0, self.min)
+                upper = min(self.bounds[i] if i < len(self.bounds) else self.max, self.max)
+                return lower + max(upper - lower, 0.0) * (rank - cumulative) / n
+            cumulative += n
+        return self.max
+
+    def cumulative(self):
+        """[(le, kümülatif sayı), ...]; son eleman '+Inf'."""
+        result, total = [], 0
+        for bound, n in zip(list(self.bounds) + ["+Inf"], self.counts):
+            total += n
+            result.append((bound, total))
+        return result
+
+
+class StageStats:
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.rows = Histogram(ROW_BUCKETS)
+        self.errors = 0
+
+
+class _Stage:
+    __slots__ = ("name", "rows", "_start")
+
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, time.perf_counter() - self._start, self.rows, failed=exc_type is not None)
+        return False
+
+
+class _NoopStage:
+    """Ölçüm kapalıyken tüm stage() çağrılarının paylaştığı boş bağlam; rows ataması yok sayılır."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NOOP = _NoopStage()
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+
+
+def stage(name, rows=None):
+    """
+    Bir aşamanın süresini ölçen bağlam yöneticisi. Satır sayısı girişte ya da blok içinde verilebilir:
+        with stage("predict", rows=len(df)): ...
+        with stage("seed.write") as s: ...; s.rows = n
+    """
+    if not _enabled:
+        return _NOOP
+    return _Stage(name, rows)
+
+
+def timed(name):
+    """Fonksiyonun her çağrısını verilen aşama adıyla ölçen dekoratör."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record(name, seconds, rows=None, failed=False):
+    """Dışarıda ölçülmüş bir süreyi kaydeder (örn. bir grup içindeki her istek için)."""
+    if not _enabled:
+        return
+    with _lock:
+        stats = _stages.get(name)
+        if stats is None:
+            stats = _stages[name] = StageStats()
+        stats.duration.observe(seconds)
+        if rows is not None:
+            stats.rows.observe(rows)
+        if failed:
+            stats.errors += 1
+
+
+def snapshot():
+    """Aşama başına özet: sayı, hata, toplam süre, ortalama ve p50/p95/p99 (ms), satır toplamı ve hızı."""
+    with _lock:
+        items = sorted(_stages.items())
+        result = []
+        for name, stats in items:
+            d = stats.duration
+            result.append({
+                "stage": name,
+                "count": d.count,
+                "errors": stats.errors,
+                "total_seconds": d.sum,
+                "mean_ms": d.sum / d.count * 1000 if d.count else 0.0,
+                "p50_ms": d.quantile(0.50) * 1000,
+                "p95_ms": d.quantile(0.95) * 1000,
+                "p99_ms": d.quantile(0.99) * 1000,
+                "max_ms": d.max * 1000,
+                "rows_total": int(stats.rows.sum),
+                "rows_per_sec": stats.rows.sum / d.sum if d.sum > 0 else 0.0,
+            })
+        return result
+
+
+def histogram(name):
+    """Bir aşamanın süre kovaları: [(le, o kovadaki sayı), ...] (kümülatif değil)."""
+    with _lock:
+        stats = _stages.get(name)
+        if stats is None:
+            return []
+        return list(zip(list(DURATION_BUCKETS) + ["+Inf"], stats.duration.counts))
+
+
+def _prometheus_histogram(lines, metric, help_text, histograms):
+    lines.append(f"# HELP {metric} {help_text}")
+    lines.append(f"# TYPE {metric} histogram")
+    for name, hist in histograms:
+        for bound, total in hist.cumulative():
+            lines.append(f'{metric}_bucket{{stage="{name}",le="{bound}"}} {total}')
+        lines.append(f'{metric}_sum{{stage="{name}"}} {hist.sum}')
+        lines.append(f'{metric}_count{{stage="{name}"}} {hist.count}')
+
+
+def export_prometheus():
+    """Tüm aşamaları Prometheus metin biçiminde (text exposition format) döndürür."""
+    with _lock:
+        items = sorted(_stages.items())
+        lines = []
+        _prometheus_histogram(lines, f"{METRIC_PREFIX}_duration_seconds", "Aşama süresi (saniye)",
+                              [(name, s.duration) for name, s in items])
+        _prometheus_histogram(lines, f"{METRIC_PREFIX}_rows", "Aşamada işlenen satır sayısı",
+                              [(name, s.rows) for name, s in items if s.rows.count])
+        lines.append(f"# HELP {METRIC_PREFIX}_errors_total Hata ile biten aşama sayısı")
+        lines.append(f"# TYPE {METRIC_PREFIX}_errors_total counter")
+        for name, stats in items:
+            lines.append(f'{METRIC_PREFIX}_errors_total{{stage="{name}"}} {stats.errors}')
+    return "\n".join(lines) + "\n"
+
+
+def export_jsonl():
+    """Anlık görüntüyü aşama başına bir JSON satırı olarak döndürür (zaman damgalı)."""
+    ts = time.time()
+    return "".join(json.dumps({"ts": ts, **row}, ensure_ascii=False) + "\n" for row in snapshot())
+
+
+def write_snapshot(path):
+    """.prom uzantılı dosyaya Prometheus metni yazar; diğer dosyalara JSON satırlarını ekler."""
+    if path.endswith(".prom"):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(export_prometheus())
+    else:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(export_jsonl())
+
+
+def print_summary():
+    """Komut satırı araçları için aşama özet tablosu (ölçüm kapalıysa bir şey yazmaz)."""
+    rows = snapshot()
+    if not _enabled or not rows:
+        return
+    print(f"\n⏱️ {'Aşama':<22}{'Sayı':>7}{'Toplam sn':>11}{'p50 ms':>10}{'p99 ms':>10}{'Satır/sn':>12}")
+    for row in rows:
+        print(f"   {row['stage']:<22}{row['count']:>7}{row['total_seconds']:>11.2f}{row['p50_ms']:>10.1f}"
+              f"{row['p99_ms']:>10.1f}{row['rows_per_sec']:>12,.0f}")
+
+
+def _configure_from_env():
+    if os.getenv("EDUANALYTIX_METRICS", "").strip().lower() in ("1", "true", "yes", "on"):
+        enable()
+    path = os.getenv("EDUANALYTIX_METRICS_FILE")
+    if path:
+        enable()
+        atexit.register(write_snapshot, path)
+
+
+_configure_from_env()
@@ -0,0 +1,251 @@
+import argparse
+import html
+import os
+import re
+import sys
+import tempfile
+import time
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+
+import numpy as np
+import pandas as pd
+
+# Proje dizin yapısına göre path ayarı
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..', '..'))
+sys.path.append(root_dir)
+
+from src.utils.helpers import get_ai_feedback_batch, render_advice_batch
+
+# Toplu raporda bir işçiye tek seferde gönderilen öğrenci sayısı
+DEFAULT_REPORT_CHUNK = 500
+ZIP_COMPRESS_LEVEL = 6
+
+SCORE_COLUMN = "Tahmini_Not"
+RISK_COLUMN = "Risk_Durumu"
+NAME_COLUMN = "student_name"
+
+ReportExport = namedtuple("ReportExport", ["path", "count", "seconds", "reports_per_sec"])
+
+# Veli raporu şablonu modül yüklenirken bir kez derlenir; her rapor sadece yer tutucuları doldurur
+REPORT_TEMPLATE = Template("""
+    <html>
+    <head>
+        <style>
+            body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; color: #333; padding: 20px; background-color: #f4f4f4; }
+            .container { max-width: 800px; margin: 0 auto; background-color: #fff; padding: 40px; border-radius: 15px; box-shadow: 0 4px 8px rgba(0,0,0,0.1); }
+            .header { text-align: center; border-bottom: 2px solid #4CAF50; padding-bottom: 20px; margin-bottom: 30px; }
+            .header h1 { margin: 0; color: #2E7D32; }
+            .score-box { background-color: #f9f9f9; padding: 20px; border-radius: 10px; text-align: center; margin-bottom: 30px; border: 1px solid #e0e0e0; }
+            .score { font-size: 48px; font-weight: bold; color: #4CAF50; margin: 10px 0; }
+            .risk { font-size: 22px; font-weight: bold; color: #555; }
+            .advice-section { background-color: #e8f5e9; padding: 25px; border-radius: 10px; border-left: 5px solid #4CAF50; }
+            h2 { color: #2E7D32; margin-top: 0; }
+            ul { padding-left: 20px; }
+            .footer { margin-top: 40px; text-align: center; font-size: 12px; color: #888; border-top: 1px solid #eee; padding-top: 20px; }
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>🎓 EduAnalytix Gelişim Raporu</h1>
+                <p>Sayın Veli,</p>
+            </div>
+
+            <p style="font-size: 16px;">Öğrencimiz <strong>${student_name}</strong> için yapılan yapay zeka destekli akademik performans analizi sonuçları aşağıdadır.</p>
+
+            <div class="score-box">
+                <div style="font-size: 14px; text-transform: uppercase; letter-spacing: 1px;">Tahmini Dönem Sonu Başarısı</div>
+                <div class="score">${score} / 100</div>
+                <div class="risk">Genel Durum: ${risk}</div>
+            </div>
+
+            <div class="advice-section">
+                <h2>💡 Gelişim ve Destek Önerileri</h2>
+                <ul>
+                    ${advice_html}
+                </ul>
+            </div>
+
+            <div class="footer">
+                Bu rapor EduAnalytix Yapay Zeka Destekli Karar Destek Sistemi tarafından oluşturulmuştur. <br>
+                Okul Rehberlik Servisi
+            </div>
+        </div>
+    </body>
+    </html>
+    """)
+
+
+def render_report(student_name, score, risk, advice_list):
+    """
+    Sadece VELİYE GÖSTERİLECEK bilgileri içeren temiz bir HTML rapor oluşturur.
+    Öğretmen notları buraya dahil edilmez. İsim, risk ve öneriler yüklenen CSV'lerden / veritabanından
+    geldiği için HTML olarak kaçışlanır.
+    """
+    advice_html = "".join([f"<li style='margin-bottom:10px;'>{html.escape(str(item))}</li>" for item in advice_list])
+    return REPORT_TEMPLATE.substitute(student_name=html.escape(str(student_name)), score=f"{score:.1f}",
+                                      risk=html.escape(str(risk)), advice_html=advice_html)
+
+
+def report_file_name(number, student_name):
+    # Aynı isimli öğrenciler çakışmasın diye sıra numarası eklenir
+    safe_name = re.sub(r"[^\w-]+", "_", str(student_name)).strip("_") or "Ogrenci"
+    return f"{number:06d}_Karne_{safe_name}.html"
+
+
+def _write_report(zf, name, content):
+    """Bir raporu ZIP'e ekler; sıkıştırma zipfile'ın desteklenen writestr yolu ile ana süreçte yapılır."""
+    zinfo = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+    zf.writestr(zinfo, content, compress_type=zipfile.ZIP_DEFLATED, compresslevel=ZIP_COMPRESS_LEVEL)
+
+
+def verify_reports_zip(path):
+    """ZIP'i yeniden açıp tüm kayıtların CRC'sini doğrular; bozuk kayıt varsa zipfile.BadZipFile fırlatır."""
+    with zipfile.ZipFile(path) as zf:
+        bad = zf.testzip()
+        count = len(zf.infolist())
+    if bad is not None:
+        raise zipfile.BadZipFile(f"{path}: bozuk kayıt {bad}")
+    return count
+
+
+def _render_chunk(df, start_number):
+    """Bir parçadaki tüm öğrencilerin raporlarını üretir: [(dosya adı, UTF-8 HTML), ...]."""
+    scores = df[SCORE_COLUMN].to_numpy(dtype=np.float64)
+    feedback = get_ai_feedback_batch(scores, df)
+    advice = render_advice_batch(feedback["advice_code"], df)
+    risks = df[RISK_COLUMN].to_numpy() if RISK_COLUMN in df.columns else feedback["risk_label"].to_numpy()
+
+    reports = []
+    for i, (name, score, risk, (parent_advice, _)) in enumerate(zip(df[NAME_COLUMN], scores, risks, advice)):
+        number = start_number + i + 1
+        reports.append((report_file_name(number, name),
+                        render_report(name, score, risk, parent_advice).encode("utf-8")))
+    return reports
+
+
+def _iter_rendered(frames, chunk_size, workers):
+    """Parçaları sırayla üretir; çok süreçli modda en fazla 2 * workers parça bekletilir."""
+    def jobs():
+        number = 0
+        for df in frames:
+            for start in range(0, len(df), chunk_size):
+                part = df.iloc[start:start + chunk_size]
+                yield part, number
+                number += len(part)
+
+    if workers <= 1:
+        for part, number in jobs():
+            yield _render_chunk(part, number)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for part, number in jobs():
+            pending.append(executor.submit(_render_chunk, part, number))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def write_reports_zip(frames, output_path=None, workers=None, chunk_size=DEFAULT_REPORT_CHUNK,
+                      progress_callback=None, verify=True):
+    """
+    Öğrenci parçalarından (student_name, Tahmini_Not ve öğrenci sütunları) veli raporlarını üretip
+    ZIP dosyasına akıtır. Bellekte sadece işlenmekte olan parçalar tutulur.
+    progress_callback(üretilen_rapor_sayısı) her parça sonrası çağrılır.
+    verify=True ise yazılan dosya testzip() ile yeniden okunup doğrulanır (bkz. verify_reports_zip).
+    """
+    if output_path is None:
+        fd, output_path = tempfile.mkstemp(prefix="eduanalytix_reports_", suffix=".zip")
+        os.close(fd)
+    workers = workers or os.cpu_count() or 1
+
+    count = 0
+    start = time.perf_counter()
+    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for reports in _iter_rendered(frames, chunk_size, workers):
+            for report in reports:
+                _write_report(zf, *report)
+            count += len(reports)
+            if progress_callback is not None:
+                progress_callback(count)
+    if verify and verify_reports_zip(output_path) != count:
+        raise zipfile.BadZipFile(f"{output_path}: beklenen {count} kayıt yok")
+    seconds = time.perf_counter() - start
+    return ReportExport(output_path, count, seconds, count / seconds if seconds > 0 else 0.0)
+
+
+def _with_student_names(df, start_number):
+    # Ad/soyad yoksa toplu kayıttaki varsayılanlar kullanılır ("Öğrenci <sıra>")
+    if "first_name" in df.columns and "last_name" in df.columns:
+        names = df["first_name"].fillna("").astype(str) + " " + df["last_name"].fillna("").astype(str)
+    else:
+        names = "Öğrenci " + pd.Series(np.arange(start_number + 1, start_number + len(df) + 1), index=df.index).astype(str)
+    return df.assign(**{NAME_COLUMN: names.str.strip()})
+
+
+def iter_report_frames_from_results(path, chunksize=None):
+    """Toplu analizin geçici sonuç dosyasını (Parquet/CSV) rapor parçalarına çevirir."""
+    from src.logic.batch_scoring import DEFAULT_CHUNKSIZE, iter_results
+
+    number = 0
+    for df in iter_results(path, chunksize or DEFAULT_CHUNKSIZE):
+        yield _with_student_names(df, number)
+        number += len(df)
+
+
+def iter_report_frames_from_db(db, chunksize=DEFAULT_REPORT_CHUNK * 10, **filters):
+    """
+    Kayıtlı tahminleri öğrenci bilgileriyle birlikte sunucu taraflı imleçle parça parça okur.
+    filters geçmiş sayfasındaki filtrelerle aynıdır (bkz. crud.history_filters).
+    """
+    from sqlalchemy import select
+    from src.database.crud import history_filters
+    from src.database.models import Student, AIPrediction
+
+    columns = [c for c in Student.__table__.columns if c.name != "id"]
+    query = (
+        select(*columns, AIPrediction.predicted_score.label(SCORE_COLUMN), AIPrediction.risk_level.label(RISK_COLUMN))
+        .join(AIPrediction, AIPrediction.student_id == Student.id)
+        .where(*history_filters(**filters))
+        .order_by(AIPrediction.id)
+        .execution_options(yield_per=chunksize)
+    )
+    result = db.execute(query)
+    keys = list(result.keys())
+    number = 0
+    for partition in result.partitions():
+        df = pd.DataFrame(partition, columns=keys)
+        yield _with_student_names(df, number)
+        number += len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Toplu veli raporlarını ZIP olarak üretir.")
+    parser.add_argument("--source", default="db",
+                        help="'db' (kayıtlı tüm tahminler) veya toplu analiz sonuç dosyası (.parquet / .csv)")
+    parser.add_argument("--output", default="veli_raporlari.zip")
+    parser.add_argument("--workers", type=int, default=None, help="Süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_REPORT_CHUNK)
+    args = parser.parse_args()
+
+    if args.source == "db":
+        from src.database.db_config import SessionLocal
+        db = SessionLocal()
+        try:
+            export = write_reports_zip(iter_report_frames_from_db(db), args.output,
+                                       workers=args.workers, chunk_size=args.chunk_size)
+        finally:
+            db.close()
+    else:
+        export = write_reports_zip(iter_report_frames_from_results(args.source), args.output,
+                                   workers=args.workers, chunk_size=args.chunk_size)
+
+    print(f"✅ {export.count} rapor yazıldı -> {export.path}")
+    print(f"⏱️ {export.seconds:.1f} sn ({export.reports_per_sec:,.0f} rapor/sn)")